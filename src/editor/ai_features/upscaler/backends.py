@@ -0,0 +1,56 @@
+from abc import ABC, abstractmethod
+from PIL import Image
+
+# An upscale backend turns one image (usually a tile cut by TiledUpscaler)
+# into the same image `scale` times larger:
+#
+#   backend.upscale_tile(tile) -> Image of size (w * scale, h * scale)
+#
+# Backends that tile internally (NCNN) set `tiled = False` and are handed the
+# whole image instead, with upscale_tile(img, progress_callback, cancel_event).
+
+
+class UpscaleBackend(ABC):
+    name = "Base"
+    scale = 4
+    tiled = True          # Let TiledUpscaler split the image
+    thread_safe = True    # upscale_tile may run in several threads at once
+
+    def available(self):
+        return True
+
+    @abstractmethod
+    def upscale_tile(self, tile):
+        """Return tile upscaled by `scale`."""
+
+
+class LanczosBackend(UpscaleBackend):
+    """Pure-CPU reference backend: Lanczos resampling, no model needed."""
+    name = "Lanczos (CPU)"
+
+    def __init__(self, scale=4):
+        self.scale = scale
+
+    def upscale_tile(self, tile):
+        return tile.resize((tile.width * self.scale, tile.height * self.scale),
+                           Image.Resampling.LANCZOS)
+
+
+class NcnnBackend(UpscaleBackend):
+    """Real-ESRGAN through realesrgan-ncnn-vulkan, which tiles on the GPU itself."""
+    name = "Real-ESRGAN (NCNN)"
+    tiled = False
+    thread_safe = False
+
+    def __init__(self, engine, manager=None):
+        self.engine = engine
+        self.manager = manager
+
+    def available(self):
+        return self.manager.exists() if self.manager else True
+
+    def upscale_tile(self, tile, progress_callback=None, cancel_event=None):
+        return self.engine.upscale(tile, progress_callback, cancel_event)
+
+    def cancel(self):
+        self.engine.cancel()
@@ -1,15 +1,50 @@
 import os
+import threading
 from .upscaler_engine import UpscalerEngine
 from .upscale_manager import UpscaleModelManager
+from .backends import NcnnBackend, LanczosBackend
+from .tiling import TiledUpscaler
 
 AI_NAME = "Upscaler"
 
 class UpscalerFeature:
-    def __init__(self):
+    def __init__(self, backend=None):
         self.manager = UpscaleModelManager()
         self.engine = UpscalerEngine(self.manager.model_dir)
+        self.ncnn = NcnnBackend(self.engine, self.manager)
+        self._backend = backend
+        self._active = set()  # Cancel events of the upscales in progress
+        self._lock = threading.Lock()
 
-    def upscale(self, img):
-        return self.engine.upscale(img)
+    @property
+    def backend(self):
+        """Real-ESRGAN when its binary and model are installed, else the CPU reference."""
+        if self._backend is not None:
+            return self._backend
+        return self.ncnn if self.ncnn.available() else LanczosBackend()
+
+    @property
+    def backend_name(self):
+        return self.backend.name
+
+    def upscale(self, img, progress_callback=None, cancel_event=None):
+        """
+        Upscale img with the current backend. Pass a cancel_event created
+        when the job was queued to cancel it reliably, even before it starts.
+        """
+        cancel_event = cancel_event or threading.Event()
+        with self._lock:
+            self._active.add(cancel_event)
+        try:
+            return TiledUpscaler(self.backend).upscale(img, progress_callback, cancel_event)
+        finally:
+            with self._lock:
+                self._active.discard(cancel_event)
+
+    def cancel(self):
+        """Cancel every upscale in progress."""
+        with self._lock:
+            for event in self._active:
+                event.set()
 
 AI_CLASS = UpscalerFeature
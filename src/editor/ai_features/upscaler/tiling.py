@@ -0,0 +1,140 @@
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from PIL import Image, ImageChops
+
+from .upscaler_engine import UpscaleCancelled
+
+
+def tile_grid(width, height, tile_size):
+    """Core (left, top, right, bottom) boxes covering the image, row by row."""
+    return [(x, y, min(x + tile_size, width), min(y + tile_size, height))
+            for y in range(0, height, tile_size)
+            for x in range(0, width, tile_size)]
+
+
+def _ramp(length):
+    return bytes(int((i + 0.5) * 255 / length) for i in range(length))
+
+
+@lru_cache(maxsize=32)
+def feather_mask(size, left, top):
+    """
+    Paste mask for a tile whose first `left` columns and `top` rows overlap
+    tiles already placed: linear 0->255 ramps there, opaque elsewhere.
+    """
+    w, h = size
+    mask = Image.new("L", size, 255)
+    if left:
+        mask.paste(Image.frombytes("L", (left, 1), _ramp(left)).resize((left, h)), (0, 0))
+    if top:
+        ramp = Image.frombytes("L", (1, top), _ramp(top)).resize((w, top))
+        mask.paste(ImageChops.multiply(mask.crop((0, 0, w, top)), ramp), (0, 0))
+    return mask
+
+
+class TiledUpscaler:
+    """
+    Upscale through a backend one overlapping tile at a time.
+
+    Each tile is cut with `overlap` pixels of context on every side, so the
+    backend never sees a hard edge where a neighbour continues. Its output
+    is cropped back to the core plus a blend band of overlap // 2 pixels
+    that is feathered into the tiles already placed. At most 2 tiles per
+    worker are in flight, so working memory depends on the tile size, not
+    on the image size.
+    """
+
+    def __init__(self, backend, tile_size=256, overlap=16, workers=None):
+        self.backend = backend
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.workers = workers or max(1, os.cpu_count() or 1)
+        self._active = set()  # Cancel events of the upscales in progress
+        self._lock = threading.Lock()
+
+    @property
+    def name(self):
+        return self.backend.name
+
+    def cancel(self):
+        """Cancel every upscale in progress; each raises UpscaleCancelled."""
+        with self._lock:
+            for event in self._active:
+                event.set()
+
+    def upscale(self, img, progress_callback=None, cancel_event=None):
+        """
+        Upscale img. cancel_event (created by the caller when the job was
+        queued) cancels this run even if it is set before the run starts.
+        """
+        cancelled = cancel_event or threading.Event()
+        with self._lock:
+            self._active.add(cancelled)
+        try:
+            return self._upscale(img, progress_callback, cancelled)
+        finally:
+            with self._lock:
+                self._active.discard(cancelled)
+
+    def _upscale(self, img, progress_callback, cancelled):
+        if cancelled.is_set():
+            raise UpscaleCancelled()
+        if img.mode not in ("RGB", "RGBA", "L"):
+            img = img.convert("RGB")
+        if not self.backend.tiled:
+            return self.backend.upscale_tile(img, progress_callback, cancelled)
+
+        scale = self.backend.scale
+        width, height = img.size
+        pad = self.overlap
+        blend = self.overlap // 2
+        boxes = tile_grid(width, height, self.tile_size)
+        out = Image.new(img.mode, (width * scale, height * scale))
+
+        def work(box):
+            if cancelled.is_set():
+                return None
+            left, top, right, bottom = box
+            # Blend band on the sides that have a neighbour already placed
+            bl = blend if left else 0
+            bt = blend if top else 0
+            src = (max(0, left - bl - pad), max(0, top - bt - pad),
+                   min(width, right + pad), min(height, bottom + pad))
+            res = self.backend.upscale_tile(img.crop(src))
+            keep = ((left - bl - src[0]) * scale, (top - bt - src[1]) * scale,
+                    (right - src[0]) * scale, (bottom - src[1]) * scale)
+            return res.crop(keep), (bl * scale, bt * scale)
+
+        workers = self.workers if self.backend.thread_safe else 1
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            queue = iter(boxes)
+            pending = deque()
+            done = 0
+            while True:
+                while len(pending) < workers * 2:
+                    box = next(queue, None)
+                    if box is None:
+                        break
+                    pending.append((box, pool.submit(work, box)))
+                if not pending:
+                    break
+                # Paste in raster order so each tile blends over its left/top neighbours
+                box, future = pending.popleft()
+                result = future.result()
+                if result is None or cancelled.is_set():
+                    for _, f in pending:
+                        f.cancel()
+                    raise UpscaleCancelled()
+                tile, (bl, bt) = result
+                pos = (box[0] * scale - bl, box[1] * scale - bt)
+                if bl or bt:
+                    out.paste(tile, pos, feather_mask(tile.size, bl, bt))
+                else:
+                    out.paste(tile, pos)
+                done += 1
+                if progress_callback:
+                    progress_callback(done * 100.0 / len(boxes))
+        return out
@@ -0,0 +1,265 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from PIL import Image
+
+from .backends import NcnnBackend
+from .tiling import TiledUpscaler
+from .upscaler_engine import UpscaleCancelled, scratch_dir
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+STABLE_POLLS = 2  # Polls an output's size must hold still before it's taken as written
+
+
+class UpscaleJob:
+    __slots__ = ("id", "input_path", "output_path", "status", "progress",
+                 "seconds", "pixels", "error")
+
+    def __init__(self, job_id, input_path, output_path):
+        self.id = job_id
+        self.input_path = input_path
+        self.output_path = output_path
+        self.status = "queued"    # queued / running / done / failed / cancelled
+        self.progress = 0.0       # percent
+        self.seconds = 0.0
+        self.pixels = 0
+        self.error = None
+
+
+class UpscaleQueue:
+    """
+    Upscales many files while paying the model-load cost once per run.
+
+    With the NCNN backend every queued job is staged (symlinked) into one
+    directory on tmpfs and handed to a single realesrgan-ncnn-vulkan process
+    in its directory-input mode, so the model loads once for the whole
+    folder. Other backends (the CPU reference) run in-process, job by job.
+
+    Jobs added while a run is in progress are picked up by another pass
+    before run() returns.
+
+    on_job(job) is called whenever a job's status or progress changes.
+    """
+
+    def __init__(self, backend, on_job=None):
+        self.backend = backend
+        self.on_job = on_job
+        self.jobs = []
+        self.stats = {}
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()  # Set by cancel() during the current run
+
+    def add(self, input_path, output_path):
+        with self._lock:
+            job = UpscaleJob(len(self.jobs) + 1, input_path, output_path)
+            self.jobs.append(job)
+        return job
+
+    def add_folder(self, in_dir, out_dir):
+        """Queue every image in in_dir; outputs keep the name with a .png extension."""
+        jobs = []
+        for name in sorted(os.listdir(in_dir)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                out = os.path.join(out_dir, os.path.splitext(name)[0] + ".png")
+                jobs.append(self.add(os.path.join(in_dir, name), out))
+        return jobs
+
+    def cancel(self):
+        """
+        Cancel every job queued so far, running or waiting. Waiting jobs are
+        marked cancelled right away, so a cancel before run() isn't lost;
+        jobs added afterwards run normally.
+        """
+        with self._lock:
+            self._cancelled.set()
+            waiting = [j for j in self.jobs if j.status == "queued"]
+        for job in waiting:
+            self._update(job, status="cancelled")
+
+    def run(self):
+        """Process queued jobs until none are left. Returns the stats dict."""
+        with self._lock:
+            # A fresh event per run; an earlier cancel() already marked its jobs
+            self._cancelled = threading.Event()
+        start = time.perf_counter()
+        while not self._cancelled.is_set():
+            with self._lock:
+                batch = [j for j in self.jobs if j.status == "queued"]
+            if not batch:
+                break
+            try:
+                if isinstance(self.backend, NcnnBackend):
+                    self._run_directory(batch)
+                else:
+                    self._run_each(batch)
+            except UpscaleCancelled:
+                break
+
+        for job in self.jobs:
+            if job.status in ("queued", "running"):
+                self._update(job, status="cancelled")
+
+        elapsed = time.perf_counter() - start
+        done = [j for j in self.jobs if j.status == "done"]
+        megapixels = sum(j.pixels for j in done) / 1_000_000
+        self.stats = {
+            "jobs": len(self.jobs),
+            "done": len(done),
+            "failed": sum(1 for j in self.jobs if j.status == "failed"),
+            "seconds": elapsed,
+            "images_per_sec": len(done) / elapsed if elapsed else 0.0,
+            "input_megapixels_per_sec": megapixels / elapsed if elapsed else 0.0,
+            "backend": self.backend.name,
+        }
+        return self.stats
+
+    def _update(self, job, **changes):
+        for key, value in changes.items():
+            setattr(job, key, value)
+        if self.on_job:
+            self.on_job(job)
+
+    @staticmethod
+    def _pixels(path):
+        try:
+            with Image.open(path) as img:
+                return img.width * img.height
+        except OSError:
+            return 0
+
+    # -------------------------
+    # In-process backends
+    # -------------------------
+    def _run_each(self, batch):
+        runner = TiledUpscaler(self.backend)
+        cancelled = self._cancelled
+        for job in batch:
+            if cancelled.is_set():
+                raise UpscaleCancelled()
+            t0 = time.perf_counter()
+            self._update(job, status="running")
+            try:
+                with Image.open(job.input_path) as img:
+                    img = img.convert("RGB")
+                job.pixels = img.width * img.height
+                res = runner.upscale(img, lambda p, j=job: self._update(j, progress=p), cancelled)
+                os.makedirs(os.path.dirname(job.output_path) or ".", exist_ok=True)
+                res.save(job.output_path)
+                self._update(job, status="done", progress=100.0,
+                             seconds=time.perf_counter() - t0)
+            except UpscaleCancelled:
+                raise
+            except Exception as e:
+                self._update(job, status="failed", error=str(e),
+                             seconds=time.perf_counter() - t0)
+
+    # -------------------------
+    # NCNN directory mode
+    # -------------------------
+    def _run_directory(self, batch):
+        engine = self.backend.engine
+        cancelled = self._cancelled
+
+        with tempfile.TemporaryDirectory(prefix="painimage_upscale_", dir=scratch_dir()) as tmp_dir:
+            in_dir = os.path.join(tmp_dir, "in")
+            out_dir = os.path.join(tmp_dir, "out")
+            os.makedirs(in_dir)
+            os.makedirs(out_dir)
+
+            # Stage inputs under unique names; links avoid copying the files
+            staged = {}
+            for job in batch:
+                ext = os.path.splitext(job.input_path)[1].lower()
+                name = f"{job.id:06d}{ext}"
+                path = os.path.join(in_dir, name)
+                try:
+                    os.symlink(os.path.abspath(job.input_path), path)
+                except OSError:
+                    shutil.copyfile(job.input_path, path)
+                job.pixels = self._pixels(job.input_path)
+                staged[os.path.join(out_dir, f"{job.id:06d}.png")] = job
+                self._update(job, status="running")
+
+            last = {"time": time.perf_counter()}
+            sizes = {}  # Staged output -> (size at the last poll, polls it has held still)
+
+            def collect(finished=False):
+                """
+                Finish jobs whose staged output has been written. While the
+                binary runs, an output counts once its size has held still
+                for STABLE_POLLS polls, and a move that fails (the file still
+                open on Windows, a transient error) is retried on the next
+                poll; only the final pass marks the job failed.
+                """
+                for out_path, job in staged.items():
+                    if job.status != "running":
+                        continue
+                    if not finished:
+                        try:
+                            size = os.path.getsize(out_path)
+                        except OSError:
+                            continue
+                        last_size, still = sizes.get(out_path, (None, 0))
+                        still = still + 1 if size == last_size and size > 0 else 0
+                        sizes[out_path] = (size, still)
+                        if still < STABLE_POLLS:
+                            continue
+                    elif not os.path.exists(out_path):
+                        continue
+                    try:
+                        os.makedirs(os.path.dirname(job.output_path) or ".", exist_ok=True)
+                        shutil.move(out_path, job.output_path)
+                    except OSError as e:
+                        if finished:
+                            self._update(job, status="failed", error=str(e))
+                        continue
+                    now = time.perf_counter()
+                    self._update(job, status="done", progress=100.0, seconds=now - last["time"])
+                    last["time"] = now
+
+            def on_line(percent):
+                running = [j for j in staged.values() if j.status == "running"]
+                if running:
+                    self._update(running[0], progress=percent)
+
+            error = None
+            try:
+                engine.upscale_directory(in_dir, out_dir, on_line, cancelled, poll_callback=collect)
+            except (RuntimeError, OSError) as e:
+                error = str(e)
+            except UpscaleCancelled:
+                pass
+            if not cancelled.is_set():
+                collect(finished=True)
+
+            for job in staged.values():
+                if job.status == "running":
+                    if cancelled.is_set():
+                        self._update(job, status="cancelled")
+                    else:
+                        self._update(job, status="failed", error=error or "No output produced")
+            if cancelled.is_set():
+                raise UpscaleCancelled()
+
+
+if __name__ == "__main__":
+    # python -m editor.ai_features.upscaler.upscale_queue <in_dir> <out_dir>
+    import sys
+    from .feature import UpscalerFeature
+
+    if len(sys.argv) != 3:
+        print("usage: python -m editor.ai_features.upscaler.upscale_queue <in_dir> <out_dir>")
+        sys.exit(2)
+
+    def report(job):
+        if job.status in ("done", "failed"):
+            extra = job.error if job.status == "failed" else f"{job.seconds:6.2f} s"
+            print(f"[{job.status}] {os.path.basename(job.input_path)}  {extra}")
+
+    queue = UpscaleQueue(UpscalerFeature().backend, on_job=report)
+    queue.add_folder(sys.argv[1], sys.argv[2])
+    stats = queue.run()
+    print(f"\n{stats['done']}/{stats['jobs']} images in {stats['seconds']:.1f} s with {stats['backend']} "
+          f"({stats['images_per_sec']:.2f} images/s, {stats['input_megapixels_per_sec']:.2f} MP/s in)")
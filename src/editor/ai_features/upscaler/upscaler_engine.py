@@ -1,29 +1,61 @@
 import subprocess
 import os
+import re
 import sys
 import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 
+# NCNN prints "12.34%" lines to stderr as tiles complete
+_PROGRESS_RE = re.compile(r"(\d+(?:\.\d+)?)%")
+
+CANCEL_POLL = 0.05  # Seconds between checks for a cancel while the binary runs
+
+
+class UpscaleCancelled(Exception):
+    pass
+
+
+def scratch_dir():
+    """A RAM-backed directory for intermediates if the system has one (tmpfs), else None."""
+    shm = "/dev/shm"
+    if os.path.isdir(shm) and os.access(shm, os.W_OK):
+        return shm
+    return None
+
+
 class UpscalerEngine:
-    def __init__(self, model_dir):
+    def __init__(self, model_dir, binary=None, fast_io=True, tile_size=400):
         """
         model_dir layout:
             windows/realesrgan-ncnn-vulkan.exe   (Windows binary)
             linux/realesrgan-ncnn-vulkan          (Linux binary)
             models/realesrgan-x4plus.bin
             models/realesrgan-x4plus.param
+
+        binary overrides the platform binary (e.g. a stub in tests).
+        fast_io writes the input as an uncompressed PNG on tmpfs when
+        available; otherwise a regular PNG goes to the system temp dir.
         """
         self.model_dir = model_dir
         self.models_dir = os.path.join(model_dir, "models")
+        self.fast_io = fast_io
+        self.tile_size = tile_size
 
         # Resolve platform-specific binary
-        if sys.platform == "win32":
+        if binary:
+            self.binary = binary
+        elif sys.platform == "win32":
             self.binary = os.path.join(model_dir, "windows", "realesrgan-ncnn-vulkan.exe")
         else:
             self.binary = os.path.join(model_dir, "linux", "realesrgan-ncnn-vulkan")
 
-    def upscale(self, pil_image: Image.Image):
-        # 1. Verify required files exist
+        self._active = set()  # Cancel events of submitted jobs that haven't finished
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _check_files(self):
         if not os.path.exists(self.binary):
             raise FileNotFoundError(f"Missing AI binary: {self.binary}")
 
@@ -36,39 +68,56 @@ class UpscalerEngine:
             if not os.path.exists(path):
                 raise FileNotFoundError(f"Missing required AI model file: {f}")
 
+        # Ensure binary is executable (needed on Linux)
+        if not os.access(self.binary, os.X_OK):
+            try:
+                os.chmod(self.binary, 0o755)
+            except OSError:
+                pass
+
+    def command(self, input_path, output_path):
+        # NCNN REAL ESRGAN COMMAND
+        return [
+            self.binary,
+            "-i", input_path,
+            "-o", output_path,
+            "-n", "realesrgan-x4plus",
+            "-s", "4",
+            "-t", str(self.tile_size),
+            "-m", self.models_dir,
+        ]
+
+    def upscale(self, pil_image: Image.Image, progress_callback=None, cancel_event=None):
+        """
+        Upscale x4, blocking until done. progress_callback(percent) is called
+        from a reader thread as the binary reports progress. Raises
+        UpscaleCancelled if cancel() is called or cancel_event is set
+        meanwhile; pass an event created when the job was queued so a cancel
+        that comes before the job starts isn't lost.
+        """
+        cancel_event = self._register(cancel_event)
+        try:
+            return self._upscale(pil_image, progress_callback, cancel_event)
+        finally:
+            self._unregister(cancel_event)
+
+    def _upscale(self, pil_image, progress_callback, cancel_event):
+        self._check_files()
+
         # Create a temporary directory that will be deleted automatically
-        with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_root = scratch_dir() if self.fast_io else None
+        with tempfile.TemporaryDirectory(prefix="painimage_upscale_", dir=tmp_root) as tmp_dir:
             input_path = os.path.join(tmp_dir, "upscale_input.png")
             output_path = os.path.join(tmp_dir, "upscale_output.png")
 
-            # Save image to disk (NCNN works with file paths)
-            pil_image.save(input_path)
-
-            # Ensure binary is executable (needed on Linux)
-            if not os.access(self.binary, os.X_OK):
-                try:
-                    os.chmod(self.binary, 0o755)
-                except:
-                    pass
-
-            # NCNN REAL ESRGAN COMMAND
-            cmd = [
-                self.binary,
-                "-i", input_path,
-                "-o", output_path,
-                "-n", "realesrgan-x4plus",
-                "-s", "4",
-                "-t", "400",
-                "-m", self.models_dir,
-            ]
+            # Save image to disk (NCNN works with file paths). Compression
+            # only costs time here: the file lives for one run.
+            if self.fast_io:
+                pil_image.save(input_path, format="PNG", compress_level=0)
+            else:
+                pil_image.save(input_path)
 
-            try:
-                # Run the binary
-                result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-            except subprocess.CalledProcessError as e:
-                # Capture stderr for better debugging
-                error_msg = e.stderr if e.stderr else str(e)
-                raise RuntimeError(f"AI Engine failed: {error_msg}")
+            self._run(self.command(input_path, output_path), progress_callback, cancel_event)
 
             # Load the upscaled image back into PIL and make a copy to free the file handle
             if not os.path.exists(output_path):
@@ -76,3 +125,86 @@ class UpscalerEngine:
 
             with Image.open(output_path) as res_img:
                 return res_img.copy()
+
+    def upscale_directory(self, in_dir, out_dir, progress_callback=None, cancel_event=None,
+                          poll_callback=None):
+        """
+        Upscale every image in in_dir x4 with one run of the binary (the model
+        loads once), writing <stem>.png files to out_dir. Blocks until done;
+        raises UpscaleCancelled like upscale().
+
+        The percentages the binary prints are per tile of the current file
+        (a single-tile image only ever reports 0%), so they don't say when a
+        file is finished. poll_callback() is called every CANCEL_POLL seconds
+        while the binary runs, for the caller to watch out_dir instead.
+        """
+        cancel_event = self._register(cancel_event)
+        try:
+            self._check_files()
+            self._run(self.command(in_dir, out_dir), progress_callback, cancel_event, poll_callback)
+        finally:
+            self._unregister(cancel_event)
+
+    def _run(self, cmd, progress_callback, cancel_event, poll_callback=None):
+        """Run the binary, streaming its stderr for progress, until done or cancel_event is set."""
+        if cancel_event.is_set():
+            raise UpscaleCancelled()
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+        tail = []  # Last stderr lines, for error messages
+
+        def read_stderr():
+            for raw in iter(proc.stderr.readline, b""):
+                line = raw.decode("utf-8", "replace").strip()
+                if not line:
+                    continue
+                tail.append(line)
+                del tail[:-20]
+                match = _PROGRESS_RE.search(line)
+                if match and progress_callback:
+                    progress_callback(min(100.0, float(match.group(1))))
+
+        reader = threading.Thread(target=read_stderr, daemon=True)
+        reader.start()
+        try:
+            while proc.poll() is None:
+                if cancel_event.wait(CANCEL_POLL):
+                    proc.terminate()
+                    break
+                if poll_callback:
+                    poll_callback()
+            returncode = proc.wait()
+        finally:
+            reader.join()
+            proc.stderr.close()
+
+        if cancel_event.is_set():
+            raise UpscaleCancelled()
+        if returncode != 0:
+            # Capture stderr for better debugging
+            error_msg = "\n".join(tail) if tail else f"exit code {returncode}"
+            raise RuntimeError(f"AI Engine failed: {error_msg}")
+
+    def upscale_async(self, pil_image, progress_callback=None):
+        """Start upscale() on a background thread; returns a concurrent.futures.Future."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        # Registered now, so cancel() reaches the job even before it starts
+        cancel_event = self._register(None)
+        return self._executor.submit(self.upscale, pil_image, progress_callback, cancel_event)
+
+    def cancel(self):
+        """Stop every submitted upscale, running or waiting; each raises UpscaleCancelled."""
+        with self._lock:
+            for event in self._active:
+                event.set()
+
+    def _register(self, cancel_event):
+        cancel_event = cancel_event or threading.Event()
+        with self._lock:
+            self._active.add(cancel_event)
+        return cancel_event
+
+    def _unregister(self, cancel_event):
+        with self._lock:
+            self._active.discard(cancel_event)
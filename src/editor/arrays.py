@@ -0,0 +1,19 @@
+import os
+
+try:
+    import numpy as np
+except ImportError:  # Optional: tables are built in pure Python instead
+    np = None
+
+# NumPy is optional. Filters use it to precompute tables with vectorized
+# math (HSL samples its 3D LUT this way) and fall back to pure Python, which
+# gives the same table more slowly, when it's missing. Pixels themselves are
+# always processed by PIL in C.
+#
+# Set PAINIMAGE_NO_NUMPY=1 (or USE_NUMPY = False) to force the fallbacks.
+
+USE_NUMPY = np is not None and not os.environ.get("PAINIMAGE_NO_NUMPY")
+
+
+def enabled():
+    return USE_NUMPY
@@ -0,0 +1,280 @@
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from PIL import Image
+
+from editor import tiled
+from editor.editor_core import EditorCore
+
+# Headless batch runner. Never imports Qt, so it runs on servers and in cron:
+#
+#   cd src
+#   python -m editor.batch recipe.json "photos/*.jpg" -o out/ --workers 8
+#
+# A recipe is a JSON list of steps (or {"steps": [...]}), applied in order:
+#
+#   [
+#     {"filter": "Brightness", "params": {"delta": 20}},
+#     {"filter": "Vignette & Noise", "params": {"vignette_amount": 40, ...}},
+#     {"tool": "Resize Image", "params": {"width": 1920, "height": 1080}},
+#     {"tool": "Convert Format", "params": {"fmt": "WEBP"}}
+#   ]
+#
+# Consecutive filters run as one fused chain, exactly like a slider commit.
+# A tool exposing encode(img, **params) -> (bytes, format) (Compress to Size)
+# writes its encoded bytes directly when it is the last step, so the output
+# file really has the requested size.
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp", ".tif", ".tiff")
+SAVE_FORMATS = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp"}
+
+_filters = None
+_tools = None
+
+
+def load_recipe(path):
+    with open(path, "r", encoding="utf-8") as f:
+        recipe = json.load(f)
+    steps = recipe["steps"] if isinstance(recipe, dict) else recipe
+    for step in steps:
+        if ("filter" in step) == ("tool" in step):
+            raise ValueError(f"Recipe step needs exactly one of 'filter' or 'tool': {step}")
+    return steps
+
+
+def collect_inputs(patterns, recursive=False):
+    """
+    Expand globs and directories into (path, relative output name) pairs.
+    Files keep their sub-path under the directory, or under the fixed part of
+    the glob ("photos/**/*.jpg" -> relative to photos/). Names that would
+    still write the same output (same stem from two patterns, or a.jpg next
+    to a.jpeg) get a numeric suffix.
+    """
+    inputs = []
+    seen = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, dirs, files in os.walk(pattern):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(IMAGE_EXTENSIONS):
+                        path = os.path.join(root, name)
+                        inputs.append((path, os.path.relpath(path, pattern)))
+                if not recursive:
+                    break
+        else:
+            root = _glob_root(pattern)
+            for path in sorted(glob.glob(pattern, recursive=recursive)):
+                if os.path.isfile(path):
+                    inputs.append((path, os.path.relpath(path, root)))
+
+    unique = []
+    stems = set()
+    for path, rel in inputs:
+        key = os.path.abspath(path)
+        if key in seen:
+            continue
+        seen.add(key)
+        # The output extension comes from the format, so only the stem counts
+        stem, ext = os.path.splitext(rel)
+        candidate, n = stem, 1
+        while os.path.normcase(candidate) in stems:
+            n += 1
+            candidate = f"{stem}_{n}"
+        stems.add(os.path.normcase(candidate))
+        unique.append((path, candidate + ext))
+    return unique
+
+
+def _glob_root(pattern):
+    """The leading directories of a glob pattern that contain no wildcards."""
+    parts = []
+    for part in os.path.dirname(pattern).replace("\\", "/").split("/"):
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return "/".join(parts) or "."
+
+
+# -------------------------
+# Worker
+# -------------------------
+def _init_worker():
+    global _filters, _tools
+    _filters = EditorCore.load_filters()
+    _tools = EditorCore.load_tools()
+
+
+def process_file(path, rel, steps, out_dir, quality=90):
+    """Run the recipe on one file. Returns a result dict (never raises)."""
+    if _filters is None:
+        _init_worker()
+
+    start = time.perf_counter()
+    result = {"input": path, "output": None, "ok": False, "error": None,
+              "ms": 0.0, "pixels": 0, "in_bytes": 0, "out_bytes": 0}
+    try:
+        result["in_bytes"] = os.path.getsize(path)
+        with Image.open(path) as raw_img:
+            # Same format handling as EditorCore.load_image
+            fmt = raw_img.format if raw_img.format else "PNG"
+            if fmt == "MPO": fmt = "JPEG"
+            img = raw_img.convert("RGB")
+        result["pixels"] = img.width * img.height
+
+        encoded = None
+        pending = []  # Consecutive filters, run as one chain
+        for i, step in enumerate(steps):
+            params = step.get("params", {})
+            if "filter" in step:
+                if step["filter"] not in _filters:
+                    raise ValueError(f"Unknown filter: {step['filter']}")
+                pending.append((step["filter"], params))
+                continue
+
+            if pending:
+                # One process per file already keeps every core busy
+                img = tiled.run_chain(img, _filters, pending, workers=1)
+                pending = []
+            if step["tool"] not in _tools:
+                raise ValueError(f"Unknown tool: {step['tool']}")
+            module = _tools[step["tool"]]
+            if i == len(steps) - 1 and hasattr(module, "encode"):
+                encoded, fmt = module.encode(img, **params)
+                break
+            img = module.run(img, **params)
+            # Capture the format if the tool set it (primarily for Convert)
+            if getattr(img, "format", None):
+                fmt = img.format
+        if pending:
+            img = tiled.run_chain(img, _filters, pending, workers=1)
+
+        fmt = fmt if fmt in SAVE_FORMATS else "PNG"
+        out_path = os.path.join(out_dir, os.path.splitext(rel)[0] + SAVE_FORMATS[fmt])
+        os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+        if encoded is not None:
+            with open(out_path, "wb") as f:
+                f.write(encoded)
+        elif fmt == "JPEG":
+            img.save(out_path, format="JPEG", quality=quality)
+        else:
+            img.save(out_path, format=fmt)
+
+        result["output"] = out_path
+        result["out_bytes"] = os.path.getsize(out_path)
+        result["ok"] = True
+    except Exception as e:
+        result["error"] = str(e)
+    result["ms"] = (time.perf_counter() - start) * 1000
+    return result
+
+
+# -------------------------
+# Runner
+# -------------------------
+def run_batch(inputs, steps, out_dir, workers=None, max_inflight=None,
+              quality=90, on_result=None):
+    """
+    Process (path, rel) pairs across a process pool.
+
+    At most `max_inflight` files (default 2 per worker) are submitted at a
+    time and workers are recycled periodically, so memory stays bounded no
+    matter how many files are queued. Returns (results, summary).
+    """
+    workers = workers or tiled.default_workers()
+    max_inflight = max_inflight or workers * 2
+    os.makedirs(out_dir, exist_ok=True)
+
+    results = []
+    start = time.perf_counter()
+    queue = iter(inputs)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             max_tasks_per_child=100) as pool:
+        running = set()
+        while True:
+            while len(running) < max_inflight:
+                item = next(queue, None)
+                if item is None:
+                    break
+                running.add(pool.submit(process_file, item[0], item[1], steps, out_dir, quality))
+            if not running:
+                break
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                res = future.result()
+                results.append(res)
+                if on_result:
+                    on_result(res)
+    elapsed = time.perf_counter() - start
+
+    ok = [r for r in results if r["ok"]]
+    megapixels = sum(r["pixels"] for r in ok) / 1_000_000
+    summary = {
+        "files": len(results),
+        "ok": len(ok),
+        "failed": len(results) - len(ok),
+        "seconds": elapsed,
+        "files_per_sec": len(ok) / elapsed if elapsed else 0.0,
+        "megapixels_per_sec": megapixels / elapsed if elapsed else 0.0,
+        "in_bytes": sum(r["in_bytes"] for r in ok),
+        "out_bytes": sum(r["out_bytes"] for r in ok),
+        "workers": workers,
+    }
+    return results, summary
+
+
+def _print_result(res):
+    name = os.path.basename(res["input"])
+    if res["ok"]:
+        print(f"[ok]   {name}  {res['ms']:8.1f} ms  "
+              f"{res['in_bytes'] / 1024:8.0f} KB -> {res['out_bytes'] / 1024:8.0f} KB")
+    else:
+        print(f"[fail] {name}  {res['ms']:8.1f} ms  {res['error']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m editor.batch",
+                                     description="Apply a recipe of filters and tools to many images.")
+    parser.add_argument("recipe", help="JSON recipe file")
+    parser.add_argument("inputs", nargs="+", help="Image files, globs or directories")
+    parser.add_argument("-o", "--output", required=True, help="Output directory")
+    parser.add_argument("-r", "--recursive", action="store_true", help="Recurse into directories / ** globs")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--max-inflight", type=int, default=None,
+                        help="Files held in memory at once (default: 2 per worker)")
+    parser.add_argument("--quality", type=int, default=90, help="JPEG quality for saved files")
+    parser.add_argument("--report", help="Write per-file results and the summary as JSON")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only print the summary")
+    args = parser.parse_args(argv)
+
+    try:
+        steps = load_recipe(args.recipe)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Invalid recipe: {e}")
+        return 2
+    inputs = collect_inputs(args.inputs, args.recursive)
+    if not inputs:
+        print("No input images found.")
+        return 1
+
+    results, summary = run_batch(inputs, steps, args.output, args.workers, args.max_inflight,
+                                 args.quality, on_result=None if args.quiet else _print_result)
+
+    print(f"\n{summary['ok']}/{summary['files']} files in {summary['seconds']:.2f} s "
+          f"({summary['files_per_sec']:.2f} files/s, {summary['megapixels_per_sec']:.1f} MP/s, "
+          f"{summary['workers']} workers)")
+    if summary["failed"]:
+        print(f"{summary['failed']} failed")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "files": results}, f, indent=2)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,29 @@
 import sys
 import os
-import importlib
 import tempfile
 import shutil
-import io
 import atexit
 from PIL import Image
+from editor import encoding, plugins, tiled
+from editor.large_image import LARGE_IMAGE_PIXELS, open_image, shared_copy
+from editor.history import DeltaHistoryStore
+from editor.pyramid import build_pyramid, select_level, DEFAULT_PREVIEW_DIM
+from editor.stage_cache import StageCache
+from editor.size_estimator import SizeEstimator
+
+
+VIEWPORT_MARGIN = 128  # Extra full-res pixels rendered around the viewport
+
+
+def _expand_box(box, margin, size):
+    left, top, right, bottom = box
+    return (max(0, left - margin), max(0, top - margin),
+            min(size[0], right + margin), min(size[1], bottom + margin))
+
+
+def _box_contains(outer, inner):
+    return (outer[0] <= inner[0] and outer[1] <= inner[1]
+            and outer[2] >= inner[2] and outer[3] >= inner[3])
 
 
 def resource_path(relative_path):
@@ -19,8 +37,9 @@ def resource_path(relative_path):
 
 class EditorCore:
 
-    def __init__(self, max_history=15):
+    def __init__(self, max_history=50, workers=None, history_store=None):
         self.max_history = max_history
+        self.workers = workers              # Threads for full-res commits (None = all cores)
         self.history = []
         self.redo_stack = []
         self.action_log = ["Start"]  # Tracks descriptions of actions
@@ -35,16 +54,26 @@ class EditorCore:
         self.current_image: Image.Image = None  # PREVIEW / DISPLAY IMAGE
         self.preview_base_image = None
         self.preview_proxy = None
+        self.preview_pyramid = []           # 256/512/1024/2048/full levels of original_image
+        self.preview_dim = DEFAULT_PREVIEW_DIM  # Pixels the view needs along the longest side
+        self.preview_viewport = None        # Visible (l, t, r, b) of original_image, set by the view
+        self._preview_detail = None         # (box, image, for_current_image) full-res viewport render
+        self._stage_cache = StageCache()    # Per-stage preview results for the active proxy
         self.in_preview = False
         self.current_format = "PNG"         # DEFAULT FORMAT
+        self.size_estimator = SizeEstimator()  # Background "Approx. Size" for the status bar
+        self.large_image_pixels = LARGE_IMAGE_PIXELS  # Above this, load_image maps the base to a file
 
-        # Disk-backed history setup
+        # History snapshots live in a pluggable store (compressed tile deltas in RAM
+        # by default, spilling to the temp dir once over budget).
+        # Entries are (key, slider_state).
         self._temp_dir = tempfile.mkdtemp(prefix="painimage_history_")
-        self._history_counter = 0
+        self._store = history_store or DeltaHistoryStore(self._temp_dir)
         atexit.register(self._cleanup_temp_dir)
 
     def _cleanup_temp_dir(self):
         """Cleanup temporary history files."""
+        self._store.clear()
         if hasattr(self, "_temp_dir") and os.path.exists(self._temp_dir):
             shutil.rmtree(self._temp_dir, ignore_errors=True)
 
@@ -52,20 +81,20 @@ class EditorCore:
     # Load image
     # -------------------------
     def load_image(self, path):
-        raw_img = Image.open(path)
+        # Large images are decoded into a memory-mapped file (see large_image.py)
+        img, fmt, reduced = open_image(path, self._temp_dir, self.large_image_pixels)
         # Capture the original format before conversion
-        self.current_format = raw_img.format if raw_img.format else "PNG"
+        self.current_format = fmt if fmt else "PNG"
         if self.current_format == "MPO": self.current_format = "JPEG" # Handle MPO (3D JPEG)
-        
-        img = raw_img.convert("RGB")
 
+        # The three states share one pixel buffer copy-on-write until edited
         self.current_path = path             # STORE CURRENT PATH
-        self.initial_image = img.copy()       # Store true original
-        self.original_image = img.copy()
-        self.current_image = img.copy()
+        self.initial_image = img             # Store true original
+        self.original_image = shared_copy(img)
+        self.current_image = shared_copy(img)
 
         # Create proxy for smooth previews
-        self.preview_proxy = self._create_proxy(self.original_image)
+        self.preview_proxy = self._create_proxy(self.original_image, reduced)
 
         self.history.clear()
         self.redo_stack.clear()
@@ -78,13 +107,8 @@ class EditorCore:
         self._initial_slider_state = {} 
         self._last_size_kb = 0
 
-        # Clear disk history
-        if os.path.exists(self._temp_dir):
-            for f in os.listdir(self._temp_dir):
-                try:
-                    os.remove(os.path.join(self._temp_dir, f))
-                except OSError:
-                    pass
+        # Drop stored snapshots
+        self._store.clear()
 
     def save_auto(self):
         """
@@ -105,120 +129,88 @@ class EditorCore:
 
         # Save using the same logic as get_image_info for consistency
         try:
-            # We use quality=90 for consistency with estimation logic
-            if fmt == "JPEG":
-                self.current_image.save(new_path, format="JPEG", quality=90)
-            else:
-                self.current_image.save(new_path, format=fmt)
+            # We use quality=90 for consistency with estimation logic, unless a
+            # tool (Compress to Size) already produced the bytes for this image
+            encoding.save(self.current_image, new_path, fmt, quality=90)
             
             return new_path
         except Exception as e:
             print(f"Auto-save failed: {e}")
             return None
 
-    def _create_proxy(self, image):
-        """Create a low-res proxy for smooth slider previews."""
-        # Target max dimension of 1024px for the proxy (performance sweet spot)
-        max_dim = 1024
-        w, h = image.size
-        if w > max_dim or h > max_dim:
-            scale = max_dim / max(w, h)
-            # BOX resampling is much faster for downscaling than BILINEAR while maintaining quality
-            return image.resize((int(w * scale), int(h * scale)), Image.Resampling.BOX)
-        return image.copy()
-
-    def _save_to_temp(self, image):
-        """Save a PIL image to temp disk and return path."""
-        self._history_counter += 1
-        path = os.path.join(self._temp_dir, f"state_{self._history_counter}.png")
-        image.save(path, format="PNG")
-        return path
-
-    # -------------------------
-    # Filter Loader
-    # -------------------------
-    def load_filters(self):
-        filters = {}
-        filters_path = os.path.join(os.path.dirname(__file__), "filters")
-
-        if not os.path.exists(filters_path):
-            # fallback to resource_path for frozen apps
-            filters_path = resource_path("editor/filters")
-            if not os.path.exists(filters_path):
-                return filters
-
-        for file in os.listdir(filters_path):
-            if file.endswith(".py") and file != "__init__.py":
-                try:
-                    module_name = f"editor.filters.{file[:-3]}"
-                    module = importlib.import_module(module_name)
-
-                    filter_name = getattr(module, "FILTER_NAME", file[:-3])
-                    filters[filter_name] = module
-                except Exception as e:
-                    print(f"Error loading filter {file}: {e}")
+    def _create_proxy(self, image, reduced=None):
+        """Build the preview pyramid for a new base image and return the active level."""
+        self._stage_cache.clear()
+        self.preview_pyramid = build_pyramid(image, reduced=reduced)
+        return select_level(self.preview_pyramid, self.preview_dim)
 
-        return filters
-
-    # -------------------------
-    # Tool Loader
-    # -------------------------
-    def load_tools(self):
-        tools = {}
-        tools_path = os.path.join(os.path.dirname(__file__), "tools")
-
-        if not os.path.exists(tools_path):
-            # fallback
-            tools_path = resource_path("editor/tools")
-            if not os.path.exists(tools_path):
-                return tools
+    def set_preview_view(self, max_dim, viewport=None):
+        """
+        Tell the core what the view displays: the image's longest side in
+        device pixels and the visible (left, top, right, bottom) box in
+        original_image coordinates. Picks the matching pyramid level and
+        returns True if previews should be re-rendered.
+        """
+        self.preview_dim = max(1, int(max_dim))
+        self.preview_viewport = viewport
+        if not self.preview_pyramid:
+            return False
 
-        for file in os.listdir(tools_path):
-            if file.endswith(".py") and file != "__init__.py":
-                try:
-                    module_name = f"editor.tools.{file[:-3]}"
-                    module = importlib.import_module(module_name)
+        level = select_level(self.preview_pyramid, self.preview_dim)
+        if self._detail_mode():
+            # Zoomed past the largest proxy: keep it as the backdrop and render
+            # only the visible area at full resolution (see apply_preview_filters)
+            level = self.preview_pyramid[-2]
+            detail = self.get_preview_detail()
+            if detail is None or not _box_contains(detail[0], viewport):
+                self.preview_proxy = level
+                return True
+
+        if level is self.preview_proxy:
+            return False
+        self.preview_proxy = level
+        return True
 
-                    tool_name = getattr(module, "TOOL_NAME", file[:-3])
-                    tools[tool_name] = module
-                except Exception as e:
-                    print(f"Error loading tool {file}: {e}")
+    def _detail_mode(self):
+        return (len(self.preview_pyramid) > 1 and self.preview_viewport is not None
+                and self.preview_dim > max(self.preview_pyramid[-2].size))
 
-        return tools
+    def get_preview_detail(self):
+        """Return (box, image) rendered at full resolution for the current preview, or None."""
+        detail = self._preview_detail
+        if detail is None or detail[2] is not self.current_image:
+            return None
+        return detail[0], detail[1]
 
     # -------------------------
-    # AI Feature Loader
+    # Plugin Loaders
     # -------------------------
-    def load_ai_features(self):
-        features = {}
-        ai_path = os.path.join(os.path.dirname(__file__), "ai_features")
-
-        if not os.path.exists(ai_path):
-            # fallback
-            ai_path = resource_path("editor/ai_features")
-            if not os.path.exists(ai_path):
-                return features
-
-        for folder in os.listdir(ai_path):
-            try:
-                dir_path = os.path.join(ai_path, folder)
-                if not os.path.isdir(dir_path):
-                    continue
-
-                feature_file = os.path.join(dir_path, "feature.py")
-                if not os.path.exists(feature_file):
-                    continue
+    # Modules are listed from a cached manifest and imported on first use
+    # (see editor/plugins.py); the registries behave like read-only dicts.
+    @staticmethod
+    def _plugin_path(kind):
+        path = os.path.join(os.path.dirname(__file__), kind)
+        if not os.path.exists(path):
+            # fallback to resource_path for frozen apps
+            path = resource_path(f"editor/{kind}")
+        return path
 
-                module_name = f"editor.ai_features.{folder}.feature"
-                module = importlib.import_module(module_name)
+    @staticmethod
+    def load_filters():
+        return plugins.load_registry(EditorCore._plugin_path("filters"), "editor.filters",
+                                     "filters", plugins.META_FILTER)
 
-                name = getattr(module, "AI_NAME", folder)
-                cls = getattr(module, "AI_CLASS")
-                features[name] = cls()
-            except Exception as e:
-                print(f"Error loading AI feature {folder}: {e}")
+    @staticmethod
+    def load_tools():
+        return plugins.load_registry(EditorCore._plugin_path("tools"), "editor.tools",
+                                     "tools", plugins.META_TOOL)
 
-        return features
+    @staticmethod
+    def load_ai_features():
+        # Features are constructed on first use, so the Upscaler's model
+        # manager and engine aren't built before the window appears
+        return plugins.load_registry(EditorCore._plugin_path("ai_features"), "editor.ai_features",
+                                     "ai_features", plugins.META_AI)
 
     # =====================================================
     # DESTRUCTIVE FILTERS (BUTTON FILTERS)
@@ -230,14 +222,9 @@ class EditorCore:
         # Build-in push history for destructive filters
         self.push_history(slider_state=slider_state, description=name)
 
-        module = self.filters[name]
-
-        if kwargs:
-            self.original_image = module.run(self.original_image, **kwargs)
-        else:
-            self.original_image = module.run(self.original_image)
+        self.original_image = tiled.run_chain(self.original_image, self.filters, [(name, kwargs)], self.workers)
 
-        self.current_image = self.original_image.copy()
+        self.current_image = shared_copy(self.original_image)
         # Update proxy after destructive change
         self.preview_proxy = self._create_proxy(self.original_image)
         return True
@@ -263,40 +250,39 @@ class EditorCore:
         self.push_history(description=name)
 
         module = self.tools[name]
-        result = module.run(self.current_image.copy(), **kwargs)
+        result = module.run(shared_copy(self.current_image), **kwargs)
 
         if result is not None:
             # Capture the format if the tool set it (primarily for Convert)
             if hasattr(result, "format") and result.format:
                 self.current_format = result.format
                 
-            self.original_image = result.copy()
-            self.current_image = self.original_image.copy()
+            self.original_image = shared_copy(result)
+            self.current_image = shared_copy(self.original_image)
             # Update proxy after tool application
             self.preview_proxy = self._create_proxy(self.original_image)
             return self.current_image
         
         return None
 
-    def push_history(self, slider_state=None, description="Edit"):
+    def push_history(self, slider_state=None, description="Edit", parametric=False):
+        """
+        Record the state to return to on undo.
+        parametric=True marks a step that only changes slider_state (the base
+        image is untouched), so no snapshot is stored: the key is None.
+        """
         if self.original_image:
-            # Save image to disk instead of memory
-            path = self._save_to_temp(self.original_image)
-            state = (path, slider_state.copy() if slider_state else {})
+            key = None if parametric else self._store.put(self.original_image)
+            state = (key, slider_state.copy() if slider_state else {})
             self.history.append(state)
             
             if len(self.history) > self.max_history:
-                old_path, _ = self.history.pop(0)
-                if os.path.exists(old_path):
-                    os.remove(old_path)
+                old_key, _ = self.history.pop(0)
+                self._discard_snapshot(old_key)
             
-            # Clear redo stack and its files
-            for old_redo_path, _ in self.redo_stack:
-                if os.path.exists(old_redo_path):
-                    try:
-                        os.remove(old_redo_path)
-                    except OSError:
-                        pass
+            # Clear redo stack and its snapshots
+            for old_redo_key, _ in self.redo_stack:
+                self._discard_snapshot(old_redo_key)
             self.redo_stack.clear()
             
             # Update action log
@@ -319,6 +305,7 @@ class EditorCore:
             return False
 
         module = self.filters[name]
+        (_, kwargs), = self.scaled_filter_list([(name, kwargs)], self.preview_proxy)
         self.current_image = module.run(self.preview_proxy.copy(), **kwargs)
         return True
 
@@ -326,15 +313,55 @@ class EditorCore:
         """Apply multiple preview filters in a chain starting from proxy."""
         if not self.in_preview or self.preview_proxy is None:
             return False
-            
-        img = self.preview_proxy.copy()
-        for name, kwargs in filter_list:
-            if name in self.filters:
-                img = self.filters[name].run(img, **kwargs)
-        
-        self.current_image = img
+
+        self.show_preview(*self.render_preview(filter_list))
         return True
 
+    def render_preview(self, filter_list):
+        """
+        Compute a preview without changing editor state, so it can run off
+        the GUI thread. Returns (image, detail, proxy) where detail is a
+        full-res (box, image) patch or None, and proxy is the level it was
+        rendered from (compare with preview_proxy to detect stale results).
+        """
+        proxy = self.preview_proxy
+        if self._detail_mode():
+            # Render the visible area (plus a margin for panning) at full
+            # resolution; the proxy run doubles as the backdrop and the source
+            # of whole-image statistics
+            box = _expand_box(self.preview_viewport, VIEWPORT_MARGIN, self.original_image.size)
+            detail, image = tiled.run_chain_region(
+                self.original_image, self.filters, filter_list, box, proxy,
+                self.scaled_filter_list(filter_list, proxy))
+            return image, ((box, detail) if detail is not None else None), proxy
+
+        # Point/matrix filters are folded into as few passes as possible, and
+        # stages before the slider that moved are reused from the cache
+        proxy_list = self.scaled_filter_list(filter_list, proxy)
+        return self._stage_cache.run(proxy, self.filters, proxy_list), None, proxy
+
+    def scaled_filter_list(self, filter_list, image):
+        """
+        filter_list for rendering on `image`, a downscaled copy of the base:
+        params declared with "unit": "px" (e.g. a blur radius) are scaled so
+        the preview looks like the full-resolution result.
+        """
+        if image is None or self.original_image is None or image.width == self.original_image.width:
+            return filter_list
+        scale = image.width / self.original_image.width
+        scaled = []
+        for name, kwargs in filter_list:
+            # Unknown names (stale slider state) pass through; compile_chain skips them
+            spec = getattr(self.filters.get(name), "PARAMS", {})
+            pixels = {k: v * scale for k, v in kwargs.items() if spec.get(k, {}).get("unit") == "px"}
+            scaled.append((name, dict(kwargs, **pixels)) if pixels else (name, kwargs))
+        return scaled
+
+    def show_preview(self, image, detail=None, proxy=None):
+        """Make a result of render_preview the current preview image."""
+        self.current_image = image
+        self._preview_detail = (detail[0], detail[1], image) if detail is not None else None
+
     def commit_preview(self, filter_list=None, slider_state=None, description="Apply Adjustments"):
         """Permanently apply current preview state to history."""
         if not self.in_preview or self.original_image is None:
@@ -342,17 +369,15 @@ class EditorCore:
             
         # Re-apply filters to FULL RESOLUTION image before commit
         if filter_list:
-            img = self.original_image.copy()
-            for name, kwargs in filter_list:
-                if name in self.filters:
-                    img = self.filters[name].run(img, **kwargs)
+            # Large images are split into strips and rendered on all cores
+            img = tiled.run_chain(self.original_image, self.filters, filter_list, self.workers)
             self.push_history(slider_state, description=description)
             self.original_image = img
         else:
             self.push_history(slider_state, description=description)
-            self.original_image = self.current_image.copy()
+            self.original_image = shared_copy(self.current_image)
 
-        self.current_image = self.original_image.copy()
+        self.current_image = shared_copy(self.original_image)
         self.preview_proxy = self._create_proxy(self.original_image)
         self.in_preview = False
         return True
@@ -364,20 +389,7 @@ class EditorCore:
         if not self.history:
             return None
 
-        # Save current state to redo stack
-        path = self._save_to_temp(self.original_image)
-        current_state = (path, current_slider_state.copy() if current_slider_state else {})
-        self.redo_stack.append(current_state)
-
-        # Restore previous state from disk
-        path, slider_state = self.history.pop()
-        image = Image.open(path)
-        self.original_image = image.copy()
-        self.current_image = image.copy()
-        image.close()
-        # Regenerate proxy so sliders apply to the correct base
-        self.preview_proxy = self._create_proxy(self.original_image)
-
+        slider_state = self._restore(self.history, self.redo_stack, current_slider_state)
         self.action_index -= 1
         return slider_state
 
@@ -385,23 +397,51 @@ class EditorCore:
         if not self.redo_stack:
             return None
 
-        # Save current state to history
-        path = self._save_to_temp(self.original_image)
-        current_state = (path, current_slider_state.copy() if current_slider_state else {})
-        self.history.append(current_state)
-
-        # Restore next state from disk
-        path, slider_state = self.redo_stack.pop()
-        image = Image.open(path)
-        self.original_image = image.copy()
-        self.current_image = image.copy()
-        image.close()
+        slider_state = self._restore(self.redo_stack, self.history, current_slider_state)
+        self.action_index += 1
+        return slider_state
+
+    def _restore(self, source, target, current_slider_state):
+        """Pop a state from `source`, saving the current one onto `target`."""
+        key, slider_state = source.pop()
+        current_sliders = current_slider_state.copy() if current_slider_state else {}
+
+        if key is None:
+            # Parametric step: the base image is the same on both sides,
+            # so only slider states move between the stacks (no image I/O)
+            target.append((None, current_sliders))
+            self.current_image = shared_copy(self.original_image)
+            return slider_state
+
+        # Save current state, then restore the stored one
+        target.append((self._store.put(self.original_image), current_sliders))
+        self.original_image = self._store.get(key)
+        self.current_image = shared_copy(self.original_image)
+        self._store.discard(key)
         # Regenerate proxy so sliders apply to the correct base
         self.preview_proxy = self._create_proxy(self.original_image)
-
-        self.action_index += 1
         return slider_state
 
+    def _discard_snapshot(self, key):
+        if key is not None:
+            self._store.discard(key)
+
+    def request_size_estimate(self):
+        """
+        Queue a background estimate of the saved size of current_image.
+        Results arrive through size_estimator.callback(size_bytes, exact).
+        """
+        if self.current_image is None:
+            return
+        fmt = self.current_format if self.current_format in ["JPEG", "PNG", "WEBP"] else "PNG"
+        reference = None
+        proxy = self.preview_proxy
+        if (proxy is not None and proxy is not self.original_image
+                and self.current_image.size == proxy.size):
+            # Proxy-resolution preview: scale by the full/proxy ratio of the base
+            reference = (self.original_image, proxy)
+        self.size_estimator.request(self.current_image, fmt, reference)
+
     def get_image_info(self, estimate_size=False):
         """Return basic info about the current image."""
         if self.current_image is None:
@@ -418,13 +458,11 @@ class EditorCore:
         if estimate_size:
             # Estimate size if possible - EXPENSIVE OPERATION
             try:
-                buffer = io.BytesIO()
                 fmt = info["format"] if info["format"] in ["JPEG", "PNG", "WEBP"] else "PNG"
-                if fmt == "JPEG":
-                    self.current_image.save(buffer, format="JPEG", quality=90)
-                else:
-                    self.current_image.save(buffer, format=fmt)
-                info["size_kb"] = buffer.getbuffer().nbytes // 1024
+                data = encoding.lookup(self.current_image, fmt)
+                if data is None:
+                    data = encoding.encode(self.current_image, fmt, 90 if fmt == "JPEG" else None)
+                info["size_kb"] = len(data) // 1024
                 self._last_size_kb = info["size_kb"]
             except:
                 pass
@@ -0,0 +1,367 @@
+import io
+import os
+import math
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageChops, ImageStat
+
+# Shared encoding helpers for the compression tools, the savers and the
+# size estimator. Kept outside editor/tools so the plugin loader doesn't
+# mistake it for a tool.
+
+SAMPLE_TILE = 64            # Multiple of 16: tiles never split a JPEG MCU / WebP macroblock
+SAMPLE_TILES = 64           # Tiles in the mosaic (~260k pixels)
+MODEL_MIN_PIXELS = 1_000_000  # Smaller images are cheap enough to search directly
+SAMPLE_QUALITIES = (5, 15, 30, 50, 65, 75, 85, 90, 95)
+
+
+def encode(img, fmt, quality=None, **opts):
+    """Encode img to bytes; quality is ignored for PNG."""
+    buffer = io.BytesIO()
+    if quality is not None and fmt != "PNG":
+        opts["quality"] = quality
+    img.save(buffer, format=fmt, **opts)
+    return buffer.getvalue()
+
+
+def save(img, path, fmt, quality=90):
+    """Save img, reusing bytes already encoded for it (e.g. by Compress to Size)."""
+    data = lookup(img, fmt)
+    if data is not None:
+        with open(path, "wb") as f:
+            f.write(data)
+    elif fmt == "JPEG":
+        img.save(path, format=fmt, quality=quality)
+    else:
+        img.save(path, format=fmt)
+
+
+# -------------------------
+# Sampled-tile mosaic
+# -------------------------
+def sample_mosaic(img, tiles=SAMPLE_TILES, tile=SAMPLE_TILE):
+    """
+    Paste `tiles` evenly spread, MCU-aligned tiles into one small image.
+    JPEG and WebP code each block independently (bar DC prediction), so the
+    mosaic's bytes per pixel track the full image's closely. Returns
+    (mosaic, full_pixels / mosaic_pixels).
+    """
+    width, height = img.size
+    cols = max(1, min(int(math.sqrt(tiles * width / height) + 0.5), width // tile))
+    rows = max(1, min(-(-tiles // cols), height // tile))
+    xs = [int((i + 0.5) * width / cols - tile / 2) // 16 * 16 for i in range(cols)]
+    ys = [int((j + 0.5) * height / rows - tile / 2) // 16 * 16 for j in range(rows)]
+
+    mosaic = Image.new(img.mode, (cols * tile, rows * tile))
+    for j, y in enumerate(ys):
+        for i, x in enumerate(xs):
+            x = min(max(0, x), width - tile)
+            y = min(max(0, y), height - tile)
+            mosaic.paste(img.crop((x, y, x + tile, y + tile)), (i * tile, j * tile))
+    return mosaic, (width * height) / (mosaic.width * mosaic.height)
+
+
+def predict_sizes(img, fmt, qualities=SAMPLE_QUALITIES, **opts):
+    """
+    Estimate full-size encoded bytes at each quality from the sample mosaic.
+    Returns {quality: bytes}; per-file overhead (headers, tables) is measured
+    on a tiny image and counted once rather than scaled with the pixels.
+    """
+    mosaic, ratio = sample_mosaic(img)
+    tiny = img.crop((0, 0, 16, 16))
+    return {q: _scaled_size(tiny, mosaic, ratio, fmt, q, opts) for q in qualities}
+
+
+def estimate_size(img, fmt, quality=None, **opts):
+    """Encoded bytes of img at one quality, predicted from the sample mosaic."""
+    mosaic, ratio = sample_mosaic(img)
+    return _scaled_size(img.crop((0, 0, 16, 16)), mosaic, ratio, fmt, quality, opts)
+
+
+def _scaled_size(tiny, mosaic, ratio, fmt, quality, opts):
+    header = len(encode(tiny, fmt, quality, **opts))
+    body = max(0, len(encode(mosaic, fmt, quality, **opts)) - header)
+    return header + body * ratio
+
+
+def interpolate(sizes, low, high):
+    """Fill in every integer quality in [low, high], linear in log-bytes between samples."""
+    points = sorted(sizes.items())
+    curve = {}
+    for q in range(low, high + 1):
+        if q <= points[0][0]:
+            curve[q] = points[0][1]
+        elif q >= points[-1][0]:
+            curve[q] = points[-1][1]
+        else:
+            for (q0, b0), (q1, b1) in zip(points, points[1:]):
+                if q0 <= q <= q1:
+                    t = (q - q0) / (q1 - q0)
+                    curve[q] = math.exp(math.log(max(b0, 1)) * (1 - t) + math.log(max(b1, 1)) * t)
+                    break
+    return curve
+
+
+def _best_quality(curve, target_bytes, scale=1.0):
+    fitting = [q for q, b in curve.items() if b * scale <= target_bytes]
+    return max(fitting) if fitting else min(curve)
+
+
+# -------------------------
+# Target-size solver
+# -------------------------
+def fit_quality(img, target_bytes, fmt="JPEG", low=5, high=95, fallback=10, **opts):
+    """
+    Find (nearly) the highest quality whose encoding fits target_bytes.
+
+    Large images fit a size-vs-quality curve on a sampled-tile mosaic,
+    predict the quality, and confirm with full encodes: normally two (one
+    at the prediction, one after rescaling the curve by the observed
+    error). If the model is off, a binary search on the remaining range
+    finishes the job. Returns (data, quality, full_encodes); data is the
+    encoding at `fallback` quality if nothing fits.
+    """
+    results = {}  # quality -> bytes from full encodes
+
+    def full(q):
+        if q not in results:
+            results[q] = encode(img, fmt, q, **opts)
+        return len(results[q])
+
+    if img.width * img.height >= MODEL_MIN_PIXELS:
+        curve = interpolate(predict_sizes(img, fmt, **opts), low, high)
+        q = _best_quality(curve, target_bytes)
+        size = full(q)
+        scale = size / curve[q]
+        q2 = _best_quality(curve, target_bytes, scale)
+        if size <= target_bytes:
+            # Probe upwards: the rescaled prediction, or at least one step
+            q2 = max(q2, q + 1)
+            if q2 <= high:
+                full(q2)
+            low = high + 1  # Done: best of q / q2
+        else:
+            q2 = min(q2, q - 1)
+            if q2 >= low and full(q2) <= target_bytes:
+                low = high + 1
+            else:
+                high = min(high, q2 - 1)
+
+    # Binary search for the highest quality that fits inside target_bytes
+    while low <= high:
+        mid = (low + high) // 2
+        if full(mid) <= target_bytes:
+            low = mid + 1
+        else:
+            high = mid - 1
+
+    fitting = [q for q, data in results.items() if len(data) <= target_bytes]
+    if fitting:
+        best = max(fitting)
+        return results[best], best, len(results)
+    full(fallback)
+    return results[fallback], fallback, len(results)
+
+
+# -------------------------
+# Multi-format optimizer
+# -------------------------
+# Candidate encoder families: (format, fixed save options, searches quality)
+CANDIDATES = (
+    ("JPEG", {"subsampling": 2}, True),     # 4:2:0
+    ("JPEG", {"subsampling": 0}, True),     # 4:4:4, better for text and sharp colour edges
+    ("WEBP", {"method": 4}, True),
+    ("WEBP", {"method": 6}, True),          # Slower, a few percent smaller
+    ("PNG", {"colors": 256}, False),
+    ("PNG", {"colors": 64}, False),
+    ("PNG", {"colors": None}, False),       # Lossless
+)
+
+
+def psnr(a, b):
+    """Peak signal-to-noise ratio of b against a, in dB (inf if identical)."""
+    diff = ImageChops.difference(a.convert("RGB"), b.convert("RGB"))
+    mse = sum(ImageStat.Stat(diff).sum2) / (3 * a.width * a.height)
+    return float("inf") if mse == 0 else 10 * math.log10(255 * 255 / mse)
+
+
+def decode(data):
+    img = Image.open(io.BytesIO(data))
+    img.load()
+    return img
+
+
+def _encode_png(img, colors):
+    if colors:
+        img = img.quantize(colors, method=Image.Quantize.FASTOCTREE)
+    return encode(img, "PNG")
+
+
+def _png_hopeless(img, colors, target_bytes, min_psnr):
+    """
+    Screen a PNG candidate on the sample mosaic. PNG of a photo is often
+    several times over budget, and a full quantize + deflate costs far
+    more than every lossy candidate together. Returns (est_bytes, est_psnr)
+    if it clearly can't meet the constraints, else None.
+    """
+    if img.width * img.height < MODEL_MIN_PIXELS:
+        return None
+    mosaic, ratio = sample_mosaic(img)
+    data = _encode_png(mosaic, colors)
+    est_bytes = len(data) * ratio
+    est_psnr = psnr(mosaic, decode(data))
+    if ((target_bytes is not None and est_bytes > target_bytes * 1.5)
+            or (min_psnr is not None and est_psnr < min_psnr - 1)):
+        return est_bytes, est_psnr
+    return None
+
+
+def _lowest_quality_for(img, fmt, min_psnr, low=5, high=95, **opts):
+    """Binary search on the sample mosaic for the lowest quality reaching min_psnr."""
+    mosaic, _ = sample_mosaic(img) if img.width * img.height >= MODEL_MIN_PIXELS else (img, 1)
+    while low < high:
+        mid = (low + high) // 2
+        if psnr(mosaic, decode(encode(mosaic, fmt, mid, **opts))) >= min_psnr:
+            high = mid
+        else:
+            low = mid + 1
+    return low
+
+
+def _run_candidate(img, fmt, opts, searches_quality, target_bytes, min_psnr):
+    result = {"format": fmt, "options": dict(opts), "quality": None,
+              "bytes": None, "psnr": None, "ok": False, "data": None, "estimated": False}
+    if fmt == "PNG":
+        hopeless = _png_hopeless(img, opts.get("colors"), target_bytes, min_psnr)
+        if hopeless:
+            result["bytes"], result["psnr"] = hopeless
+            result["estimated"] = True
+            return result
+        data = _encode_png(img, opts.get("colors"))
+    elif min_psnr is not None:
+        # Mosaic picks the quality; full encodes confirm, stepping up if short
+        q = _lowest_quality_for(img, fmt, min_psnr, **opts)
+        for q in range(q, min(q + 4, 96)):
+            data = encode(img, fmt, q, **opts)
+            if psnr(img, decode(data)) >= min_psnr:
+                break
+        result["quality"] = q
+    else:
+        data, q, _ = fit_quality(img, target_bytes, fmt, **opts)
+        result["quality"] = q
+
+    result["data"] = data
+    result["bytes"] = len(data)
+    result["psnr"] = psnr(img, decode(data))
+    result["ok"] = ((target_bytes is None or len(data) <= target_bytes)
+                    and (min_psnr is None or result["psnr"] >= min_psnr))
+    return result
+
+
+def optimize_size(img, target_bytes=None, min_psnr=None, formats=("JPEG", "WEBP", "PNG"), workers=None):
+    """
+    Try every candidate encoder family in `formats` in parallel.
+
+    With min_psnr, each family finds its smallest output at or above that
+    quality floor (and within target_bytes, if given); the smallest wins.
+    With only target_bytes, each family fits the target and the candidate
+    with the highest PSNR wins, i.e. the best image at that size.
+
+    Returns (best, candidates) where each candidate is a dict with format,
+    options, quality, bytes, psnr, ok, data and estimated (PNG candidates
+    ruled out on the sample mosaic are never fully encoded); best is None
+    if nothing met the constraints.
+    """
+    if target_bytes is None and min_psnr is None:
+        raise ValueError("optimize_size needs target_bytes and/or min_psnr")
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+
+    jobs = [c for c in CANDIDATES if c[0] in formats]
+    workers = workers or max(1, min(len(jobs), os.cpu_count() or 1))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        candidates = list(pool.map(
+            lambda c: _run_candidate(img, c[0], c[1], c[2], target_bytes, min_psnr), jobs))
+
+    passing = [c for c in candidates if c["ok"]]
+    if not passing:
+        return None, candidates
+    if min_psnr is not None:
+        best = min(passing, key=lambda c: c["bytes"])
+    else:
+        best = max(passing, key=lambda c: (c["psnr"], -c["bytes"]))
+    return best, candidates
+
+
+def format_report(candidates, best=None):
+    """Candidate table as printable lines."""
+    lines = [f"{'format':<6} {'options':<18} {'quality':>7} {'KB':>9} {'PSNR':>7}"]
+    for c in sorted(candidates, key=lambda c: c["bytes"]):
+        opts = ",".join(f"{k}={v}" for k, v in c["options"].items())
+        quality = "-" if c["quality"] is None else str(c["quality"])
+        mark = " *" if c is best else ("" if c["ok"] else " (miss)")
+        if c["estimated"]:
+            mark += " (estimated from samples)"
+        lines.append(f"{c['format']:<6} {opts:<18} {quality:>7} {c['bytes'] / 1024:9.1f} "
+                     f"{c['psnr']:7.2f}{mark}")
+    return lines
+
+
+# -------------------------
+# Encoded-bytes cache
+# -------------------------
+# Tools that encode (Compress to Size) remember their bytes so saving the
+# result writes them as-is instead of re-encoding at a different quality.
+# Keyed on pixel content, so copies of the image still hit.
+
+_CACHE_SIZE = 8
+_cache = OrderedDict()   # (content_key, fmt) -> bytes
+_cache_lock = threading.Lock()
+
+
+def content_key(img):
+    digest = hashlib.blake2b(img.tobytes(), digest_size=16).hexdigest()
+    return f"{img.mode}:{img.width}x{img.height}:{digest}"
+
+
+def remember(img, data, fmt, key=None):
+    key = (key or content_key(img), fmt)
+    with _cache_lock:
+        _cache[key] = data
+        _cache.move_to_end(key)
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def lookup(img, fmt, key=None):
+    with _cache_lock:
+        if not _cache:
+            return None
+    key = (key or content_key(img), fmt)
+    with _cache_lock:
+        data = _cache.get(key)
+        if data is not None:
+            _cache.move_to_end(key)
+        return data
+
+
+if __name__ == "__main__":
+    # python -m editor.encoding <image> [target_kb] [min_psnr]
+    import sys
+    import time
+
+    if len(sys.argv) < 3:
+        print("usage: python -m editor.encoding <image> <target_kb|-> [min_psnr]")
+        sys.exit(2)
+    with Image.open(sys.argv[1]) as src:
+        image = src.convert("RGB")
+    target = None if sys.argv[2] == "-" else int(sys.argv[2]) * 1024
+    floor = float(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    start = time.perf_counter()
+    winner, tried = optimize_size(image, target, floor)
+    print(f"{image.width}x{image.height}, {(time.perf_counter() - start) * 1000:.0f} ms")
+    for line in format_report(tried, winner):
+        print(line)
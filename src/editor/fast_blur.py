@@ -0,0 +1,113 @@
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageFilter
+
+from editor.tiled import split_strips, default_workers, TILED_MIN_PIXELS
+
+# Gaussian blur whose cost doesn't grow with the radius.
+#
+# Pillow's GaussianBlur is already a running-sum box approximation, so its
+# cost per pixel is flat in the radius; what's left to save is pixels. Past
+# DIRECT_RADIUS the image is reduced by a power of two, blurred there with a
+# radius of ~REDUCED_RADIUS and smoothed back up. At that size the reduce
+# and upsample steps are too soft to see next to the blur itself, and their
+# own spread is taken out of the reduced radius.
+#
+# The upsample (the only full-resolution step) runs in horizontal strips on
+# a thread pool; each strip resamples its box of the same reduced image, so
+# strips are seamless.
+
+DIRECT_RADIUS = 16    # Up to this radius blur at full resolution
+REDUCED_RADIUS = 8    # Radius to aim for on the reduced image
+
+
+def reduction_for(radius):
+    """Power-of-two reduction factor used for `radius` (1 = blur directly)."""
+    factor = 1
+    if radius > DIRECT_RADIUS:
+        while radius / (factor * 2) >= REDUCED_RADIUS:
+            factor *= 2
+    return factor
+
+
+def halo(radius):
+    """Rows of context a strip needs for a direct blur of `radius`."""
+    return int(math.ceil(radius * 3))
+
+
+def gaussian_blur(img, radius, workers=None):
+    if radius <= 0:
+        return img.copy()
+    factor = reduction_for(radius)
+    if factor == 1:
+        return img.filter(ImageFilter.GaussianBlur(radius))
+
+    width, height = img.size
+    small = img.reduce(factor)
+    # Box reduce and bilinear upsample each spread the result a little
+    # (variance f^2/12 and f^2/6); remove that from the blur itself
+    small_radius = math.sqrt(max(0.25, (radius / factor) ** 2 - 0.25))
+    small = small.filter(ImageFilter.GaussianBlur(small_radius))
+
+    def upsample(strip):
+        top, bottom = strip
+        box = (0, top / factor, width / factor, bottom / factor)
+        return small.resize((width, bottom - top), Image.Resampling.BILINEAR, box=box)
+
+    workers = workers or default_workers()
+    if workers == 1 or width * height < TILED_MIN_PIXELS:
+        return upsample((0, height))
+
+    strips = split_strips(height, workers * 2)
+    out = Image.new(img.mode, (width, height))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for (top, _), tile in zip(strips, pool.map(upsample, strips)):
+            out.paste(tile, (0, top))
+    return out
+
+
+# -------------------------
+# Benchmark
+# -------------------------
+def benchmark(image, radii=(5, 20, 50, 100, 200), repeat=3):
+    """
+    Time gaussian_blur against Pillow's GaussianBlur for each radius.
+    Returns {radius: {"pil_ms", "fast_ms", "max_diff", "mean_diff"}}.
+    """
+    results = {}
+    for radius in radii:
+        def best(fn):
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                out = fn()
+                times.append(time.perf_counter() - start)
+            return min(times) * 1000, out
+
+        pil_ms, exact = best(lambda: image.filter(ImageFilter.GaussianBlur(radius)))
+        fast_ms, fast = best(lambda: gaussian_blur(image, radius))
+        diff = [abs(a - b) for a, b in zip(exact.tobytes(), fast.tobytes())]
+        results[radius] = {
+            "pil_ms": pil_ms,
+            "fast_ms": fast_ms,
+            "max_diff": max(diff),
+            "mean_diff": sum(diff) / len(diff),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    # python -m editor.fast_blur [image_path]
+    import sys
+
+    if len(sys.argv) > 1:
+        bench_img = Image.open(sys.argv[1]).convert("RGB")
+    else:
+        # Smooth gradient stand-in for a photo (~12MP)
+        bench_img = Image.radial_gradient("L").resize((4000, 3000)).convert("RGB")
+
+    print(f"Image: {bench_img.width}x{bench_img.height}")
+    for r, res in benchmark(bench_img).items():
+        print(f"radius {r:>4}: PIL {res['pil_ms']:8.1f} ms  fast {res['fast_ms']:8.1f} ms  "
+              f"diff max {res['max_diff']:3d} mean {res['mean_diff']:.2f}")
@@ -1,4 +1,5 @@
 from PIL import Image, ImageEnhance
+from editor.fusion import blend_lut
 
 FILTER_NAME = "Brightness"
 HAS_PARAMS = True
@@ -16,3 +17,9 @@ def run(img: Image.Image, delta: int = 0) -> Image.Image:
     factor = 1.0 + (delta / 100.0)
     factor = max(0.0, factor)
     return ImageEnhance.Brightness(img).enhance(factor)
+
+
+def lut(delta: int = 0) -> list:
+    """Per-channel LUT equivalent of run(), used by the fused pipeline."""
+    factor = max(0.0, 1.0 + (delta / 100.0))
+    return blend_lut(0, factor)
@@ -1,4 +1,5 @@
 from PIL import Image
+from editor import lut_compiler
 
 FILTER_NAME = "Color Balance"
 HAS_PARAMS = True
@@ -49,3 +50,12 @@ def run(img: Image.Image, red: int = 0, green: int = 0, blue: int = 0) -> Image.
     ]
     
     return img.convert("RGB", matrix=matrix)
+
+
+@lut_compiler.memoized
+def lut(red: int = 0, green: int = 0, blue: int = 0) -> tuple:
+    """Per-channel LUT equivalent of run(), used by the fused pipeline."""
+    table = []
+    for shift in (red, green, blue):
+        table.extend(max(0, min(255, i + shift)) for i in range(256))
+    return table
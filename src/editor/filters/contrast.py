@@ -1,7 +1,9 @@
 from PIL import Image, ImageEnhance
+from editor.fusion import blend_lut, luma_mean
 
 FILTER_NAME = "Contrast"
 HAS_PARAMS = True
+LUT_NEEDS_HISTOGRAM = True  # pivots around the mean luminance
 
 PARAMS = {
     "delta": {
@@ -15,3 +17,10 @@ def run(img: Image.Image, delta: int = 0) -> Image.Image:
     factor = 1.0 + (delta / 100.0)
     factor = max(0.0, factor)
     return ImageEnhance.Contrast(img).enhance(factor)
+
+
+def lut(histogram: list, delta: int = 0) -> list:
+    """Per-channel LUT equivalent of run(), pivoting on the input's mean luminance."""
+    factor = max(0.0, 1.0 + (delta / 100.0))
+    mean = int(luma_mean(histogram) + 0.5)
+    return blend_lut(mean, factor)
@@ -1,5 +1,9 @@
-from PIL import Image
-import math
+import colorsys
+from functools import lru_cache
+from PIL import Image, ImageFilter
+from editor import arrays
+
+LUT_SIZE = 33  # Grid points per axis of the 3D LUT run() applies
 
 FILTER_NAME = "HSL Adjustment"
 HAS_PARAMS = True
@@ -26,121 +30,92 @@ PARAMS = {
 }
 
 def run(img: Image.Image, hue: int = 0, saturation: int = 0, lightness: int = 0) -> Image.Image:
-    # Optimized implementation using Color Matrix
-    # This avoids the slow pixel-by-pixel Python loop
-    
+    # True HSL: rotate the hue, scale the saturation, then blend toward
+    # white or black for lightness. Sampled on a colour grid and applied as a
+    # trilinear 3D LUT: in C that is several times faster than the per-pixel
+    # NumPy math, and within a few levels of it.
     img = img.convert("RGB")
-    
+
     if hue == 0 and saturation == 0 and lightness == 0:
         return img
+    return img.filter(_hsl_lut(hue, saturation, lightness))
+
+
+def run_region(img: Image.Image, box: tuple, full_size: tuple, hue: int = 0,
+               saturation: int = 0, lightness: int = 0) -> Image.Image:
+    """Pixels don't depend on their neighbours, so strips and viewports render alone."""
+    return run(img, hue, saturation, lightness)
+
+
+def _hsl_planes(r, g, b, hue, saturation, lightness):
+    """The HSL adjustment of float32 r, g, b planes (0-1); returns the new planes."""
+    np = arrays.np
+    planes = [r, g, b]
+    if hue != 0 or saturation != 0:
+        high = np.maximum(np.maximum(r, g), b)
+        low = np.minimum(np.minimum(r, g), b)
+        light = (high + low) * 0.5
+        # Half the chroma, which equals S * min(L, 1 - L) in HSL
+        half = (high - low) * 0.5
+        new_half = half
+        if saturation != 0:
+            # Scaling S, capped at S = 1 (the gamut edge for this L)
+            new_half = np.minimum(half * np.float32(_sat_scale(saturation)),
+                                  np.minimum(light, 1.0 - light))
+
+        if hue == 0:
+            # Same hue: every channel moves away from L by the same ratio
+            ratio = np.divide(new_half, half, out=np.zeros_like(half), where=half > 0)
+            planes = [light + (p - light) * ratio for p in planes]
+        else:
+            h = (_hue(r, g, b, high, half * 2.0) + np.float32(hue / 30.0)) % 12.0
+            planes = []
+            for n in (0.0, 8.0, 4.0):
+                k = (h + n) % 12.0
+                planes.append(light - new_half * np.clip(np.minimum(k - 3.0, 9.0 - k), -1.0, 1.0))
+
+    amount = lightness / 100.0
+    if amount > 0:
+        planes = [p + (1.0 - p) * np.float32(amount) for p in planes]
+    elif amount < 0:
+        planes = [p * np.float32(1.0 + amount) for p in planes]
+    return planes
+
+
+def _hue(r, g, b, high, chroma):
+    """HSL hue of every pixel in units of 30 degrees (-2 to 12, callers wrap it); 0 for greys."""
+    np = arrays.np
+    safe = np.where(chroma > 0, chroma, 1.0)
+    sector = np.where(high == r, (g - b) / safe,
+                      np.where(high == g, (b - r) / safe + 2.0, (r - g) / safe + 4.0))
+    return sector * 2.0
+
+
+def _sat_scale(saturation):
+    # -100 -> greyscale, 0 -> unchanged, 100 -> double saturation
+    return max(0.0, 1.0 + saturation / 100.0)
+
+
+@lru_cache(maxsize=8)
+def _hsl_lut(hue, saturation, lightness):
+    """The 3D LUT for run(): sampled with the NumPy math, or colorsys without NumPy."""
+    if arrays.enabled():
+        np = arrays.np
+        # Color3DLUT tables run red fastest, then green, then blue
+        grid = np.linspace(0.0, 1.0, LUT_SIZE, dtype=np.float32)
+        b, g, r = (np.ascontiguousarray(p).ravel() for p in np.meshgrid(grid, grid, grid, indexing="ij"))
+        planes = _hsl_planes(r, g, b, hue, saturation, lightness)
+        table = np.clip(np.stack(planes, axis=-1), 0.0, 1.0)
+        return ImageFilter.Color3DLUT(LUT_SIZE, table.ravel().tolist())
+
+    scale = _sat_scale(saturation)
+    amount = lightness / 100.0
+
+    def transform(r, g, b):
+        h, l, s = colorsys.rgb_to_hls(r, g, b)
+        r, g, b = colorsys.hls_to_rgb((h + hue / 360.0) % 1.0, l, min(1.0, s * scale))
+        if amount > 0:
+            return tuple(c + (1.0 - c) * amount for c in (r, g, b))
+        return tuple(c * (1.0 + amount) for c in (r, g, b))
 
-    # 1. HUE ROTATION Matrix
-    # Rotate around the grey vector (1,1,1)
-    # Cos/Sin of hue angle
-    angle = math.radians(hue)
-    c = math.cos(angle)
-    s = math.sin(angle)
-    
-    # Weights for luminance (approx)
-    lum_r = 0.213
-    lum_g = 0.715
-    lum_b = 0.072
-    
-    # Hue matrix coefficients
-    # https://docs.microsoft.com/en-us/windows/win32/gdiplus/-gdiplus-rotating-colors-use
-    # Simplified approach:
-    # R column
-    m00 = c + (1.0 - c) * lum_r
-    m01 = (1.0 - c) * lum_g - s * lum_b # wait, the math is complex.
-    
-    # Let's use a standard implementation for Hue Rotation matrix
-    # Derived from: http://www.graficaobscura.com/matrix/index.html
-    
-    w = 1.0/3.0 # uniform weights for rotation axis often used, or lum weights
-    # Using 1/3 for pure geometric rotation in RGB cube usually preserves range better for simple usage
-    sq3 = math.sqrt(3) # Not needed if using predetermined coefficients
-    
-    # Actually, let's construct the matrix steps:
-    # M = Lightness * Saturation * Hue
-    
-    # --- Hue Matrix (approximate rotation keeping gray axis fixed) ---
-    # Using approximations for "unweighted" RGB rotation
-    m_hue = [
-        # R output
-        c + (1-c)/3.0,       (1-c)/3.0 - s/math.sqrt(3), (1-c)/3.0 + s/math.sqrt(3), 0,
-        # G output
-        (1-c)/3.0 + s/math.sqrt(3), c + (1-c)/3.0,       (1-c)/3.0 - s/math.sqrt(3), 0,
-        # B output
-        (1-c)/3.0 - s/math.sqrt(3), (1-c)/3.0 + s/math.sqrt(3), c + (1-c)/3.0,       0
-    ]
-    
-    # --- Saturation Matrix ---
-    # Interpolate between Identity and Grayscale
-    # S > 0: linear saturation boost? 
-    # S = -100 (0.0) -> Grayscale. S=0 (1.0) -> Normal. S=100 (2.0) -> Double.
-    sat_scale = 1.0 + (saturation / 100.0)
-    if sat_scale < 0: sat_scale = 0
-    
-    sr = (1 - sat_scale) * lum_r
-    sg = (1 - sat_scale) * lum_g
-    sb = (1 - sat_scale) * lum_b
-    
-    m_sat = [
-        sr + sat_scale, sr, sr, 0,
-        sg, sg + sat_scale, sg, 0,
-        sb, sb, sb + sat_scale, 0
-    ]
-    
-    # --- Lightness (Brightness) Matrix ---
-    # Simply shift or scale
-    # Current implementation in slider was:
-    # l_norm > 0: l + (1-l)*l_norm
-    # This is hard to do with matrix perfectly (it's conditional).
-    # Simple brightness Matrix: Scale * pixel + offset
-    # Let's use simple offset for -100..100 -> -255..255 shift?
-    # Or scale?
-    # Brightness typically adds offset.
-    light_offset = lightness * 2.55 # -255 to 255
-    
-    # Combine Matrices?
-    # PIL convert() takes one matrix. We need to multiply them.
-    # We can chain transforms or multipy matrices in python.
-    # M_total = M_hue * M_sat (approximately)
-    # Lightness is just an offset added to the 4th column of the matrix.
-    
-    def mult(m1, m2):
-        # 4x3 * 4x3 ? 
-        # m1 is applied on (R,G,B,1). 
-        # Treat as 4x4 with last row 0,0,0,1
-        res = [0]*12
-        for r in range(3):
-            for c_idx in range(4):
-                val = 0
-                for k in range(4):
-                    # m1[r, k] * m2[k, c_idx]
-                    # m1 is row-major 3 rows x 4 cols
-                    
-                    # Element from m1 at row r, col k
-                    v1 = m1[r*4 + k]
-                    
-                    # Element from m2 at row k, col c_idx
-                    if k < 3:
-                        v2 = m2[k*4 + c_idx]
-                    else:
-                        # Bottom row of m2 is 0,0,0,1
-                        v2 = 1.0 if c_idx == 3 else 0.0
-                        
-                    val += v1 * v2
-                res[r*4 + c_idx] = val
-        return res
-
-    # Combine Hue and Sat
-    m_final = mult(m_sat, m_hue)
-    
-    # Add Lightness to the offset column (indices 3, 7, 11)
-    # This is a post-transform offset: Output = M*Input + Offset
-    m_final[3] += light_offset
-    m_final[7] += light_offset
-    m_final[11] += light_offset
-    
-    return img.convert("RGB", matrix=m_final)
+    return ImageFilter.Color3DLUT.generate(LUT_SIZE, transform)
@@ -0,0 +1,39 @@
+from PIL import Image
+from editor import lut_compiler
+
+FILTER_NAME = "Tone Curve"
+HAS_PARAMS = True
+
+# Each slider lifts or drops the curve at one input level; 100 moves it
+# by a quarter of the range. The curve is a monotone spline through them.
+CONTROL_POINTS = {
+    "blacks": 0,
+    "shadows": 64,
+    "midtones": 128,
+    "highlights": 192,
+    "whites": 255,
+}
+
+PARAMS = {
+    "blacks": {"min": -100, "max": 100, "default": 0, "label": "Blacks"},
+    "shadows": {"min": -100, "max": 100, "default": 0, "label": "Shadows"},
+    "midtones": {"min": -100, "max": 100, "default": 0, "label": "Midtones"},
+    "highlights": {"min": -100, "max": 100, "default": 0, "label": "Highlights"},
+    "whites": {"min": -100, "max": 100, "default": 0, "label": "Whites"},
+}
+
+
+def run(img: Image.Image, blacks: int = 0, shadows: int = 0, midtones: int = 0,
+        highlights: int = 0, whites: int = 0) -> Image.Image:
+    img = img.convert("RGB")
+    return img.point(lut(blacks, shadows, midtones, highlights, whites))
+
+
+@lut_compiler.memoized
+def lut(blacks: int = 0, shadows: int = 0, midtones: int = 0,
+        highlights: int = 0, whites: int = 0) -> tuple:
+    """768-entry RGB table for the curve (also used by the fused pipeline)."""
+    offsets = (blacks, shadows, midtones, highlights, whites)
+    points = tuple((x, max(0, min(255, x + offset * 0.64)))
+                   for x, offset in zip(CONTROL_POINTS.values(), offsets))
+    return lut_compiler.spline(points) * 3
@@ -1,5 +1,8 @@
-from PIL import Image, ImageDraw, ImageFilter, ImageChops
-import random
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from PIL import Image, ImageDraw, ImageFilter
+from editor import grain
 
 FILTER_NAME = "Vignette & Noise"
 HAS_PARAMS = True
@@ -22,83 +25,129 @@ PARAMS = {
         "max": 100,
         "default": 0,
         "label": "Noise Amount"
+    },
+    "noise_size": {
+        "min": 1,
+        "max": 8,
+        "default": 1,
+        "label": "Grain Size"
+    },
+    "noise_color": {
+        "min": 0,
+        "max": 100,
+        "default": 0,
+        "label": "Grain Color"
     }
 }
 
-def run(img: Image.Image, vignette_amount: int = 0, vignette_radius: int = 50, noise_amount: int = 0) -> Image.Image:
+MASK_SIZE = 256                     # Longest side of the drawn (low-resolution) mask
+SCALED_MASK_PIXELS = 4_000_000      # Upsampled masks up to this size are kept (preview frames)
+SCALED_MASK_CACHE_SIZE = 4
+
+_scaled_masks = OrderedDict()       # (full_size, box, amount, radius) -> L mask for box
+_scaled_masks_lock = threading.Lock()
+
+def run(img: Image.Image, vignette_amount: int = 0, vignette_radius: int = 50, noise_amount: int = 0,
+        noise_size: int = 1, noise_color: int = 0) -> Image.Image:
+    width, height = img.size
+    return run_region(img, (0, 0, width, height), (width, height),
+                      vignette_amount, vignette_radius, noise_amount, noise_size, noise_color)
+
+
+def run_region(img: Image.Image, box: tuple, full_size: tuple, vignette_amount: int = 0,
+               vignette_radius: int = 50, noise_amount: int = 0, noise_size: int = 1,
+               noise_color: int = 0) -> Image.Image:
+    """
+    Render the `box` part of the full-size result (used by the tiled executor).
+    The vignette is always shaped against `full_size` so strips stay seamless.
+    """
     img = img.convert("RGB")
     width, height = img.size
 
     # --- Vignette (Optimized) ---
     if vignette_amount > 0:
-        # Instead of creating a mask at full resolution (e.g., 4K), 
-        # create it at a small fixed size and upscale.
-        # This makes the GaussianBlur constant time regardless of image size.
-        
-        small_w, small_h = 256, 256 # Fixed low resolution for mask
-        
-        # Calculate aspect ratio to keep vignette shape correct
-        aspect = width / height
-        if aspect > 1:
-            draw_w, draw_h = small_w, int(small_w / aspect)
-        else:
-            draw_w, draw_h = int(small_h * aspect), small_h
-            
-        mask = Image.new('L', (draw_w, draw_h), 0)
-        draw = ImageDraw.Draw(mask)
-        
-        c_x, c_y = draw_w // 2, draw_h // 2
-        
-        # Radius logic
-        r_scale = 0.5 + (vignette_radius / 100.0) * 1.5
-        radius_x = draw_w * r_scale * 0.8
-        radius_y = draw_h * r_scale * 0.8
-        
-        draw.ellipse((c_x - radius_x, c_y - radius_y, c_x + radius_x, c_y + radius_y), fill=255)
-        
-        # Blur on small image is fast
-        blur_radius = max(draw_w, draw_h) * 0.2
-        mask = mask.filter(ImageFilter.GaussianBlur(blur_radius))
-        
-        # Lift blacks if needed
-        if vignette_amount < 100:
-            lift = int((100 - vignette_amount) * 2.55)
-            # Apply point transform on small image (fast)
-            mask = mask.point(lambda x: lift + x * (255 - lift) / 255)
-
-        # Upscale mask to full size
-        # BILINEAR is fast and smooth enough for a blurry mask
-        mask = mask.resize((width, height), Image.Resampling.BILINEAR)
-        
+        mask = _region_mask(full_size, box, vignette_amount, vignette_radius)
+
         # Composite
         black_layer = Image.new('RGB', (width, height), (0, 0, 0))
         img = Image.composite(img, black_layer, mask)
 
-    # --- Noise (Optimized) ---
+    # --- Noise ---
+    # Seeded, tiled grain (see editor/grain.py): stable between frames and
+    # seamless across strips, since it's placed in full-image coordinates
     if noise_amount > 0:
-        # Generate noise
-        # Optimization: Generate a smaller noise patch and tile it, 
-        # or use a very fast method.
-        # Actually random.effect_noise is not available.
-        # But generating 1MB of random bytes is fast (1024x1024).
-        # For 4K, it might be 24MB. 
-        # Let's stick to full res generation but check if we can skip if noise_amount is low.
-        
-        alpha = int((noise_amount / 100.0) * 100)
-        if alpha > 0:
-            # We can use a lower resolution noise and scale it up with Nearest neighbor 
-            # to give a "pixelated" grain look which is often stylish, 
-            # reducing generation cost.
-            # Or just generate full res. os.urandom is roughly 200MB/s. 
-            # 4K image (8MP) -> 8MB. Instant.
-            # The slow part might be Image.frombytes overhead or blending.
-            
-            import os
-            noise_data = os.urandom(width * height)
-            noise_img = Image.frombytes('L', (width, height), noise_data)
-            noise_layer = noise_img.convert("RGB")
-            
-            # Blend is fast in C
-            img = Image.blend(img, noise_layer, alpha / 500.0)
+        img = grain.apply(img, box[:2], noise_amount, noise_size, noise_color)
 
     return img
+
+
+def _region_mask(full_size, box, vignette_amount, vignette_radius):
+    """
+    The vignette mask for `box` of an image of full_size: the cached
+    low-resolution mask upsampled over the box. Whole preview frames are
+    cached too, so dragging other sliders doesn't upsample it again.
+    """
+    key = (tuple(full_size), tuple(box), vignette_amount, vignette_radius)
+    with _scaled_masks_lock:
+        cached = _scaled_masks.get(key)
+        if cached is not None:
+            _scaled_masks.move_to_end(key)
+            return cached
+
+    mask = _vignette_mask(_mask_size(full_size), vignette_amount, vignette_radius)
+    # BILINEAR is fast and smooth enough for a blurry mask
+    sx = mask.width / full_size[0]
+    sy = mask.height / full_size[1]
+    left, top, right, bottom = box
+    scaled = mask.resize((right - left, bottom - top), Image.Resampling.BILINEAR,
+                         box=(left * sx, top * sy, right * sx, bottom * sy))
+
+    if scaled.width * scaled.height <= SCALED_MASK_PIXELS:
+        with _scaled_masks_lock:
+            _scaled_masks[key] = scaled
+            while len(_scaled_masks) > SCALED_MASK_CACHE_SIZE:
+                _scaled_masks.popitem(last=False)
+    return scaled
+
+
+def _mask_size(full_size):
+    """
+    Size of the low-resolution mask: MASK_SIZE on the longest side, with the
+    image's aspect. A proxy and the full image share it (and its cache entry).
+    """
+    width, height = full_size
+    aspect = width / height
+    if aspect > 1:
+        return MASK_SIZE, max(1, int(MASK_SIZE / aspect))
+    return max(1, int(MASK_SIZE * aspect)), MASK_SIZE
+
+
+@lru_cache(maxsize=32)
+def _vignette_mask(mask_size, vignette_amount, vignette_radius):
+    """Build the low-resolution vignette mask (cached per size and parameters)."""
+    # Instead of creating a mask at full resolution (e.g., 4K), draw it at a
+    # small fixed size and upscale. This makes the GaussianBlur constant time
+    # regardless of image size.
+    draw_w, draw_h = mask_size
+    mask = Image.new('L', (draw_w, draw_h), 0)
+    draw = ImageDraw.Draw(mask)
+    
+    c_x, c_y = draw_w // 2, draw_h // 2
+    
+    # Radius logic
+    r_scale = 0.5 + (vignette_radius / 100.0) * 1.5
+    radius_x = draw_w * r_scale * 0.8
+    radius_y = draw_h * r_scale * 0.8
+    
+    draw.ellipse((c_x - radius_x, c_y - radius_y, c_x + radius_x, c_y + radius_y), fill=255)
+    
+    # Blur on small image is fast
+    blur_radius = max(draw_w, draw_h) * 0.2
+    mask = mask.filter(ImageFilter.GaussianBlur(blur_radius))
+    
+    # Lift blacks if needed
+    if vignette_amount < 100:
+        lift = int((100 - vignette_amount) * 2.55)
+        mask = mask.point([round(lift + x * (255 - lift) / 255) for x in range(256)])
+
+    return mask
@@ -0,0 +1,207 @@
+import struct
+
+from editor import lut_compiler
+
+# Filters can opt into fusion by exposing one of two module-level hooks:
+#
+#   lut(**params)    -> 768-entry per-channel table (same layout as img.point)
+#   matrix(**params) -> 12-entry 3x4 color matrix (same layout as img.convert)
+#
+# Filters whose LUT depends on image statistics (e.g. Contrast pivots around
+# the mean luminance) set LUT_NEEDS_HISTOGRAM = True and receive the
+# histogram of their input as the `histogram` keyword: 768 RGB entries
+# followed by the 256 entries of its img.convert('L') histogram.
+#
+# Other filters run through run().
+
+
+def _f32(x):
+    """Round a Python float to single precision (matches PIL's C math)."""
+    return struct.unpack("f", struct.pack("f", x))[0]
+
+
+@lut_compiler.memoized
+def blend_lut(pivot, factor):
+    """
+    LUT equivalent of Image.blend(solid(pivot), img, factor).
+    Used by ImageEnhance-style filters (Brightness pivots at 0, Contrast at the mean).
+    """
+    alpha = _f32(factor)
+    lut = []
+    for i in range(256):
+        val = _f32(pivot + _f32(alpha * (i - pivot)))
+        if val <= 0.0:
+            lut.append(0)
+        elif val >= 255.0:
+            lut.append(255)
+        else:
+            lut.append(int(val))
+    return lut * 3
+
+
+def input_histogram(img, lut=None):
+    """The `histogram` a LUT_NEEDS_HISTOGRAM filter gets for img, after lut if given."""
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    if lut is not None:
+        img = img.point(lut)
+    return img.histogram() + img.convert("L").histogram()
+
+
+def luma_mean(histogram):
+    """Mean of img.convert('L'), from the L part of an input_histogram()."""
+    hist = histogram[768:1024]
+    total = sum(hist)
+    if total == 0:
+        return 0.0
+    return sum(i * n for i, n in enumerate(hist)) / total
+
+
+def compose_luts(first, second):
+    """Return a LUT equivalent to applying `first` then `second`."""
+    return _compose(tuple(first), tuple(second))
+
+
+@lut_compiler.memoized
+def _compose(first, second):
+    out = []
+    for c in range(3):
+        base = c * 256
+        out.extend(second[base + first[base + i]] for i in range(256))
+    return out
+
+
+def multiply_matrices(m1, m2):
+    """Return the 3x4 matrix for applying m2 first, then m1."""
+    res = [0.0] * 12
+    for r in range(3):
+        for c in range(4):
+            val = m1[r * 4 + 3] if c == 3 else 0.0
+            for k in range(3):
+                val += m1[r * 4 + k] * m2[k * 4 + c]
+            res[r * 4 + c] = val
+    return res
+
+
+def is_fusable(module):
+    return hasattr(module, "lut") or hasattr(module, "matrix")
+
+
+class FusedPass:
+    """
+    One pass of the compiled chain: pre-LUT -> color matrix -> post-LUT.
+    Each stage is optional. Histogram-dependent LUTs may only sit in the
+    pre-LUT stage, where their input is the pass input through a LUT.
+    """
+
+    def __init__(self):
+        self.pre = []       # [(module, kwargs)]
+        self.matrix = None
+        self.post = []      # [(module, kwargs)]
+        self.sources = []   # [(name, kwargs)] folded into this pass, in order
+
+    @property
+    def needs_histogram(self):
+        return any(getattr(m, "LUT_NEEDS_HISTOGRAM", False) for m, _ in self.pre)
+
+    def accepts(self, module):
+        if hasattr(module, "matrix"):
+            # A matrix can't be moved in front of LUTs already queued after it
+            return not self.post
+        if self.matrix is not None and getattr(module, "LUT_NEEDS_HISTOGRAM", False):
+            # Input histogram after a matrix is unknown without rendering
+            return False
+        return True
+
+    def add(self, module, kwargs):
+        if hasattr(module, "matrix"):
+            m = module.matrix(**kwargs)
+            self.matrix = m if self.matrix is None else multiply_matrices(m, self.matrix)
+        elif self.matrix is None:
+            self.pre.append((module, kwargs))
+        else:
+            self.post.append((module, kwargs))
+
+    def bind(self, image=None):
+        """
+        Resolve the queued filters into concrete (pre_lut, matrix, post_lut).
+        `image` is the pass's input; it's only read if needs_histogram.
+        """
+        pre_lut = self._build(self.pre, image)
+        post_lut = self._build(self.post, None)
+        return pre_lut, self.matrix, post_lut
+
+    @staticmethod
+    def _build(stages, image):
+        combined = None
+        for module, kwargs in stages:
+            if getattr(module, "LUT_NEEDS_HISTOGRAM", False):
+                lut = module.lut(histogram=input_histogram(image, combined), **kwargs)
+            else:
+                lut = module.lut(**kwargs)
+            combined = lut if combined is None else compose_luts(combined, lut)
+        return combined
+
+    def apply(self, img, bound=None):
+        if bound is None:
+            bound = self.bind(img)
+        pre_lut, matrix, post_lut = bound
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        if pre_lut is not None:
+            img = img.point(pre_lut)
+        if matrix is not None:
+            img = img.convert("RGB", matrix=matrix)
+        if post_lut is not None:
+            img = img.point(post_lut)
+        return img
+
+
+class FilterStep:
+    """A filter that can't be folded and runs through its own run()."""
+
+    def __init__(self, module, kwargs):
+        self.module = module
+        self.kwargs = kwargs
+        self.sources = []
+
+    def apply(self, img):
+        return self.module.run(img, **self.kwargs)
+
+
+def compile_chain(filters, filter_list):
+    """
+    Fold a filter_list of (name, kwargs) into as few passes as possible.
+    Consecutive point/matrix filters collapse into one FusedPass; anything
+    else becomes a FilterStep and breaks the fusion.
+    """
+    steps = []
+    current = None
+    for name, kwargs in filter_list:
+        if name not in filters:
+            continue
+        module = filters[name]
+        if not is_fusable(module):
+            current = None
+            steps.append(FilterStep(module, kwargs))
+            steps[-1].sources.append((name, kwargs))
+            continue
+        if current is None or not current.accepts(module):
+            current = FusedPass()
+            steps.append(current)
+        current.add(module, kwargs)
+        current.sources.append((name, kwargs))
+    return steps
+
+
+def run_chain(img, filters, filter_list):
+    """Apply filter_list to img using the fused pipeline. Never returns img itself."""
+    steps = compile_chain(filters, filter_list)
+    if not steps:
+        return img.copy()
+    out = img
+    for step in steps:
+        out = step.apply(out)
+    if out is img:
+        return img.copy()  # A filter can return its input when it's a no-op
+    return out
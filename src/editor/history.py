@@ -0,0 +1,343 @@
+import os
+import time
+import zlib
+from collections import OrderedDict
+from PIL import Image, ImageChops
+
+try:
+    import lz4.frame as lz4_frame  # Optional, noticeably faster than zlib
+except ImportError:
+    lz4_frame = None
+
+
+# History stores turn a PIL image into an opaque key and back:
+#
+#   key = store.put(image)
+#   image = store.get(key)
+#   store.discard(key)
+#
+# EditorCore keeps (key, slider_state) tuples in its history/redo stacks and
+# never looks inside the key.
+
+
+class PngHistoryStore:
+    """Original behaviour: every snapshot is a PNG file in the temp dir."""
+
+    def __init__(self, temp_dir):
+        self.temp_dir = temp_dir
+        self._counter = 0
+
+    def put(self, image):
+        self._counter += 1
+        path = os.path.join(self.temp_dir, f"state_{self._counter}.png")
+        image.save(path, format="PNG")
+        return path
+
+    def get(self, key):
+        with Image.open(key) as image:
+            return image.copy()
+
+    def discard(self, key):
+        try:
+            os.remove(key)
+        except OSError:
+            pass
+
+    def clear(self):
+        if os.path.exists(self.temp_dir):
+            for f in os.listdir(self.temp_dir):
+                self.discard(os.path.join(self.temp_dir, f))
+
+
+class _Snapshot:
+    __slots__ = ("mode", "size", "palette", "codec", "data", "path", "nbytes",
+                 "base", "tiles", "depth", "children", "discarded")
+
+    def __init__(self):
+        self.base = None      # Key this snapshot is a delta against (None = keyframe)
+        self.tiles = None     # [(box, nbytes)] stored in `data` when base is set
+        self.depth = 0        # Deltas between this snapshot and its keyframe
+        self.children = set()
+        self.discarded = False  # Discarded by the caller, kept only as a delta base
+
+
+class MemoryHistoryStore:
+    """
+    Keeps raw pixel buffers in RAM, compressed with LZ4 (if installed) or
+    zlib level 1. Once the compressed total exceeds `budget_bytes`, the
+    least recently used snapshots are spilled to `temp_dir`.
+    """
+
+    def __init__(self, temp_dir, budget_bytes=256 * 1024 * 1024, level=1):
+        self.temp_dir = temp_dir
+        self.budget_bytes = budget_bytes
+        self.level = level
+        self.codec = "lz4" if lz4_frame else "zlib"
+        self.memory_bytes = 0
+        self._snapshots = OrderedDict()  # key -> _Snapshot, oldest access first
+        self._counter = 0
+
+    # -------------------------
+    # Codec
+    # -------------------------
+    def _compress(self, raw):
+        if self.codec == "lz4":
+            return lz4_frame.compress(raw)
+        return zlib.compress(raw, self.level)
+
+    @staticmethod
+    def _decompress(codec, data):
+        if codec == "lz4":
+            return lz4_frame.decompress(data)
+        return zlib.decompress(data)
+
+    # -------------------------
+    # Store API
+    # -------------------------
+    def put(self, image):
+        self._counter += 1
+        key = self._counter
+
+        snap = _Snapshot()
+        snap.mode = image.mode
+        snap.size = image.size
+        snap.palette = image.getpalette() if image.mode in ("P", "PA") else None
+        snap.codec = self.codec
+        snap.data = self._compress(image.tobytes())
+        snap.path = None
+        snap.nbytes = len(snap.data)
+
+        self._snapshots[key] = snap
+        self.memory_bytes += snap.nbytes
+        self._enforce_budget()
+        return key
+
+    def get(self, key):
+        snap = self._snapshots[key]
+        self._snapshots.move_to_end(key)
+
+        image = Image.frombytes(snap.mode, snap.size, self._read(snap))
+        if snap.palette:
+            image.putpalette(snap.palette)
+        return image
+
+    def _read(self, snap):
+        """Return the decompressed payload, from RAM or from the spill file."""
+        data = snap.data
+        if data is None:
+            with open(snap.path, "rb") as f:
+                data = f.read()
+        return self._decompress(snap.codec, data)
+
+    def discard(self, key):
+        snap = self._snapshots.pop(key, None)
+        if snap is None:
+            return
+        if snap.data is not None:
+            self.memory_bytes -= snap.nbytes
+        if snap.path:
+            try:
+                os.remove(snap.path)
+            except OSError:
+                pass
+
+    def clear(self):
+        for key in list(self._snapshots):
+            self.discard(key)
+
+    def _enforce_budget(self):
+        """Spill least recently used snapshots to disk until under budget."""
+        for key, snap in self._snapshots.items():
+            if self.memory_bytes <= self.budget_bytes:
+                break
+            if snap.data is None:
+                continue
+            snap.path = os.path.join(self.temp_dir, f"state_{key}.{snap.codec}")
+            with open(snap.path, "wb") as f:
+                f.write(snap.data)
+            snap.data = None
+            self.memory_bytes -= snap.nbytes
+
+
+class DeltaHistoryStore(MemoryHistoryStore):
+    """
+    Stores each snapshot as a per-tile delta against the previously stored
+    one. Deltas are modulo differences (ImageChops.subtract_modulo), so
+    unchanged tiles are skipped and small slider changes compress to almost
+    nothing. Every `keyframe_interval` steps, or whenever the size or mode
+    changes (crop, resize), a full keyframe is stored to bound the cost of
+    reconstruction.
+
+    A discarded snapshot that later deltas are built on (undo discards the
+    state it restores right after storing the redo state against it) is
+    kept, hidden, until nothing depends on it, so undo/redo never turns
+    deltas back into full keyframes.
+
+    Stored images are kept by reference as the next delta base, so callers
+    must not mutate an image in place after put().
+    """
+
+    def __init__(self, temp_dir, budget_bytes=256 * 1024 * 1024, level=1,
+                 keyframe_interval=10, tile_size=256):
+        super().__init__(temp_dir, budget_bytes, level)
+        self.keyframe_interval = keyframe_interval
+        self.tile_size = tile_size
+        self._last_key = None
+        self._last_image = None
+
+    def put(self, image):
+        base_key = self._last_key
+        base = self._snapshots.get(base_key) if base_key is not None else None
+        if (base is None or base.mode != image.mode or base.size != image.size
+                or base.depth + 1 >= self.keyframe_interval or image.mode not in ("RGB", "RGBA", "L")):
+            key = super().put(image)
+        else:
+            key = self._put_delta(image, base_key, base)
+
+        self._last_key = key
+        self._last_image = image
+        if base_key is not None:
+            self._release(base_key)  # No longer the next base; free it if discarded
+        return key
+
+    def _put_delta(self, image, base_key, base):
+        diff = ImageChops.subtract_modulo(image, self._last_image)
+        tiles = []
+        chunks = []
+        bbox = diff.getbbox()
+        if bbox:
+            left, top, right, bottom = bbox
+            for y in range(top, bottom, self.tile_size):
+                for x in range(left, right, self.tile_size):
+                    box = (x, y, min(x + self.tile_size, right), min(y + self.tile_size, bottom))
+                    tile = diff.crop(box)
+                    if tile.getbbox() is None:
+                        continue
+                    raw = tile.tobytes()
+                    tiles.append((box, len(raw)))
+                    chunks.append(raw)
+
+        self._counter += 1
+        key = self._counter
+
+        snap = _Snapshot()
+        snap.mode = image.mode
+        snap.size = image.size
+        snap.palette = None
+        snap.codec = self.codec
+        snap.data = self._compress(b"".join(chunks))
+        snap.path = None
+        snap.nbytes = len(snap.data)
+        snap.base = base_key
+        snap.tiles = tiles
+        snap.depth = base.depth + 1
+        base.children.add(key)
+
+        self._snapshots[key] = snap
+        self.memory_bytes += snap.nbytes
+        self._enforce_budget()
+        return key
+
+    def get(self, key):
+        snap = self._snapshots[key]
+        if snap.base is None:
+            return super().get(key)
+
+        self._snapshots.move_to_end(key)
+        image = self.get(snap.base)
+        payload = self._read(snap)
+        offset = 0
+        for box, nbytes in snap.tiles:
+            size = (box[2] - box[0], box[3] - box[1])
+            delta = Image.frombytes(snap.mode, size, payload[offset:offset + nbytes])
+            offset += nbytes
+            image.paste(ImageChops.add_modulo(image.crop(box), delta), box[:2])
+        return image
+
+    def discard(self, key):
+        snap = self._snapshots.get(key)
+        if snap is None:
+            return
+        snap.discarded = True
+        self._release(key)
+
+    def _release(self, key):
+        """Free a discarded snapshot once no delta and no future put() builds on it."""
+        while key is not None:
+            snap = self._snapshots.get(key)
+            if snap is None or not snap.discarded or snap.children or key == self._last_key:
+                return
+            if snap.base is not None and snap.base in self._snapshots:
+                self._snapshots[snap.base].children.discard(key)
+            super().discard(key)
+            key = snap.base  # The base may have been waiting on this one
+
+    def clear(self):
+        # Everything goes, so nothing needs to be kept as a base
+        for key in list(self._snapshots):
+            super().discard(key)
+        self._last_key = None
+        self._last_image = None
+
+
+# -------------------------
+# Benchmark
+# -------------------------
+def benchmark(image, steps=10, budget_bytes=256 * 1024 * 1024):
+    """
+    Time put/get round-trips of `image` through each store.
+    Returns {store_name: {"put_ms", "get_ms", "bytes_per_step"}}.
+    """
+    import tempfile
+    import shutil
+
+    results = {}
+    for name, factory in (
+        ("png", lambda d: PngHistoryStore(d)),
+        ("memory", lambda d: MemoryHistoryStore(d, budget_bytes=budget_bytes)),
+        ("delta", lambda d: DeltaHistoryStore(d, budget_bytes=budget_bytes)),
+    ):
+        temp_dir = tempfile.mkdtemp(prefix="painimage_bench_")
+        try:
+            store = factory(temp_dir)
+            keys = []
+            start = time.perf_counter()
+            for _ in range(steps):
+                keys.append(store.put(image))
+            put_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for key in reversed(keys):
+                store.get(key)
+            get_time = time.perf_counter() - start
+
+            if name == "png":
+                total = sum(os.path.getsize(k) for k in keys)
+            else:
+                total = sum(store._snapshots[k].nbytes for k in keys)
+
+            results[name] = {
+                "put_ms": put_time * 1000 / steps,
+                "get_ms": get_time * 1000 / steps,
+                "bytes_per_step": total // steps,
+            }
+            store.clear()
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    return results
+
+
+if __name__ == "__main__":
+    # python -m editor.history [image_path]
+    import sys
+
+    if len(sys.argv) > 1:
+        bench_img = Image.open(sys.argv[1]).convert("RGB")
+    else:
+        # Smooth gradient stand-in for a photo (~12MP)
+        bench_img = Image.radial_gradient("L").resize((4000, 3000)).convert("RGB")
+
+    print(f"Image: {bench_img.width}x{bench_img.height}")
+    for store_name, r in benchmark(bench_img).items():
+        print(f"{store_name:>6}: put {r['put_ms']:8.1f} ms  get {r['get_ms']:8.1f} ms  "
+              f"{r['bytes_per_step'] / 1024:10.0f} KB/step")
@@ -0,0 +1,100 @@
+import os
+import mmap
+import itertools
+from PIL import Image
+from editor.pyramid import PYRAMID_LEVELS
+
+# Images with more pixels than this are decoded into a memory-mapped file
+# and get their preview levels from a reduced (draft) decode
+LARGE_IMAGE_PIXELS = 40_000_000
+
+# Rows converted at a time when the source isn't already RGB
+STRIP_ROWS = 256
+
+_counter = itertools.count(1)
+
+
+def shared_copy(image):
+    """
+    A copy-on-write copy: a new Image over the same pixel memory. Both are
+    marked read-only, so PIL copies whichever one is modified in place
+    (paste, putpixel, ImageDraw...) before writing to it.
+    """
+    image.load()
+    copy = image._new(image.im)
+    image.readonly = copy.readonly = 1
+    return copy
+
+
+def _draft_size(size, longest):
+    """Smallest (w, h) with the image's aspect whose longest side is `longest`."""
+    scale = longest / max(size)
+    return (max(1, int(size[0] * scale + 0.999)), max(1, int(size[1] * scale + 0.999)))
+
+
+def map_image(image, directory):
+    """
+    Copy image into an RGB image backed by a memory-mapped file in directory.
+
+    The pages belong to the page cache rather than the process heap: the OS
+    can drop them under memory pressure (re-reading from the file) instead of
+    pushing them to swap. The result is read-only; edits produce heap images.
+    Returns None if the image is too big to map in one piece.
+    """
+    image.load()
+    w, h = image.size
+    nbytes = w * h * 4  # PIL keeps RGB pixels padded to four bytes
+    path = os.path.join(directory, f"base_{os.getpid()}_{next(_counter)}.raw")
+    with open(path, "w+b") as f:
+        f.truncate(nbytes)
+        buffer = mmap.mmap(f.fileno(), nbytes)
+    try:
+        os.remove(path)  # The mapping keeps the data; nothing to clean up later
+    except OSError:
+        pass  # Windows: removed with the temp dir
+
+    try:
+        mapped = Image.new("RGB", (0, 0))._new(
+            Image.core.map_buffer(buffer, (w, h), "raw", 0, ("RGB", 0, 1)))
+    except (ValueError, MemoryError, OverflowError):
+        buffer.close()
+        return None
+
+    if image.mode == "RGB":
+        mapped.im.paste(image.im, (0, 0, w, h))
+    else:
+        # Convert a strip at a time so no second full-size copy is made
+        for top in range(0, h, STRIP_ROWS):
+            box = (0, top, w, min(h, top + STRIP_ROWS))
+            mapped.im.paste(image.crop(box).convert("RGB").im, box)
+    mapped.readonly = 1
+    return mapped
+
+
+def open_image(path, directory, large_pixels=LARGE_IMAGE_PIXELS):
+    """
+    Decode path to RGB. Returns (image, format, reduced).
+
+    Large images are decoded into a memory-mapped file (see map_image) and,
+    for JPEGs, decoded a second time at 1/2 to 1/8 scale with draft(): that
+    reduced image is what the preview pyramid is built from, so the full
+    image isn't read for it. reduced is None otherwise.
+    """
+    with Image.open(path) as raw_img:
+        fmt = raw_img.format
+        size = raw_img.size
+        large = size[0] * size[1] > large_pixels
+        if not large:
+            return raw_img.convert("RGB"), fmt, None
+
+        image = map_image(raw_img, directory)
+        if image is None:
+            image = raw_img.convert("RGB")
+
+    reduced = None
+    if fmt in ("JPEG", "MPO"):
+        with Image.open(path) as small:
+            small.draft("RGB", _draft_size(size, max(PYRAMID_LEVELS)))
+            if small.size != size:
+                reduced = small.convert("RGB")
+    return image, fmt, reduced
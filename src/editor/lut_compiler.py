@@ -0,0 +1,104 @@
+from functools import lru_cache, update_wrapper
+
+# Shared builders for the 256-entry tone curves behind point filters.
+#
+# Every builder is memoized per parameter tuple in a bounded LRU, so the
+# same slider position on the next preview frame (or the next file of a
+# batch) returns the cached table instead of rebuilding it. Tables are
+# returned as tuples: they are shared between callers and must not change.
+
+LUT_CACHE_SIZE = 256  # Tables kept per builder
+
+_builders = []
+
+
+def memoized(builder):
+    """Decorator: cache a LUT builder's result, as a tuple, per parameter tuple."""
+    cached = lru_cache(maxsize=LUT_CACHE_SIZE)(lambda *args, **kwargs: tuple(builder(*args, **kwargs)))
+    update_wrapper(cached, builder)
+    _builders.append(cached)
+    return cached
+
+
+def cache_info():
+    """(hits, misses) summed over every memoized builder."""
+    infos = [b.cache_info() for b in _builders]
+    return sum(i.hits for i in infos), sum(i.misses for i in infos)
+
+
+def clear():
+    for builder in _builders:
+        builder.cache_clear()
+
+
+# -------------------------
+# Curves
+# -------------------------
+@memoized
+def levels(shadows=0, midtones=100, highlights=255):
+    """Input black point, gamma (x100) and white point -> 256-entry curve."""
+    if shadows >= highlights:
+        # Avoid division by zero or inversion
+        highlights = shadows + 1
+
+    gamma = midtones / 100.0
+    if gamma <= 0.01: gamma = 0.01
+    inv_gamma = 1.0 / gamma
+
+    table = []
+    for i in range(256):
+        # Map input [shadows, highlights] to [0, 1], apply gamma, scale back
+        val = (i - shadows) / float(highlights - shadows)
+        val = max(0.0, min(1.0, val))
+        table.append(int((val ** inv_gamma) * 255))
+    return table
+
+
+@memoized
+def spline(points):
+    """
+    Monotone cubic (Fritsch-Carlson) curve through ((x, y), ...) control
+    points sorted by x. Unlike a plain cubic spline it never overshoots
+    between points, so a curve never inverts or clips by accident.
+    """
+    xs = [float(x) for x, _ in points]
+    ys = [float(y) for _, y in points]
+    n = len(xs)
+    slopes = [(ys[i + 1] - ys[i]) / (xs[i + 1] - xs[i]) for i in range(n - 1)]
+
+    # Tangents: averaged secants, flattened at local extrema, then limited
+    tangents = [slopes[0]] + [
+        0.0 if slopes[i - 1] * slopes[i] <= 0 else (slopes[i - 1] + slopes[i]) / 2
+        for i in range(1, n - 1)] + [slopes[-1]]
+    for i, slope in enumerate(slopes):
+        if slope == 0:
+            tangents[i] = tangents[i + 1] = 0.0
+            continue
+        a, b = tangents[i] / slope, tangents[i + 1] / slope
+        norm = a * a + b * b
+        if norm > 9:
+            scale = 3 / norm ** 0.5
+            tangents[i], tangents[i + 1] = scale * a * slope, scale * b * slope
+
+    table = []
+    seg = 0
+    for x in range(256):
+        if x <= xs[0]:
+            y = ys[0]
+        elif x >= xs[-1]:
+            y = ys[-1]
+        else:
+            while x > xs[seg + 1]:
+                seg += 1
+            h = xs[seg + 1] - xs[seg]
+            t = (x - xs[seg]) / h
+            t2, t3 = t * t, t * t * t
+            y = ((2 * t3 - 3 * t2 + 1) * ys[seg] + (t3 - 2 * t2 + t) * h * tangents[seg]
+                 + (-2 * t3 + 3 * t2) * ys[seg + 1] + (t3 - t2) * h * tangents[seg + 1])
+        table.append(max(0, min(255, int(y + 0.5))))
+    return table
+
+
+def per_channel(red, green, blue):
+    """Concatenate three 256-entry curves into a 768-entry RGB table for img.point."""
+    return red + green + blue
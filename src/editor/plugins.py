@@ -0,0 +1,285 @@
+import os
+import ast
+import sys
+import json
+import time
+import zlib
+import importlib
+import threading
+from collections.abc import Mapping
+
+# Plugins are listed from a manifest of their module-level metadata and only
+# imported when something other than that metadata is first needed:
+#
+#   filters = load_registry(path, "editor.filters", "filters", META_FILTER)
+#   filters["Blur"].HAS_PARAMS     # from the manifest, no import
+#   filters["Blur"].run(img)       # imports editor.filters.blur now
+#
+# Metadata is read with `ast` (no import at all) and cached in a JSON
+# manifest keyed on each file's mtime and size, so a warm start just reads
+# one small file. Modules whose metadata isn't a plain literal, or whose name
+# isn't assigned at the top level, are imported once to read it.
+
+META_FILTER = ("FILTER_NAME", "HAS_PARAMS", "PARAMS")
+META_TOOL = ("TOOL_NAME",)
+META_AI = ("AI_NAME",)
+
+MANIFEST_VERSION = 1
+
+# Seconds spent importing each plugin module, for import_report()
+import_times = {}
+_import_lock = threading.RLock()
+
+
+def cache_dir():
+    return os.environ.get("PAINIMAGE_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "painimage")
+
+
+def timed_import(module_name):
+    """Import a module, recording how long it took."""
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    with _import_lock:
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        import_times.setdefault(module_name, time.perf_counter() - start)
+    return module
+
+
+def read_metadata(path, keys):
+    """
+    Return {key: value} for top-level `KEY = <literal>` (or `KEY: T = <literal>`)
+    assignments in a source file, or None if the module has to be imported to
+    know: a value that isn't a literal, a key bound some other way (unpacking,
+    `+=`, an import), or no name key (keys[0]) at all.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    meta = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            targets, value = node.targets, node.value
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets, value = [node.target], node.value
+        else:
+            if _binds(node, keys):
+                return None
+            continue
+        for target in targets:
+            if isinstance(target, ast.Name):
+                if target.id in keys:
+                    try:
+                        meta[target.id] = ast.literal_eval(value)
+                    except ValueError:
+                        return None
+            elif _binds(target, keys):
+                return None
+    if keys and keys[0] not in meta:
+        return None
+    return meta
+
+
+def _binds(node, keys):
+    """True if a statement or target other than a plain assignment names one of `keys`."""
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        return any((alias.asname or alias.name) in keys or alias.name == "*" for alias in node.names)
+    if isinstance(node, (ast.AugAssign, ast.AnnAssign)):
+        node = node.target
+    return any(isinstance(n, ast.Name) and n.id in keys and isinstance(n.ctx, ast.Store)
+               for n in ast.walk(node))
+
+
+class LazyModule:
+    """Stands in for a plugin module; imports it on the first non-metadata attribute."""
+
+    def __init__(self, module_name, meta, keys=()):
+        self._module_name = module_name
+        self._meta = meta
+        self._keys = keys   # Metadata names; absent ones don't trigger an import
+        self._module = None
+
+    @property
+    def is_loaded(self):
+        return self._module is not None
+
+    def load(self):
+        if self._module is None:
+            self._module = timed_import(self._module_name)
+        return self._module
+
+    def __getattr__(self, attr):
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        meta = self.__dict__.get("_meta", {})
+        if attr in meta:
+            return meta[attr]
+        if attr in self.__dict__.get("_keys", ()):
+            raise AttributeError(attr)
+        return getattr(self.load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "lazy"
+        return f"<LazyModule {self._module_name} ({state})>"
+
+
+class LazyFeature:
+    """Stands in for an AI feature instance; imports and constructs it on first use."""
+
+    def __init__(self, module):
+        self._module = module
+        self._instance = None
+
+    @property
+    def is_loaded(self):
+        return self._instance is not None
+
+    def load(self):
+        if self._instance is None:
+            with _import_lock:
+                if self._instance is None:
+                    self._instance = self._module.AI_CLASS()
+        return self._instance
+
+    def __getattr__(self, attr):
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        return getattr(self.load(), attr)
+
+
+class PluginRegistry(Mapping):
+    """Read-only name -> plugin mapping; iterating never imports anything."""
+
+    def __init__(self, entries):
+        self._entries = entries
+
+    def __getitem__(self, name):
+        return self._entries[name]
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# -------------------------
+# Discovery
+# -------------------------
+def _discover(base_path, package, kind):
+    """Yield (module_name, source_path) for every plugin of `kind` under base_path."""
+    if kind == "ai_features":
+        for folder in sorted(os.listdir(base_path)):
+            feature_file = os.path.join(base_path, folder, "feature.py")
+            if os.path.exists(feature_file):
+                yield f"{package}.{folder}.feature", feature_file
+        return
+    for file in sorted(os.listdir(base_path)):
+        if file.endswith(".py") and file != "__init__.py":
+            yield f"{package}.{file[:-3]}", os.path.join(base_path, file)
+
+
+def _load_manifest(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest.get("modules", {})
+    except (OSError, ValueError):
+        pass
+    return {}
+
+
+def _save_manifest(path, modules):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "modules": modules}, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # A read-only cache just means metadata is parsed again next time
+
+
+def scan(base_path, package, kind, keys, manifest_path=None):
+    """
+    Return [(module_name, meta)] for the plugins under base_path, reusing
+    manifest entries whose file is unchanged.
+    """
+    cached = _load_manifest(manifest_path) if manifest_path else {}
+    modules = {}
+    found = []
+    for module_name, path in _discover(base_path, package, kind):
+        try:
+            st = os.stat(path)
+            stamp = [st.st_mtime_ns, st.st_size]
+            entry = cached.get(module_name)
+            if entry is None or entry.get("stamp") != stamp:
+                meta = read_metadata(path, keys)
+                if meta is None:
+                    # Computed metadata: import once to read it
+                    module = timed_import(module_name)
+                    meta = {k: getattr(module, k) for k in keys if hasattr(module, k)}
+                entry = {"stamp": stamp, "meta": meta}
+            modules[module_name] = entry
+            found.append((module_name, entry["meta"]))
+        except Exception as e:
+            print(f"Error reading plugin {path}: {e}")
+
+    if manifest_path and modules != cached:
+        _save_manifest(manifest_path, modules)
+    return found
+
+
+def load_registry(base_path, package, kind, keys):
+    """
+    Build a PluginRegistry of LazyModules (LazyFeatures for AI features),
+    named by the first metadata key (FILTER_NAME, TOOL_NAME, AI_NAME).
+    """
+    if not os.path.exists(base_path):
+        return PluginRegistry({})
+    # One manifest per install location, so a dev tree and a frozen build don't thrash
+    location = zlib.crc32(os.path.abspath(base_path).encode("utf-8"))
+    manifest_path = os.path.join(cache_dir(), f"manifest_{kind}_{location:08x}.json")
+    entries = {}
+    for module_name, meta in scan(base_path, package, kind, keys, manifest_path):
+        default = module_name.rsplit(".", 2)[-2] if kind == "ai_features" else module_name.rsplit(".", 1)[-1]
+        module = LazyModule(module_name, meta, keys)
+        entries[meta.get(keys[0], default)] = LazyFeature(module) if kind == "ai_features" else module
+    return PluginRegistry(entries)
+
+
+# -------------------------
+# Profiling
+# -------------------------
+def import_report():
+    """Plugin import times, slowest first, as printable lines."""
+    lines = []
+    for name, seconds in sorted(import_times.items(), key=lambda kv: -kv[1]):
+        lines.append(f"{seconds * 1000:8.1f} ms  {name}")
+    return lines
+
+
+if __name__ == "__main__":
+    # python -m editor.plugins : startup cost and per-plugin import cost
+    start = time.perf_counter()
+    from editor.editor_core import EditorCore
+    from editor.plugins import import_times, import_report  # The instance EditorCore uses
+    core_import = time.perf_counter() - start
+
+    start = time.perf_counter()
+    core = EditorCore()
+    init = time.perf_counter() - start
+    print(f"import editor_core: {core_import * 1000:8.1f} ms")
+    print(f"EditorCore():       {init * 1000:8.1f} ms (plugins imported: {len(import_times)})")
+
+    start = time.perf_counter()
+    for registry in (core.filters, core.tools):
+        for plugin in registry.values():
+            plugin.load()
+    for feature in core.ai_features.values():
+        feature.load()
+    print(f"Importing every plugin: {(time.perf_counter() - start) * 1000:8.1f} ms")
+    for line in import_report():
+        print(line)
+    print(f"Qt loaded: {any(m.startswith('PySide6') for m in sys.modules)}")
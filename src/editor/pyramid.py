@@ -0,0 +1,39 @@
+from PIL import Image
+
+# Max dimension of each preview level; the full-resolution image is always
+# the last level.
+PYRAMID_LEVELS = (256, 512, 1024, 2048)
+DEFAULT_PREVIEW_DIM = 1024
+
+
+def build_pyramid(image, levels=PYRAMID_LEVELS, reduced=None):
+    """
+    Build a list of downscaled copies of `image`, smallest first, ending
+    with `image` itself. Each level is BOX-reduced from the next larger one,
+    so the whole pyramid costs little more than the first reduction.
+    reduced: optional smaller decode of the same image (JPEG draft); the
+    first level is reduced from it instead of from the full image.
+    """
+    w, h = image.size
+    longest = max(w, h)
+    targets = [dim for dim in sorted(levels) if dim < longest]
+
+    pyramid = [image]
+    src = image
+    for dim in reversed(targets):
+        scale = dim / max(src.size)
+        size = (max(1, round(src.width * scale)), max(1, round(src.height * scale)))
+        if src is image and reduced is not None and max(reduced.size) >= dim:
+            src = reduced  # Same level size, far fewer pixels to read
+        # BOX resampling is much faster for downscaling than BILINEAR while maintaining quality
+        src = src.resize(size, Image.Resampling.BOX)
+        pyramid.insert(0, src)
+    return pyramid
+
+
+def select_level(pyramid, target_dim):
+    """Return the smallest level whose longest side covers target_dim pixels."""
+    for level in pyramid:
+        if max(level.size) >= target_dim:
+            return level
+    return pyramid[-1]
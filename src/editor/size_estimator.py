@@ -0,0 +1,139 @@
+import threading
+from collections import OrderedDict
+
+from editor import encoding
+
+
+def save_quality(fmt):
+    """Quality the savers use for fmt (see EditorCore.save_auto)."""
+    return 90 if fmt == "JPEG" else None
+
+
+class SizeEstimator:
+    """
+    Estimates the saved file size of an image off the calling thread.
+
+    request() returns immediately; a worker thread first reports a quick
+    estimate from the sampled-tile mosaic (a few ms), then refines it with
+    a full encode. Exact sizes are cached by (content hash, format), so
+    undo/redo and re-showing an image cost one hash. Only the newest
+    request is worked on: older ones are dropped between stages.
+
+    Previews are rendered at proxy resolution, so pass
+    reference=(full_image, proxy_image): the preview's size is scaled by
+    the full/proxy size ratio of the unedited base.
+
+    callback(size_bytes, exact) runs on the worker thread.
+    """
+
+    def __init__(self, callback=None, cache_size=32):
+        self.callback = callback
+        self.cache_size = cache_size
+        self._exact = OrderedDict()   # (content_key, fmt) -> bytes
+        self._pending = None
+        self._generation = 0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._reference = None        # (full, proxy, keys): hash each base only once
+
+    # -------------------------
+    # API
+    # -------------------------
+    def request(self, image, fmt, reference=None):
+        with self._cond:
+            self._generation += 1
+            self._pending = (self._generation, image, fmt, reference)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def cancel(self):
+        with self._cond:
+            self._generation += 1
+            self._pending = None
+
+    def exact_size(self, image, fmt, key=None):
+        """Encoded size of image in fmt, from the cache or by encoding it now."""
+        key = (key or encoding.content_key(image), fmt)
+        size = self._cached(key)
+        if size is None:
+            data = encoding.lookup(image, fmt, key[0])
+            if data is None:
+                data = encoding.encode(image, fmt, save_quality(fmt))
+            size = len(data)
+            with self._cond:
+                self._exact[key] = size
+                while len(self._exact) > self.cache_size:
+                    self._exact.popitem(last=False)
+        return size
+
+    def quick_size(self, image, fmt):
+        """Sampled-tile estimate, or None for images too small to sample."""
+        if image.width * image.height < encoding.MODEL_MIN_PIXELS:
+            return None
+        return encoding.estimate_size(image, fmt, save_quality(fmt))
+
+    # -------------------------
+    # Worker
+    # -------------------------
+    def _cached(self, key):
+        with self._cond:
+            size = self._exact.get(key)
+            if size is not None:
+                self._exact.move_to_end(key)
+            return size
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                job, self._pending = self._pending, None
+            try:
+                self._estimate(*job)
+            except Exception as e:
+                print(f"Size estimate failed: {e}")
+
+    def _current(self, generation):
+        return generation == self._generation
+
+    def _report(self, generation, size, exact):
+        if self.callback and self._current(generation):
+            self.callback(int(size), exact)
+
+    def _estimate(self, generation, image, fmt, reference):
+        key = encoding.content_key(image)
+        ratio = 1.0
+        ratio_known = reference is None
+        if reference is not None:
+            full, proxy = reference
+            ref = self._reference
+            if ref is not None and ref[0] is full and ref[1] is proxy:
+                keys = ref[2]
+            else:
+                keys = (encoding.content_key(full), encoding.content_key(proxy))
+                self._reference = (full, proxy, keys)
+            sizes = (self._cached((keys[0], fmt)), self._cached((keys[1], fmt)))
+            if None not in sizes:
+                ratio, ratio_known = sizes[0] / sizes[1], True
+            else:
+                ratio = (full.width * full.height) / (proxy.width * proxy.height)
+
+        size = self._cached((key, fmt))
+        if size is None:
+            quick = self.quick_size(image, fmt)
+            if quick is not None:
+                self._report(generation, quick * ratio, False)
+            if not self._current(generation):
+                return
+            size = self.exact_size(image, fmt, key)
+        self._report(generation, size * ratio, ratio_known and reference is None)
+
+        if not ratio_known:
+            # Calibrate once per base image; cached for every later preview
+            if not self._current(generation):
+                return
+            full_size = self.exact_size(full, fmt, keys[0])
+            proxy_size = self.exact_size(proxy, fmt, keys[1])
+            self._report(generation, size * full_size / proxy_size, False)
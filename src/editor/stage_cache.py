@@ -0,0 +1,68 @@
+import threading
+from collections import OrderedDict
+
+from editor.fusion import compile_chain
+
+
+def _freeze(kwargs):
+    return tuple(sorted(kwargs.items()))
+
+
+class StageCache:
+    """
+    Memoizes the output of every prefix of a compiled filter chain for one
+    base image (the preview proxy). When only a later slider moves, the
+    chain resumes from the last unchanged stage instead of from the base.
+
+    Entries are keyed by (filter name, params) of the whole prefix; a new
+    base image, or clear(), drops everything. Cached images are shared with
+    callers and must not be modified in place.
+    """
+
+    def __init__(self, max_entries=8):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._base = None
+        self._entries = OrderedDict()  # prefix key -> image
+        self._lock = threading.Lock()  # Renders may run on the preview thread
+
+    def clear(self):
+        with self._lock:
+            self._base = None
+            self._entries.clear()
+
+    def run(self, base, filters, filter_list):
+        steps = compile_chain(filters, filter_list)
+        if not steps:
+            return base.copy()
+
+        keys = []
+        prefix = ()
+        for step in steps:
+            prefix += tuple((name, _freeze(kwargs)) for name, kwargs in step.sources)
+            keys.append(prefix)
+
+        # Resume from the longest prefix already rendered
+        img, start = base, 0
+        with self._lock:
+            if base is not self._base:
+                self._base = base
+                self._entries.clear()
+            for i in range(len(keys) - 1, -1, -1):
+                cached = self._entries.get(keys[i])
+                if cached is not None:
+                    self._entries.move_to_end(keys[i])
+                    img, start = cached, i + 1
+                    break
+            self.hits += start
+            self.misses += len(steps) - start
+
+        for i in range(start, len(steps)):
+            img = steps[i].apply(img)
+            with self._lock:
+                if self._base is base:
+                    self._entries[keys[i]] = img
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+        return img
@@ -0,0 +1,151 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+
+from editor.fusion import compile_chain, run_chain as run_fused, FusedPass, FilterStep
+
+# Filters opt into strip processing through module-level hooks:
+#
+#   HALO = n          Neighborhood filters (e.g. Blur) read n extra pixels
+#                     above and below each strip; the halo is cropped away.
+#   halo(**params)    Same, when the halo depends on the parameters; None
+#                     means the filter runs on the whole image.
+#   run_region(tile, box, full_size, **params)
+#                     Filters that depend on the full image geometry (e.g. the
+#                     vignette mask) render just `box` of the full-size result.
+#
+# Filters with neither hook (flips, rotations) run on the whole image.
+#
+# Pillow releases the GIL inside point/convert/filter/resize, so a thread pool
+# scales across cores without pickling strips to worker processes.
+
+MIN_STRIP_HEIGHT = 64
+TILED_MIN_PIXELS = 4_000_000  # Below ~4MP the thread overhead isn't worth it
+
+
+def default_workers():
+    return max(1, os.cpu_count() or 1)
+
+
+def split_strips(height, count):
+    """Split [0, height) into at most `count` contiguous (top, bottom) bands."""
+    count = max(1, min(count, height // MIN_STRIP_HEIGHT or 1))
+    step = -(-height // count)  # ceil
+    return [(top, min(height, top + step)) for top in range(0, height, step)]
+
+
+class TiledExecutor:
+    """Run a filter chain on horizontal strips in a thread pool and stitch the result."""
+
+    def __init__(self, workers=None, strips_per_worker=2):
+        self.workers = workers or default_workers()
+        self.strips_per_worker = strips_per_worker
+
+    def run_chain(self, img, filters, filter_list):
+        steps = compile_chain(filters, filter_list)
+        if not steps:
+            return img.copy()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for step in steps:
+                img = self._run_step(pool, img, step)
+        return img
+
+    def _run_step(self, pool, img, step):
+        if isinstance(step, FilterStep) and not (
+                hasattr(step.module, "run_region") or step_halo(step) is not None):
+            return step.apply(img)
+
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        width, height = img.size
+        strips = split_strips(height, self.workers * self.strips_per_worker)
+
+        if isinstance(step, FusedPass):
+            # Histogram-dependent LUTs must see the whole image, so bind once up front
+            bound = step.bind(img)
+            work = lambda box: step.apply(img.crop(box), bound)
+        elif hasattr(step.module, "run_region"):
+            module, kwargs = step.module, step.kwargs
+            work = lambda box: module.run_region(img.crop(box), box, img.size, **kwargs)
+        else:
+            module, kwargs, halo = step.module, step.kwargs, step_halo(step)
+
+            def work(box):
+                left, top, right, bottom = box
+                src_top = max(0, top - halo)
+                src_bottom = min(height, bottom + halo)
+                out = module.run(img.crop((left, src_top, right, src_bottom)), **kwargs)
+                return out.crop((0, top - src_top, right - left, bottom - src_top))
+
+        if len(strips) == 1:
+            return work((0, 0, width, height))
+
+        boxes = [(0, top, width, bottom) for top, bottom in strips]
+        out = Image.new("RGB", (width, height))
+        for box, tile in zip(boxes, pool.map(work, boxes)):
+            out.paste(tile, box[:2])
+        return out
+
+
+def step_halo(step):
+    """Halo rows a FilterStep needs to run in strips, or None if it can't."""
+    module = step.module
+    if hasattr(module, "halo"):
+        return module.halo(**step.kwargs)
+    return getattr(module, "HALO", None)
+
+
+def run_chain(img, filters, filter_list, workers=None):
+    """Apply filter_list, going multi-threaded for images above TILED_MIN_PIXELS."""
+    if workers == 1 or img.width * img.height < TILED_MIN_PIXELS:
+        return run_fused(img, filters, filter_list)
+    return TiledExecutor(workers).run_chain(img, filters, filter_list)
+
+
+def run_chain_region(img, filters, filter_list, box, stats_image, stats_list=None):
+    """
+    Render only `box` of the chain at img's full resolution.
+
+    `stats_image` (a downscaled copy of img, normally the preview proxy) is
+    run through the same chain alongside the region and supplies whole-image
+    histograms, so Contrast pivots as it would on the full image.
+    `stats_list` is filter_list with params scaled for stats_image, if they
+    differ (see EditorCore.scaled_filter_list).
+    Returns (region, stats_result); region is None if the chain contains a
+    filter that changes geometry and can't be rendered per region.
+    """
+    steps = compile_chain(filters, filter_list)
+    if not steps:
+        return img.crop(box), stats_image.copy()
+    stats_steps = steps if stats_list is None else compile_chain(filters, stats_list)
+    width, height = img.size
+
+    # Neighborhood filters need their halo from every earlier stage too
+    margin = sum(step_halo(s) or 0 for s in steps if isinstance(s, FilterStep))
+    left, top, right, bottom = box
+    src_box = (max(0, left - margin), max(0, top - margin),
+               min(width, right + margin), min(height, bottom + margin))
+    region = img.crop(src_box)
+
+    for step, stats_step in zip(steps, stats_steps):
+        if isinstance(step, FusedPass):
+            bound = step.bind(stats_image)
+            if region is not None:
+                region = step.apply(region, bound)
+            stats_image = step.apply(stats_image, bound)
+            continue
+
+        if region is not None:
+            if hasattr(step.module, "run_region"):
+                region = step.module.run_region(region, src_box, img.size, **step.kwargs)
+            elif step_halo(step) is not None:
+                region = step.apply(region)
+            else:
+                region = None
+        stats_image = stats_step.apply(stats_image)
+
+    if region is not None:
+        region = region.crop((left - src_box[0], top - src_box[1],
+                              right - src_box[0], bottom - src_box[1]))
+    return region, stats_image
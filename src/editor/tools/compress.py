@@ -1,44 +1,42 @@
 import io
 from PIL import Image
 
+from editor import encoding
+
 TOOL_NAME = "Compress to Size"
 
-def run(img: Image.Image, target_kb: int) -> Image.Image:
+def encode(img: Image.Image, target_kb: int = None, formats=("JPEG",), min_psnr: float = None):
+    """
+    Find the best encoding that fits target_kb (and/or reaches min_psnr dB).
+    With formats=("JPEG",) this is the highest JPEG quality that fits;
+    otherwise JPEG, WebP and PNG candidates are tried in parallel.
+    Returns (encoded bytes, format).
+    """
+    target_bytes = target_kb * 1024 if target_kb else None
+    if tuple(formats) != ("JPEG",) or min_psnr is not None:
+        best, _ = encoding.optimize_size(img, target_bytes, min_psnr, formats)
+        if best is not None:
+            return best["data"], best["format"]
+        if target_bytes is None:
+            # Floor unreachable: keep the least lossy candidate format
+            return encoding.encode(img, "PNG"), "PNG"
+
+    # Quality is predicted from sampled tiles and confirmed with 1-2 full
+    # encodes; small images fall back to a plain binary search
+    data, _, _ = encoding.fit_quality(img, target_bytes, "JPEG")
+    return data, "JPEG"
+
+def run(img: Image.Image, target_kb: int = None, formats=("JPEG",), min_psnr: float = None) -> Image.Image:
     """
-    Compress image to approximate target file size (KB) using Binary Search.
+    Compress image to approximate target file size (KB).
     Returns compressed Image.
     """
-    target_bytes = target_kb * 1024
-    img_format = "JPEG"
-    
-    low = 5
-    high = 95
-    best_quality = 10
-    best_buffer = None
-    
-    # Binary search for the highest quality that fits inside target_bytes
-    for _ in range(7):  # ~7 iterations is enough for 5-95 range
-        if low > high:
-            break
-            
-        mid = (low + high) // 2
-        buffer = io.BytesIO()
-        img.save(buffer, format=img_format, quality=mid)
-        size = buffer.getbuffer().nbytes
-        
-        if size <= target_bytes:
-            best_quality = mid
-            best_buffer = buffer
-            low = mid + 1
-        else:
-            high = mid - 1
-            
-    if best_buffer:
-        best_buffer.seek(0)
-        return Image.open(best_buffer).copy()
-    
-    # Fallback to quality 10 if nothing fit
-    buffer = io.BytesIO()
-    img.save(buffer, format=img_format, quality=10)
-    buffer.seek(0)
-    return Image.open(buffer).copy()
+    data, fmt = encode(img, target_kb, formats, min_psnr)
+    result = Image.open(io.BytesIO(data))
+    result.load()
+    if result.mode != "RGB":
+        result = result.convert("RGB")  # Quantized PNGs decode as palette images
+    # Saving the result writes these exact bytes instead of re-encoding
+    encoding.remember(result, data, fmt)
+    result.format = fmt
+    return result
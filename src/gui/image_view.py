@@ -2,11 +2,15 @@ from PySide6.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsPixmapItem
 from PySide6.QtCore import Qt, Signal, QTimer, QRectF, QPointF
 from PySide6.QtGui import QPixmap, QPainter, QWheelEvent, QMouseEvent
 from PIL import Image
-from utils.image_utils import pil_image_to_qpixmap
+from utils.image_utils import DisplayBuffer
 from gui.crop_item import CropItem
+from gui.tiled_image_item import TiledImageItem
+
+TILED_VIEW_MIN_PIXELS = 4096 * 4096  # Larger images are drawn tile by tile
 
 class ImageView(QGraphicsView):
     request_open = Signal(str)
+    view_changed = Signal()  # Zoom, resize or pan changed what part of the image is visible
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -19,6 +23,21 @@ class ImageView(QGraphicsView):
         self._item = QGraphicsPixmapItem()
         self._item.setTransformationMode(Qt.TransformationMode.SmoothTransformation)
         self.scene.addItem(self._item)
+
+        # Full-resolution render of the visible area, drawn over the proxy when zoomed in
+        self._detail_item = QGraphicsPixmapItem()
+        self._detail_item.setZValue(1)
+        self._detail_item.hide()
+        self.scene.addItem(self._detail_item)
+
+        # Very large images: tiles converted as they scroll into view
+        self._tiled_item = TiledImageItem()
+        self._tiled_item.hide()
+        self.scene.addItem(self._tiled_item)
+
+        # Persistent conversion buffers, so preview frames repaint in place
+        self._buffer = DisplayBuffer()
+        self._detail_buffer = DisplayBuffer()
         
         # Crop Item
         self.crop_item = None
@@ -40,6 +59,10 @@ class ImageView(QGraphicsView):
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
         self.setFrameShape(QGraphicsView.Shape.NoFrame) # No border
 
+        # Panning moves the viewport without a zoom change
+        self.horizontalScrollBar().valueChanged.connect(self.view_changed)
+        self.verticalScrollBar().valueChanged.connect(self.view_changed)
+
         # Placeholder (Overlay Widget)
         self.placeholder = QLabel("Click or drag an image here to open", self)
         self.placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -51,30 +74,56 @@ class ImageView(QGraphicsView):
         
         self.setStyleSheet("background: transparent;")
 
-    def display_image(self, pil_img):
-        """Display the image. Handles high-DPI scaling and proxy previews."""
+    def display_image(self, pil_img, detail=None):
+        """
+        Display the image. Handles high-DPI scaling and proxy previews.
+        detail: optional (box, image) full-resolution patch drawn over the
+        preview at box (original image coordinates).
+        """
         self._current_pil = pil_img
         self._empty = False
         self.placeholder.hide()
         
-        # Convert to Pixmap
-        pix = pil_image_to_qpixmap(pil_img)
-        self._item.setPixmap(pix)
+        # Convert to Pixmap. The item lets go of the old one first so the
+        # buffer repaints it in place instead of detaching a copy.
+        self._item.setPixmap(QPixmap())
+        if pil_img.width * pil_img.height > TILED_VIEW_MIN_PIXELS:
+            # One pixmap of a gigapixel scan would not fit in memory
+            self._buffer.clear()
+            self._tiled_item.set_image(pil_img)
+            self._tiled_item.show()
+            image_item = self._tiled_item
+        else:
+            self._tiled_item.hide()
+            self._tiled_item.clear()
+            self._item.setPixmap(self._buffer.update(pil_img))
+            image_item = self._item
         
         # Handle Proxy Scaling
         self._scale_factor = 1.0
-        if hasattr(self.parent(), "core"):
-            core = self.parent().core
+        # The view is re-parented into the central widget, so look up the core on the window
+        core = getattr(self.window(), "core", None)
+        if core is not None:
             if core.in_preview and core.original_image:
                 orig_w, _ = core.original_image.size
                 if pil_img.width > 0:
                     self._scale_factor = orig_w / pil_img.width
         
-        self._item.setScale(self._scale_factor)
+        image_item.setScale(self._scale_factor)
+
+        if detail is not None:
+            box, detail_img = detail
+            self._detail_item.setPixmap(QPixmap())
+            self._detail_item.setPixmap(self._detail_buffer.update(detail_img))
+            self._detail_item.setPos(box[0], box[1])
+            self._detail_item.show()
+        else:
+            self._detail_item.hide()
+            self._detail_item.setPixmap(QPixmap())
         
         # Update Scene Rect
-        scene_w = pix.width() * self._scale_factor
-        scene_h = pix.height() * self._scale_factor
+        scene_w = pil_img.width * self._scale_factor
+        scene_h = pil_img.height * self._scale_factor
         self.scene.setSceneRect(0, 0, scene_w, scene_h)
         
         # Update Crop Item if active
@@ -84,6 +133,26 @@ class ImageView(QGraphicsView):
         # If we are in "Fit to Window" mode, or this is the first load
         if self._fit_to_window:
             self.fitInView(self.scene.itemsBoundingRect(), Qt.AspectRatioMode.KeepAspectRatio)
+        self._emit_view_changed()
+
+    def _emit_view_changed(self):
+        if not self._empty:
+            self.view_changed.emit()
+
+    def on_screen_dim(self):
+        """Longest side of the image as drawn on screen, in device pixels."""
+        rect = self.scene.sceneRect()
+        return max(rect.width(), rect.height()) * self.transform().m11() * self.devicePixelRatioF()
+
+    def visible_image_box(self):
+        """Visible (left, top, right, bottom) in original image coordinates, or None."""
+        if self._empty:
+            return None
+        rect = self.mapToScene(self.viewport().rect()).boundingRect().intersected(self.scene.sceneRect())
+        if rect.isEmpty():
+            return None
+        return (int(rect.left()), int(rect.top()), int(rect.right()) + 1, int(rect.bottom()) + 1)
+
 
     def start_crop(self):
         """Enable crop mode."""
@@ -97,6 +166,7 @@ class ImageView(QGraphicsView):
         
         scene_rect = self.scene.sceneRect()
         self.crop_item = CropItem(scene_rect)
+        self.crop_item.setZValue(2)  # Above the full-res detail patch
         self.scene.addItem(self.crop_item)
         
         # Disable panning while cropping? Or just let CropItem handle clicks?
@@ -135,6 +205,12 @@ class ImageView(QGraphicsView):
         self._current_pil = None
         self._empty = True
         self._item.setPixmap(QPixmap())
+        self._tiled_item.hide()
+        self._tiled_item.clear()
+        self._detail_item.hide()
+        self._detail_item.setPixmap(QPixmap())
+        self._buffer.clear()
+        self._detail_buffer.clear()
         self.placeholder.show()
         self._fit_to_window = True
         self.resetTransform()
@@ -144,6 +220,7 @@ class ImageView(QGraphicsView):
         self.placeholder.resize(self.width(), self.height())
         if self._fit_to_window and not self._empty:
              self.fitInView(self.scene.itemsBoundingRect(), Qt.AspectRatioMode.KeepAspectRatio)
+             self._emit_view_changed()
 
     def wheelEvent(self, event: QWheelEvent):
         if self._empty: return
@@ -152,6 +229,7 @@ class ImageView(QGraphicsView):
         if event.angleDelta().y() < 0:
             adj = 1.0 / self._zoom_factor
         self.scale(adj, adj)
+        self._emit_view_changed()
 
     def mousePressEvent(self, event: QMouseEvent):
         if self._empty and event.button() == Qt.LeftButton:
@@ -1,6 +1,9 @@
+import threading
 from PySide6.QtWidgets import QMainWindow, QWidget, QHBoxLayout, QToolBar, QStatusBar, QMessageBox
 from PySide6.QtCore import Qt, QThread, Signal
 from editor.editor_core import EditorCore
+from editor import encoding
+from editor.large_image import shared_copy
 
 from gui.topbar import TopBar
 from gui.image_view import ImageView
@@ -28,20 +31,48 @@ class TaskWorker(QThread):
 class UpscaleWorker(QThread):
     finished = Signal(object)
     error = Signal(str)
+    progress = Signal(float)  # percent reported by the engine
 
     def __init__(self, upscaler, image):
         super().__init__()
         self.upscaler = upscaler
         self.image = image
+        # Created with the job, so a cancel before run() starts still counts
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
 
     def run(self):
         try:
-            result = self.upscaler.upscale(self.image)
+            result = self.upscaler.upscale(self.image, progress_callback=self.progress.emit,
+                                           cancel_event=self.cancel_event)
             self.finished.emit(result)
         except Exception as e:
             self.error.emit(str(e))
 
+class UpscaleQueueWorker(QThread):
+    finished = Signal(object)     # queue stats
+    error = Signal(str)
+    job_changed = Signal(object)  # UpscaleJob whose status or progress changed
+
+    def __init__(self, queue):
+        super().__init__()
+        self.queue = queue
+        self.queue.on_job = self.job_changed.emit
+
+    def cancel(self):
+        self.queue.cancel()
+
+    def run(self):
+        try:
+            self.finished.emit(self.queue.run())
+        except Exception as e:
+            self.error.emit(str(e))
+
 class MainWindow(QMainWindow):
+    size_estimated = Signal(int, bool)  # bytes, exact (emitted from the estimator thread)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("PainImage - Modern Editor")
@@ -52,7 +83,14 @@ class MainWindow(QMainWindow):
 
         self.upscaler = self.core.ai_features.get("Upscaler")
 
+        # "Approx. Size" is estimated in the background and filled in when ready
+        self._size_text = "…"
+        self._status_info = None
+        self.size_estimated.connect(self._on_size_estimated)
+        self.core.size_estimator.callback = self.size_estimated.emit
+
         self._showing_original = False
+        self._updating_view = False
 
 
         # Top bar
@@ -82,6 +120,8 @@ class MainWindow(QMainWindow):
         self.sidebar.filters_tab.filter_applied.connect(self.on_filter_applied_destructive)
         # When a color slider is moved -> refresh preview
         self.sidebar.colors_tab.filter_applied.connect(self.refresh_preview)
+        # When zoom or pan changes -> switch preview level / re-render the visible area
+        self.image_view.view_changed.connect(self.on_view_changed)
 
         # History Panel (Left, hidden by default)
         self.history_panel = HistoryPanel(self)
@@ -170,10 +210,7 @@ class MainWindow(QMainWindow):
                 else:
                     fmt = "PNG"
                     path += ".png"
-            if fmt == "JPEG":
-                self.core.current_image.save(path, format=fmt, quality=90)
-            else:
-                self.core.current_image.save(path, format=fmt)
+            encoding.save(self.core.current_image, path, fmt, quality=90)
 
     def on_toggle_preview(self):
         self._showing_original = not self._showing_original
@@ -214,6 +251,18 @@ class MainWindow(QMainWindow):
         self.sidebar.colors_tab.apply_combined_filters()
         self.refresh_preview()
 
+    def on_view_changed(self):
+        """Re-render slider previews for the pyramid level / viewport now on screen."""
+        if self._updating_view:
+            return  # Scroll/fit adjustments while displaying the new render
+        view = self.image_view
+        if self.core.set_preview_view(view.on_screen_dim(), view.visible_image_box()) and self.core.in_preview:
+            # Don't race a background commit that is replacing the base image
+            if self.sidebar.isEnabled():
+                # Off the GUI thread, like a slider drag: zooming and panning stay responsive
+                colors_tab = self.sidebar.colors_tab
+                colors_tab.scheduler.request(colors_tab.get_active_filters())
+
     def on_toggle_history(self):
         if self.history_panel.isVisible():
             self.history_panel.hide()
@@ -230,7 +279,7 @@ class MainWindow(QMainWindow):
         self._dark = not self._dark
         self.apply_theme()
 
-    def refresh_preview(self, estimate_size=False):
+    def refresh_preview(self):
         if self._showing_original:
             if self.core.initial_image:
                 self.image_view.display_image(self.core.initial_image)
@@ -238,11 +287,16 @@ class MainWindow(QMainWindow):
 
         image = self.core.current_image
         if image:
-            self.image_view.display_image(image)
-            info = self.core.get_image_info(estimate_size=estimate_size)
-            if info:
-                msg = f"Resolution: {info['width']}x{info['height']}  |  Approx. Size ({info['format']}): {info['size_kb']} KB"
-                self.statusBar().showMessage(msg)
+            # Scroll/fit adjustments made while showing the frame aren't user view changes
+            self._updating_view = True
+            try:
+                self.image_view.display_image(image, detail=self.core.get_preview_detail())
+            finally:
+                self._updating_view = False
+            self._status_info = self.core.get_image_info()
+            # Encoding can take seconds on a large image; the size arrives via size_estimated
+            self.core.request_size_estimate()
+            self._show_status()
         else:
             self.image_view.clear()
             self.statusBar().clearMessage()
@@ -251,6 +305,23 @@ class MainWindow(QMainWindow):
         if self.history_panel.isVisible():
             self.update_history_panel()
 
+    def _show_status(self):
+        info = self._status_info
+        if not info:
+            return
+        msg = f"Resolution: {info['width']}x{info['height']}  |  Approx. Size ({info['format']}): {self._size_text}"
+        frame_ms = self.sidebar.colors_tab.scheduler.last_frame_ms
+        if self.core.in_preview and frame_ms is not None:
+            msg += f"  |  Preview: {frame_ms:.0f} ms"
+        self.statusBar().showMessage(msg)
+
+    def _on_size_estimated(self, size, exact):
+        # "~" marks a sampled or preview-scaled estimate; it's replaced once refined
+        kb = size // 1024
+        self._size_text = f"{kb} KB" if exact else f"~{kb} KB"
+        if self.core.current_image is not None and not self._showing_original:
+            self._show_status()
+
     def run_upscale_from_ai(self):
         if not self.core.current_image:
             self.statusBar().showMessage("No image loaded", 3000)
@@ -260,23 +331,85 @@ class MainWindow(QMainWindow):
         self.sidebar.ai_tab.start_progress()
         self.topbar.setEnabled(False)
 
+        self._upscale_cancelled = False
         self.worker = UpscaleWorker(self.upscaler, self.core.current_image)
+        self.worker.progress.connect(self.sidebar.ai_tab.set_progress)
         self.worker.finished.connect(self._on_upscale_finished)
         self.worker.error.connect(self._on_upscale_error)
         self.worker.start()
 
     def _on_upscale_finished(self, result):
         self.core.push_history()
-        self.core.original_image = result.copy()
-        self.core.current_image = result.copy()
+        self.core.original_image = result
+        self.core.current_image = shared_copy(result)
         self.refresh_preview()
         
         self.topbar.setEnabled(True)
         self.sidebar.ai_tab.stop_progress("Done! Upscaled successfully.")
-        self.statusBar().showMessage("Upscaling complete!", 3000)
+        self.statusBar().showMessage(f"Upscaling complete ({self.upscaler.backend_name})", 3000)
+
+    def run_upscale_folder(self):
+        from PySide6.QtWidgets import QFileDialog
+        from editor.ai_features.upscaler.upscale_queue import UpscaleQueue
+
+        in_dir = QFileDialog.getExistingDirectory(self, "Folder to Upscale")
+        if not in_dir:
+            return
+        out_dir = QFileDialog.getExistingDirectory(self, "Save Upscaled Images To")
+        if not out_dir:
+            return
+
+        # One queue run loads the model once for the whole folder
+        queue = UpscaleQueue(self.upscaler.backend)
+        jobs = queue.add_folder(in_dir, out_dir)
+        if not jobs:
+            self.statusBar().showMessage("No images found in that folder", 3000)
+            return
+
+        self.statusBar().showMessage(f"AI Upscaling {len(jobs)} images...")
+        self.sidebar.ai_tab.start_progress(f"Upscaling 0/{len(jobs)} images...")
+
+        self._upscale_cancelled = False
+        self.worker = UpscaleQueueWorker(queue)
+        self.worker.job_changed.connect(self._on_queue_job)
+        self.worker.finished.connect(self._on_queue_finished)
+        self.worker.error.connect(self._on_upscale_error)
+        self.worker.start()
+
+    def _on_queue_job(self, job):
+        worker = self.worker
+        if not isinstance(worker, UpscaleQueueWorker):
+            return
+        jobs = worker.queue.jobs
+        ended = sum(1 for j in jobs if j.status in ("done", "failed", "cancelled"))
+        running = sum(j.progress for j in jobs if j.status == "running") / 100.0
+        self.sidebar.ai_tab.set_progress((ended + running) * 100.0 / len(jobs))
+        self.sidebar.ai_tab.set_status(f"Upscaling {ended}/{len(jobs)} images...")
+
+    def _on_queue_finished(self, stats):
+        summary = f"{stats['done']}/{stats['jobs']} images upscaled ({stats['backend']})"
+        if getattr(self, "_upscale_cancelled", False):
+            self.sidebar.ai_tab.stop_progress(f"Cancelled after {stats['done']} of {stats['jobs']} images.")
+        elif stats["failed"]:
+            self.sidebar.ai_tab.show_error(f"{stats['failed']} of {stats['jobs']} images failed.")
+            errors = {j.error for j in self.worker.queue.jobs if j.status == "failed"}
+            QMessageBox.warning(self, "AI Error", "Some images could not be upscaled:\n\n" + "\n".join(sorted(errors)))
+        else:
+            self.sidebar.ai_tab.stop_progress(f"Done! Upscaled {stats['done']} images.")
+        self.statusBar().showMessage(summary, 5000)
+
+    def cancel_upscale(self):
+        self._upscale_cancelled = True
+        worker = getattr(self, "worker", None)
+        if isinstance(worker, (UpscaleWorker, UpscaleQueueWorker)):
+            worker.cancel()
 
     def _on_upscale_error(self, message):
         self.topbar.setEnabled(True)
+        if getattr(self, "_upscale_cancelled", False):
+            self.sidebar.ai_tab.stop_progress("Upscaling cancelled.")
+            self.statusBar().showMessage("Upscaling cancelled.", 3000)
+            return
         self.sidebar.ai_tab.show_error("Upscaling failed.")
         self.statusBar().showMessage("Upscaling failed.", 5000)
         
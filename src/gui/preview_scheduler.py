@@ -0,0 +1,73 @@
+import time
+from PySide6.QtCore import QObject, QThread, Signal
+
+
+class _RenderWorker(QThread):
+    done = Signal(int, object, float)  # generation, result, elapsed ms
+
+    def __init__(self, func, args, generation):
+        super().__init__()
+        self.func = func
+        self.args = args
+        self.generation = generation
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            result = self.func(*self.args)
+        except Exception as e:
+            print(f"Preview render failed: {e}")
+            result = None
+        self.done.emit(self.generation, result, (time.perf_counter() - start) * 1000)
+
+
+class PreviewScheduler(QObject):
+    """
+    Runs preview renders on a background thread, one at a time.
+
+    Requests made while a render is in flight are coalesced: only the newest
+    is kept and starts as soon as the current render finishes. A result is
+    delivered through `rendered` only if no newer request arrived meanwhile
+    (latest wins), so a fast slider drag never queues stale frames.
+    """
+    rendered = Signal(object, float)  # result, frame time in ms
+
+    def __init__(self, render_func, parent=None):
+        super().__init__(parent)
+        self.render_func = render_func
+        self.last_frame_ms = None
+        self._generation = 0
+        self._pending = None
+        self._busy = False
+        self._threads = set()  # Keep QThread wrappers alive until they have stopped
+
+    def request(self, *args):
+        self._generation += 1
+        self._pending = args
+        if not self._busy:
+            self._start_next()
+
+    def cancel(self):
+        """Drop the pending request and the result of any in-flight render."""
+        self._generation += 1
+        self._pending = None
+
+    def is_busy(self):
+        return self._busy
+
+    def _start_next(self):
+        args, self._pending = self._pending, None
+        worker = _RenderWorker(self.render_func, args, self._generation)
+        worker.done.connect(self._on_done)
+        worker.finished.connect(lambda w=worker: self._threads.discard(w))
+        self._threads.add(worker)
+        self._busy = True
+        worker.start()
+
+    def _on_done(self, generation, result, elapsed_ms):
+        self._busy = False
+        self.last_frame_ms = elapsed_ms
+        if self._pending is not None:
+            self._start_next()
+        if generation == self._generation and result is not None:
+            self.rendered.emit(result, elapsed_ms)
@@ -19,6 +19,8 @@ class SideBar(QWidget):
         self.tools_tab = ToolsTab(self.core, parent=self)
         self.ai_tab = AITab(self.core, parent=self)
         self.ai_tab.upscale_requested.connect(parent.run_upscale_from_ai)
+        self.ai_tab.upscale_folder_requested.connect(parent.run_upscale_folder)
+        self.ai_tab.cancel_requested.connect(parent.cancel_upscale)
 
         self.tabs.addTab(self.filters_tab, "Filters")
         self.tabs.addTab(self.colors_tab, "Colors")
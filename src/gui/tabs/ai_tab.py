@@ -4,6 +4,8 @@ from PySide6.QtCore import Signal, QTimer
 
 class AITab(QWidget):
     upscale_requested = Signal()    # tell MainWindow to upscale
+    upscale_folder_requested = Signal()  # tell MainWindow to upscale a folder of images
+    cancel_requested = Signal()     # tell MainWindow to stop the running upscale
 
     def __init__(self, core, parent=None):
         super().__init__(parent)
@@ -23,6 +25,10 @@ class AITab(QWidget):
         layout.addWidget(self.btn_upscale)
         self.btn_upscale.clicked.connect(self.upscale_requested.emit)
 
+        self.btn_upscale_folder = QPushButton("Upscale Folder...")
+        layout.addWidget(self.btn_upscale_folder)
+        self.btn_upscale_folder.clicked.connect(self.upscale_folder_requested.emit)
+
         # ------------------------
         # Progress / Status
         # ------------------------
@@ -31,6 +37,11 @@ class AITab(QWidget):
         self.progress.setVisible(False)
         layout.addWidget(self.progress)
 
+        self.btn_cancel = QPushButton("Cancel")
+        self.btn_cancel.setVisible(False)
+        layout.addWidget(self.btn_cancel)
+        self.btn_cancel.clicked.connect(self.cancel_requested.emit)
+
         self.status_label = QLabel("")
         self.status_label.setVisible(False)
         layout.addWidget(self.status_label)
@@ -39,29 +50,45 @@ class AITab(QWidget):
 
     # --- Progress control (called by MainWindow) ---
 
-    def start_progress(self):
+    def start_progress(self, message="Upscaling in progress..."):
         """Show indeterminate progress bar and status text."""
-        self.status_label.setText("Upscaling in progress...")
+        self.status_label.setText(message)
         self.status_label.setVisible(True)
+        self.progress.setRange(0, 0)
         self.progress.setVisible(True)
         self.btn_upscale.setEnabled(False)
+        self.btn_upscale_folder.setEnabled(False)
+        self.btn_cancel.setVisible(True)
+
+    def set_progress(self, percent):
+        """Switch to a determinate bar once the engine reports progress."""
+        if self.progress.maximum() == 0:
+            self.progress.setRange(0, 100)
+        self.progress.setValue(int(percent))
+
+    def set_status(self, message):
+        self.status_label.setText(message)
 
     def stop_progress(self, message="Done!"):
         """Hide progress bar and show a completion message."""
         self.progress.setVisible(False)
+        self.btn_cancel.setVisible(False)
         self.status_label.setText(message)
         self.status_label.setVisible(True)
         self.btn_upscale.setEnabled(True)
+        self.btn_upscale_folder.setEnabled(True)
         # Auto-hide the status after 4 seconds
         QTimer.singleShot(4000, lambda: self.status_label.setVisible(False))
 
     def show_error(self, message="Upscaling failed."):
         """Hide progress bar and show an error message."""
         self.progress.setVisible(False)
+        self.btn_cancel.setVisible(False)
         self.status_label.setText(message)
         self.status_label.setStyleSheet("color: #ff6b6b;")
         self.status_label.setVisible(True)
         self.btn_upscale.setEnabled(True)
+        self.btn_upscale_folder.setEnabled(True)
         QTimer.singleShot(5000, self._reset_status_style)
 
     def _reset_status_style(self):
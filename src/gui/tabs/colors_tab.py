@@ -10,6 +10,9 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Signal, Qt
 import copy
 
+from gui.preview_scheduler import PreviewScheduler
+from editor.large_image import shared_copy
+
 class ColorsTab(QWidget):
     filter_applied = Signal()
 
@@ -38,6 +41,10 @@ class ColorsTab(QWidget):
         # State tracking for undo/redo
         self.slider_state_before_move = {}
 
+        # Slider drags render off the GUI thread, newest values win
+        self.scheduler = PreviewScheduler(self._render_preview, parent=self)
+        self.scheduler.rendered.connect(self._on_preview_rendered)
+
         # Collect Parametric Filters
         param_filters = []
         for name in sorted(self.core.filters.keys()):
@@ -131,7 +138,8 @@ class ColorsTab(QWidget):
         # Save the PREVIOUS state so Undo restores it.
         # The current state is already reflected in the UI and 'current_image'.
         # History stack represents "Ways to go back".
-        self.core.push_history(self.slider_state_before_move, description=desc)
+        # Only slider values changed, so no image snapshot is needed.
+        self.core.push_history(self.slider_state_before_move, description=desc, parametric=True)
         
         try:
             # We need to trigger the main window to update size estimation etc.
@@ -143,20 +151,39 @@ class ColorsTab(QWidget):
 
     def on_slider_changed(self, filter_name, param_key, value):
         self.slider_values[filter_name][param_key] = value
-        self.apply_combined_filters()
+        if self.core.original_image is None:
+            return
+
+        self.core.in_preview = True
+        self.scheduler.request(self.get_active_filters())
+
+    def _render_preview(self, filter_list):
+        """Runs on the scheduler thread; must not touch core state."""
+        if not filter_list:
+            return shared_copy(self.core.original_image), None, self.core.preview_proxy
+        return self.core.render_preview(filter_list)
+
+    def _on_preview_rendered(self, result, frame_ms):
+        image, detail, proxy = result
+        if proxy is not self.core.preview_proxy:
+            return  # Base image changed (commit/undo) while rendering
+        self.core.show_preview(image, detail)
+        self.filter_applied.emit()
 
     def apply_combined_filters(self):
         """Apply all active sliders to the current base image."""
         if self.core.original_image is None:
             return
 
+        # A synchronous render supersedes any drag render still in flight
+        self.scheduler.cancel()
         self.core.in_preview = True
         
         filter_list = self.get_active_filters()
         
         if not filter_list:
             if self.core.original_image:
-                self.core.current_image = self.core.original_image.copy()
+                self.core.current_image = shared_copy(self.core.original_image)
         else:
             self.core.apply_preview_filters(filter_list)
         
@@ -145,11 +145,15 @@ class ToolsTab(QWidget):
             elif name == "Compress to Size":
                 kb, ok = QInputDialog.getInt(self, "Compress", "Target KB:", 100, 1)
                 if not ok: return
+                choices = ["JPEG", "Best quality of JPEG / WebP / PNG"]
+                choice, ok = QInputDialog.getItem(self, "Compress", "Format:", choices, 0, False)
+                if not ok: return
+                formats = ("JPEG",) if choice == "JPEG" else ("JPEG", "WEBP", "PNG")
 
                 def _task():
                     if active_filters:
                         self.core.commit_preview(active_filters, slider_values)
-                    return self.core.apply_tool(name, target_kb=kb)
+                    return self.core.apply_tool(name, target_kb=kb, formats=formats)
 
                 self.window().run_background_task(
                     _task,
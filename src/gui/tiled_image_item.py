@@ -0,0 +1,197 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PySide6.QtWidgets import QGraphicsObject, QGraphicsItem, QStyleOptionGraphicsItem
+from PySide6.QtCore import QRectF, Signal
+from editor.tiled import default_workers
+from utils.image_utils import pil_image_to_qpixmap
+
+TILE_SIZE = 512                  # Tile edge in pixels of its pyramid level
+CACHE_BYTES = 192 * 1024 * 1024  # Tile pixmaps kept around (LRU)
+
+_pool = None                     # Tile builders shared by every item
+_pool_lock = threading.Lock()
+
+
+def _tile_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=default_workers(), thread_name_prefix="tiles")
+        return _pool
+
+
+class TiledImageItem(QGraphicsObject):
+    """
+    Draws a PIL image as a grid of tiles, converted to pixmaps only once they
+    are on screen.
+
+    Each zoom level draws from the pyramid level that matches it (the image
+    reduced by a power of two), so a zoomed-out gigapixel scan needs a
+    handful of small tiles rather than one huge pixmap. Levels are never
+    built whole: a tile is reduced straight from its source box. Tile
+    pixmaps live in a bounded LRU cache, so memory follows the viewport.
+
+    paint() never builds a tile: missing tiles are reduced on a worker pool
+    and drawn when they arrive. Until then cached coarser tiles stand in
+    for them, and the single-tile overview of the whole image is queued
+    first so there is always something to show.
+    """
+    tile_ready = Signal(int, object, object)  # generation, key, PIL tile (from a worker)
+
+    def __init__(self, parent=None, tile_size=TILE_SIZE, cache_bytes=CACHE_BYTES):
+        super().__init__(parent)
+        self.tile_size = tile_size
+        self.cache_bytes = cache_bytes
+        self._image = None
+        self._rect = QRectF()
+        self._tiles = OrderedDict()   # (factor, tx, ty) -> QPixmap
+        self._bytes = 0
+        self._pending = set()         # Keys being built on the pool
+        self._generation = 0          # Bumped per image; stale tiles are dropped
+        self.tile_ready.connect(self._on_tile_ready)
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption, True)
+
+    def set_image(self, pil_img):
+        if pil_img is self._image:
+            return
+        self.prepareGeometryChange()
+        self._image = pil_img
+        self._rect = QRectF(0, 0, pil_img.width, pil_img.height)
+        self._drop_tiles()
+        self.update()
+
+    def clear(self):
+        self.prepareGeometryChange()
+        self._image = None
+        self._rect = QRectF()
+        self._drop_tiles()
+
+    def cached_tiles(self):
+        return len(self._tiles)
+
+    def pending_tiles(self):
+        return len(self._pending)
+
+    def boundingRect(self):
+        return self._rect
+
+    # -------------------------
+    # Painting
+    # -------------------------
+    def paint(self, painter, option, widget=None):
+        if self._image is None:
+            return
+        lod = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        if widget is not None:
+            lod *= widget.devicePixelRatioF()
+        factor = self.level_for(lod)
+
+        exposed = option.exposedRect.intersected(self._rect)
+        if painter.hasClipping():
+            exposed = exposed.intersected(painter.clipBoundingRect())
+        missing = []
+        for key, box in self.visible_tiles(factor, exposed):
+            pix = self._tiles.get(key)
+            if pix is None:
+                missing.append((key, box))
+                self._draw_fallback(painter, factor, box)
+                continue
+            self._tiles.move_to_end(key)
+            painter.drawPixmap(_rect(box), pix, QRectF(pix.rect()))
+
+        if missing:
+            overview = self.overview_level()
+            if overview > factor:
+                self._request((overview, 0, 0), (0, 0) + self._image.size)
+            for key, box in missing:
+                self._request(key, box)
+
+    def level_for(self, lod):
+        """Pyramid reduction factor (a power of two) for lod screen pixels per image pixel."""
+        factor = 1
+        limit = max(self._image.size) if self._image is not None else 1
+        while factor * 2 <= 1.0 / max(lod, 1e-6) and factor * 2 <= limit:
+            factor *= 2
+        return factor
+
+    def overview_level(self):
+        """Smallest reduction factor at which the whole image fits in one tile."""
+        factor = 1
+        while max(self._image.size) > self.tile_size * factor:
+            factor *= 2
+        return factor
+
+    def visible_tiles(self, factor, rect):
+        """Yield ((factor, tx, ty), source box) for the tiles of a level that meet rect."""
+        span = self.tile_size * factor
+        w, h = self._image.size
+        x0, y0 = max(0, int(rect.left()) // span), max(0, int(rect.top()) // span)
+        x1 = min((w - 1) // span, int(rect.right()) // span)
+        y1 = min((h - 1) // span, int(rect.bottom()) // span)
+        for ty in range(y0, y1 + 1):
+            for tx in range(x0, x1 + 1):
+                box = (tx * span, ty * span, min(w, (tx + 1) * span), min(h, (ty + 1) * span))
+                yield (factor, tx, ty), box
+
+    # -------------------------
+    # Tile cache
+    # -------------------------
+    def _request(self, key, box):
+        if key in self._pending or key in self._tiles:
+            return
+        self._pending.add(key)
+        image, generation = self._image, self._generation
+
+        def build():
+            factor = key[0]
+            try:
+                tile = image.reduce(factor, box=box) if factor > 1 else image.crop(box)
+            except Exception as e:
+                print(f"Tile {key} failed: {e}")
+                tile = None
+            try:
+                self.tile_ready.emit(generation, key, tile)
+            except RuntimeError:
+                pass  # The item was deleted meanwhile
+
+        _tile_pool().submit(build)
+
+    def _on_tile_ready(self, generation, key, tile):
+        if generation != self._generation:
+            return  # Built for an image no longer shown
+        self._pending.discard(key)
+        if tile is None:
+            return
+        pix = pil_image_to_qpixmap(tile)
+        self._tiles[key] = pix
+        self._bytes += pix.width() * pix.height() * 4
+        while self._bytes > self.cache_bytes and len(self._tiles) > 1:
+            _, old = self._tiles.popitem(last=False)
+            self._bytes -= old.width() * old.height() * 4
+        span = self.tile_size * key[0]
+        self.update(QRectF(key[1] * span, key[2] * span, span, span))
+
+    def _draw_fallback(self, painter, factor, box):
+        """Draw the part of a cached coarser tile that covers box, if there is one."""
+        coarse = factor * 2
+        while coarse <= max(self._image.size):
+            span = self.tile_size * coarse
+            tx, ty = box[0] // span, box[1] // span
+            pix = self._tiles.get((coarse, tx, ty))
+            if pix is not None:
+                source = QRectF((box[0] - tx * span) / coarse, (box[1] - ty * span) / coarse,
+                                (box[2] - box[0]) / coarse, (box[3] - box[1]) / coarse)
+                painter.drawPixmap(_rect(box), pix, source)
+                return
+            coarse *= 2
+
+    def _drop_tiles(self):
+        self._tiles.clear()
+        self._bytes = 0
+        self._pending.clear()
+        self._generation += 1
+
+
+def _rect(box):
+    return QRectF(box[0], box[1], box[2] - box[0], box[3] - box[1])
@@ -0,0 +1,79 @@
+import os
+import sys
+import colorsys
+from PIL import Image
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from editor import arrays
+from editor.editor_core import EditorCore
+from editor.fusion import run_chain
+from editor.filters import hsl
+from test_helpers import noise_image, diffs
+
+
+def _colorsys_hsl(img, hue, saturation):
+    out = []
+    data = img.tobytes()
+    for i in range(0, len(data), 3):
+        r, g, b = data[i:i + 3]
+        h, l, s = colorsys.rgb_to_hls(r / 255, g / 255, b / 255)
+        r, g, b = colorsys.hls_to_rgb((h + hue / 360) % 1.0, l, min(1.0, s * (1 + saturation / 100)))
+        out.extend(int(c * 255 + 0.5) for c in (r, g, b))
+    return Image.frombytes("RGB", img.size, bytes(out))
+
+
+def test_array_backend():
+    if not arrays.enabled():
+        print("NumPy not available: PIL paths only, nothing to compare")
+        return
+    img = noise_image(seed=3)
+
+    print("Testing HSL against colorsys...")
+    for hue, saturation in ((40, 0), (-150, 30), (0, -60), (90, 100)):
+        exact = _colorsys_hsl(img, hue, saturation)
+        # run() samples the NumPy math into a 3D LUT
+        mean, worst = diffs(exact, hsl.run(img, hue=hue, saturation=saturation))
+        assert mean < 0.5 and worst <= 6, (hue, saturation, mean, worst)
+    print("True HSL OK")
+
+    print("Testing the LUT without NumPy matches the NumPy-sampled one...")
+    for params in ({"hue": 30}, {"saturation": 40}, {"saturation": -50},
+                   {"lightness": 30}, {"lightness": -30}, {"hue": -120, "saturation": 25, "lightness": -10}):
+        ref = hsl.run(img, **params)
+        arrays.USE_NUMPY = False
+        hsl._hsl_lut.cache_clear()
+        try:
+            mean, worst = diffs(ref, hsl.run(img, **params))
+        finally:
+            arrays.USE_NUMPY = True
+            hsl._hsl_lut.cache_clear()
+        assert worst <= 1, (params, mean, worst)
+    print("LUT parity OK")
+
+    print("Testing pipeline parity with NumPy disabled...")
+    core = EditorCore()
+    filter_list = [
+        ("Brightness", {"delta": 15}),
+        ("HSL Adjustment", {"hue": 25, "saturation": 20, "lightness": 5}),
+        ("Levels", {"shadows": 10, "midtones": 110, "highlights": 245}),
+        ("Vignette & Noise", {"vignette_amount": 40, "vignette_radius": 50, "noise_amount": 0}),
+    ]
+    with_numpy = run_chain(img, core.filters, filter_list)
+    arrays.USE_NUMPY = False
+    hsl._hsl_lut.cache_clear()
+    try:
+        without = run_chain(img, core.filters, filter_list)
+    finally:
+        arrays.USE_NUMPY = True
+        hsl._hsl_lut.cache_clear()
+    mean, worst = diffs(with_numpy, without)
+    # Only the HSL LUT differs (by a level at most); Levels can stretch that to 2
+    assert mean < 0.05 and worst <= 2, (mean, worst)
+    print("Pipeline parity OK")
+
+    print("ALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_array_backend()
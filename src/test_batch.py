@@ -0,0 +1,92 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import subprocess
+from PIL import Image
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from editor.batch import collect_inputs, process_file, run_batch
+
+
+def test_batch():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        in_dir = os.path.join(temp_dir, "in")
+        out_dir = os.path.join(temp_dir, "out")
+        os.makedirs(os.path.join(in_dir, "sub"))
+        for i, path in enumerate(["a.jpg", "b.png", os.path.join("sub", "c.png")]):
+            img = Image.radial_gradient("L").resize((300, 200)).convert("RGB")
+            img.save(os.path.join(in_dir, path))
+
+        steps = [
+            {"filter": "Brightness", "params": {"delta": 20}},
+            {"filter": "Contrast", "params": {"delta": 10}},
+            {"tool": "Resize Image", "params": {"width": 150, "height": 100}},
+            {"tool": "Convert Format", "params": {"fmt": "WEBP"}},
+        ]
+
+        print("Testing input collection...")
+        assert len(collect_inputs([in_dir])) == 2
+        inputs = collect_inputs([in_dir], recursive=True)
+        assert [rel for _, rel in inputs] == ["a.jpg", "b.png", os.path.join("sub", "c.png")]
+        print("Input collection OK")
+
+        print("Testing same-named files from different folders don't collide...")
+        for name in ("left", "right"):
+            os.makedirs(os.path.join(temp_dir, "dup", name))
+            Image.new("RGB", (20, 10), "red").save(os.path.join(temp_dir, "dup", name, "x.jpg"))
+        globbed = collect_inputs([os.path.join(temp_dir, "dup", "*", "x.jpg")])
+        assert [rel for _, rel in globbed] == [os.path.join("left", "x.jpg"), os.path.join("right", "x.jpg")]
+        dirs = collect_inputs([os.path.join(temp_dir, "dup", "left"), os.path.join(temp_dir, "dup", "right")])
+        assert [rel for _, rel in dirs] == ["x.jpg", "x_2.jpg"]
+        dup_out = os.path.join(temp_dir, "dup_out")
+        _, dup_summary = run_batch(dirs, [], dup_out, workers=1)
+        assert dup_summary["ok"] == 2
+        assert sorted(os.listdir(dup_out)) == ["x.jpg", "x_2.jpg"]
+        print("Collision handling OK")
+
+        print("Testing process pool run...")
+        results, summary = run_batch(inputs, steps, out_dir, workers=2)
+        assert summary["ok"] == 3 and summary["failed"] == 0
+        out = os.path.join(out_dir, "sub", "c.webp")
+        with Image.open(out) as res:
+            assert res.format == "WEBP" and res.size == (150, 100)
+        print("Process pool run OK")
+
+        print("Testing Compress to Size writes the encoded bytes...")
+        res = process_file(inputs[0][0], "small", [{"tool": "Compress to Size", "params": {"target_kb": 3}}], out_dir)
+        assert res["ok"] and res["output"].endswith(".jpg") and res["out_bytes"] <= 3 * 1024
+        bad = process_file(inputs[0][0], "bad", [{"filter": "Nope"}], out_dir)
+        assert not bad["ok"] and "Nope" in bad["error"]
+        print("Compress/error handling OK")
+
+        print("Testing CLI runs without Qt...")
+        recipe = os.path.join(temp_dir, "recipe.json")
+        with open(recipe, "w") as f:
+            json.dump({"steps": steps}, f)
+        report = os.path.join(temp_dir, "report.json")
+        code = (
+            "import sys; sys.argv = ['batch'] + sys.argv[1:]\n"
+            "from editor.batch import main\n"
+            "rc = main()\n"
+            "assert not [m for m in sys.modules if m.startswith('PySide6')]\n"
+            "sys.exit(rc)\n"
+        )
+        proc = subprocess.run(
+            [sys.executable, "-c", code, recipe, os.path.join(in_dir, "*.png"),
+             "-o", os.path.join(temp_dir, "cli"), "-j", "1", "--report", report],
+            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True)
+        assert proc.returncode == 0, proc.stdout + proc.stderr
+        with open(report) as f:
+            assert json.load(f)["summary"]["ok"] == 1
+        print("CLI OK")
+        print("ALL TESTS PASSED")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_batch()
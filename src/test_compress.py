@@ -0,0 +1,74 @@
+import os
+import sys
+import shutil
+import tempfile
+from PIL import Image
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from editor import encoding
+from editor.editor_core import EditorCore
+from test_helpers import photo_like
+
+
+def _search(img, target):
+    best = None
+    for q in range(5, 96):
+        if len(encoding.encode(img, "JPEG", q)) <= target:
+            best = q
+    return best
+
+
+def test_compress():
+    img = photo_like()
+
+    print("Testing predicted quality against an exhaustive search...")
+    for kb in (80, 200, 400):
+        data, q, encodes = encoding.fit_quality(img, kb * 1024)
+        assert len(data) <= kb * 1024
+        assert encodes <= 3
+        assert q >= _search(img, kb * 1024) - 2
+        print(f"  {kb} KB: quality {q} with {encodes} full encodes")
+    data, q, _ = encoding.fit_quality(img, 1024)
+    assert q == 10  # Nothing fits: same fallback as the old binary search
+    print("Prediction OK")
+
+    print("Testing Compress to Size result saves its own bytes...")
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, "in.png")
+        img.save(path)
+        core = EditorCore()
+        core.load_image(path)
+        core.apply_tool("Compress to Size", target_kb=150)
+        assert core.current_format == "JPEG"
+        saved = core.save_auto()
+        assert os.path.getsize(saved) <= 150 * 1024
+        with Image.open(saved) as res:
+            assert res.tobytes() == core.current_image.tobytes()
+        assert core.get_image_info(estimate_size=True)["size_kb"] == os.path.getsize(saved) // 1024
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    print("Testing the multi-format optimizer...")
+    small = img.resize((700, 500))
+    best, candidates = encoding.optimize_size(small, 60 * 1024)
+    assert {c["format"] for c in candidates} == {"JPEG", "WEBP", "PNG"}
+    assert best["bytes"] <= 60 * 1024
+    assert best["psnr"] == max(c["psnr"] for c in candidates if c["ok"])
+    best, _ = encoding.optimize_size(small, min_psnr=36.0)
+    assert best["psnr"] >= 36.0
+    assert encoding.decode(best["data"]).size == small.size
+    # Flat graphics: lossless/palette PNG beats every lossy format
+    flat = Image.new("RGB", (400, 300), "white")
+    flat.paste((200, 30, 30), (50, 50, 200, 150))
+    best, _ = encoding.optimize_size(flat, 20 * 1024)
+    assert best["format"] == "PNG"
+    res = core.tools["Compress to Size"].run(flat, target_kb=20, formats=("JPEG", "WEBP", "PNG"))
+    assert res.format == "PNG" and res.mode == "RGB"
+    print("Optimizer OK")
+    print("ALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_compress()
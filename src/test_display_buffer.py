@@ -0,0 +1,65 @@
+import sys
+import os
+import time
+from PIL import Image, ImageChops
+from PySide6.QtWidgets import QApplication
+from PySide6.QtGui import QPixmap
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from utils.image_utils import DisplayBuffer, pil_image_to_qpixmap
+
+
+def _pixels(pix):
+    return Image.fromqimage(pix.toImage()).convert("RGB")
+
+
+def test_display_buffer():
+    app = QApplication.instance() or QApplication(sys.argv)
+    img = Image.radial_gradient("L").resize((640, 480)).convert("RGB")
+
+    print("Testing full frame conversion...")
+    buf = DisplayBuffer()
+    pix = buf.update(img)
+    assert (pix.width(), pix.height()) == img.size
+    assert ImageChops.difference(_pixels(pix), img).getbbox() is None
+    print("Full frame OK")
+
+    print("Testing a new frame repaints in place...")
+    edited = img.copy()
+    edited.paste((255, 0, 0), (100, 100, 200, 150))
+    held = QPixmap(pix)  # Someone still showing the old frame keeps it
+    del pix
+    pix = buf.update(edited)
+    assert ImageChops.difference(_pixels(pix), edited).getbbox() is None
+    assert ImageChops.difference(_pixels(held), img).getbbox() is None
+    assert buf.update(edited) is pix
+    print("New frame OK")
+
+    print("Testing size and mode changes...")
+    for frame in (img.resize((320, 240)), img.convert("RGBA"), img.convert("L"), img.convert("P")):
+        pix = buf.update(frame)
+        assert (pix.width(), pix.height()) == frame.size
+        assert ImageChops.difference(_pixels(pix), frame.convert("RGB")).getbbox() is None
+    print("Size and mode changes OK")
+
+    print("Comparing with the copying converter...")
+    frames = [img.point(lambda v, i=i: (v + i) % 256) for i in range(10)]
+    buf.update(frames[0])
+    start = time.perf_counter()
+    for frame in frames:
+        buf.update(frame)
+    reused = time.perf_counter() - start
+    start = time.perf_counter()
+    for frame in frames:
+        pil_image_to_qpixmap(frame)
+    copied = time.perf_counter() - start
+    print(f"Reused buffer {reused * 100:.2f} ms/frame, copying {copied * 100:.2f} ms/frame")
+
+    print("ALL TESTS PASSED")
+
+
+if __name__ == "__main__":
+    test_display_buffer()
@@ -0,0 +1,80 @@
+import os
+import sys
+import random
+from PIL import Image, ImageDraw, ImageFilter
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from editor import fast_blur
+from editor.editor_core import EditorCore
+from editor.tiled import TiledExecutor, TILED_MIN_PIXELS, run_chain_region
+from test_helpers import max_diff
+
+
+def _shapes_image(w, h):
+    img = Image.new("RGB", (w, h), (20, 20, 20))
+    draw = ImageDraw.Draw(img)
+    for x in range(0, w, 45):
+        draw.rectangle((x, 0, x + 15, h), fill=(240, 200, 30))
+    draw.ellipse((w // 4, h // 4, w * 3 // 4, h * 3 // 4), fill=(10, 120, 250))
+    return img
+
+
+def test_fast_blur():
+    print("Testing reduction factors...")
+    assert fast_blur.reduction_for(5) == 1
+    assert fast_blur.reduction_for(fast_blur.DIRECT_RADIUS) == 1
+    assert fast_blur.reduction_for(50) == 4
+    assert fast_blur.reduction_for(200) == 16
+    print("Reduction OK")
+
+    print("Testing large radii match Pillow's Gaussian...")
+    img = _shapes_image(600, 400)
+    for radius in (20, 50, 120):
+        exact = img.filter(ImageFilter.GaussianBlur(radius))
+        assert max_diff(exact, fast_blur.gaussian_blur(img, radius)) <= 4, radius
+    assert fast_blur.gaussian_blur(img, 5).tobytes() == img.filter(ImageFilter.GaussianBlur(5)).tobytes()
+    assert fast_blur.gaussian_blur(img, 0).tobytes() == img.tobytes()
+    print("Accuracy OK")
+
+    print("Testing threaded upsample is seamless...")
+    rng = random.Random(4)
+    big = Image.frombytes("RGB", (2100, 2000), rng.randbytes(2100 * 2000 * 3))
+    assert big.width * big.height >= TILED_MIN_PIXELS
+    single = fast_blur.gaussian_blur(big, 60, workers=1)
+    assert fast_blur.gaussian_blur(big, 60, workers=4).tobytes() == single.tobytes()
+    print("Threaded OK")
+
+    print("Testing the Blur filter in the tiled executor...")
+    core = EditorCore()
+    blur = core.filters["Blur"]
+    executor = TiledExecutor(workers=4)
+    small = img.resize((200, 520))
+    for params in ({"radius": 8}, {"radius": 80}):
+        exact = blur.run(small, **params)
+        assert max_diff(exact, executor.run_chain(small, core.filters, [("Blur", params)])) == 0
+    assert blur.halo(radius=8) == 24 and blur.halo(radius=80) is None
+    print("Tiled OK")
+
+    print("Testing region renders fall back for whole-image blurs...")
+    box = (20, 100, 120, 200)
+    region, _ = run_chain_region(small, core.filters, [("Blur", {"radius": 80})], box, small)
+    assert region is None
+    region, _ = run_chain_region(small, core.filters, [("Blur", {"radius": 8})], box, small)
+    assert max_diff(region, blur.run(small, radius=8).crop(box)) == 0
+
+    print("Testing proxy previews scale the radius...")
+    core.original_image = img
+    proxy = img.resize((150, 100))
+    filter_list = [("Blur", {"radius": 40}), ("Brightness", {"delta": 10})]
+    assert core.scaled_filter_list(filter_list, proxy) == [("Blur", {"radius": 10.0}), ("Brightness", {"delta": 10})]
+    assert core.scaled_filter_list(filter_list, img) is filter_list
+    # A filter that no longer exists is passed through for compile_chain to skip
+    stale = [("Removed Filter", {"radius": 4})] + filter_list
+    assert core.scaled_filter_list(stale, proxy)[0] == ("Removed Filter", {"radius": 4})
+    print("ALL TESTS PASSED")
+
+
+if __name__ == "__main__":
+    test_fast_blur()
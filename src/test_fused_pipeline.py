@@ -0,0 +1,85 @@
+import os
+import sys
+from PIL import Image
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from editor.editor_core import EditorCore
+from editor.fusion import compile_chain, run_chain, FusedPass, FilterStep
+from editor.stage_cache import StageCache
+from test_helpers import noise_image, max_diff, run_sequential
+
+
+def test_fused_pipeline():
+    core = EditorCore()
+    img = noise_image()
+
+    # Slider order as produced by ColorsTab (sorted by name)
+    filter_list = [
+        ("Brightness", {"delta": 20}),
+        ("Color Balance", {"red": 15, "green": -10, "blue": 5}),
+        ("Contrast", {"delta": 35}),
+        ("HSL Adjustment", {"hue": 30, "saturation": 20, "lightness": -10}),
+        ("Levels", {"shadows": 10, "midtones": 120, "highlights": 240}),
+    ]
+
+    print("Testing chain compilation...")
+    steps = compile_chain(core.filters, filter_list)
+    # True HSL isn't a color matrix, so it runs on its own between two passes
+    assert [type(s) for s in steps] == [FusedPass, FilterStep, FusedPass]
+    assert [name for name, _ in steps[0].sources] == ["Brightness", "Color Balance", "Contrast"]
+    print("Point/matrix slider filters folded around HSL: OK")
+
+    print("Testing point-only parity...")
+    point_only = [f for f in filter_list if f[0] != "HSL Adjustment"]
+    exact = run_sequential(core.filters, img, point_only)
+    assert run_chain(img, core.filters, point_only).tobytes() == exact.tobytes()
+    print("Point-only parity OK")
+
+    print("Testing Contrast pivots on the mean of the L image...")
+    # Weighted RGB means give 109.03 here, but convert('L') rounds each pixel: 109.5
+    halves = Image.new("RGB", (64, 64), (200, 40, 90))
+    halves.paste((20, 200, 10), (0, 0, 32, 64))
+    for contrast_list in ([("Contrast", {"delta": -50})],
+                          [("Brightness", {"delta": 20}), ("Contrast", {"delta": -50})]):
+        exact = run_sequential(core.filters, halves, contrast_list)
+        assert run_chain(halves, core.filters, contrast_list).tobytes() == exact.tobytes()
+    print("Contrast pivot OK")
+
+    print("Testing full chain parity...")
+    exact = run_sequential(core.filters, img, filter_list)
+    # Intermediate clamping/rounding differs slightly once a matrix is involved
+    assert max_diff(exact, run_chain(img, core.filters, filter_list)) <= 3
+    print("Full chain parity OK")
+
+    print("Testing non-fusable filters split the chain...")
+    mixed = [("Brightness", {"delta": 10}),
+             ("Vignette & Noise", {"vignette_amount": 50, "vignette_radius": 50, "noise_amount": 0}),
+             ("Levels", {"shadows": 5, "midtones": 100, "highlights": 250})]
+    steps = compile_chain(core.filters, mixed)
+    assert [type(s) for s in steps] == [FusedPass, FilterStep, FusedPass]
+    exact = run_sequential(core.filters, img, mixed)
+    assert max_diff(exact, run_chain(img, core.filters, mixed)) <= 1
+    print("Mixed chain OK")
+
+    print("Testing empty chain returns a copy...")
+    res = run_chain(img, core.filters, [])
+    assert res is not img and res.tobytes() == img.tobytes()
+
+    print("Testing stage cache resumes after unchanged stages...")
+    cache = StageCache()
+    first = cache.run(img, core.filters, mixed)
+    assert first.tobytes() == run_chain(img, core.filters, mixed).tobytes()
+    assert (cache.hits, cache.misses) == (0, 3)
+    moved = mixed[:2] + [("Levels", {"shadows": 30, "midtones": 100, "highlights": 250})]
+    second = cache.run(img, core.filters, moved)
+    assert second.tobytes() == run_chain(img, core.filters, moved).tobytes()
+    assert (cache.hits, cache.misses) == (2, 4)
+    cache.run(img.copy(), core.filters, moved)  # New base image invalidates everything
+    assert cache.misses == 7
+    print("Stage cache OK")
+    print("ALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_fused_pipeline()
@@ -0,0 +1,57 @@
+import os
+import sys
+from PIL import Image, ImageStat
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from editor import grain
+from editor.filters import vignette_noise
+
+
+def test_grain():
+    img = Image.new("RGB", (700, 300), (120, 120, 120))
+    params = {"noise_amount": 60, "noise_size": 3, "noise_color": 50}
+
+    print("Testing grain is deterministic...")
+    grain.clear()
+    first = vignette_noise.run(img, **params)
+    second = vignette_noise.run(img, **params)
+    assert first.tobytes() == second.tobytes()
+    grain.clear()
+    assert vignette_noise.run(img, **params).tobytes() == first.tobytes()
+    print("Deterministic OK")
+
+    print("Testing grain is zero-mean and not flat...")
+    stat = ImageStat.Stat(first)
+    assert all(abs(m - 120) < 2 for m in stat.mean), stat.mean
+    assert all(s > 3 for s in stat.stddev), stat.stddev
+    mono = vignette_noise.run(img, noise_amount=60)
+    r, g, b = mono.split()
+    assert r.tobytes() == g.tobytes() == b.tobytes()
+    assert first.split()[0].tobytes() != first.split()[1].tobytes()
+    print("Zero-mean, mono and color OK")
+
+    print("Testing the texture tiles seamlessly...")
+    texture = grain.texture(3)
+    assert texture.size == (grain.TEXTURE_SIZE, grain.TEXTURE_SIZE)
+    layer = grain.layer((grain.TEXTURE_SIZE * 2, 10), (0, 0), 60, 3)
+    assert layer.crop((0, 0, 5, 10)).tobytes() == layer.crop((grain.TEXTURE_SIZE, 0, grain.TEXTURE_SIZE + 5, 10)).tobytes()
+    print("Tiling OK")
+
+    print("Testing strips match the whole image...")
+    full_size = img.size
+    for box in [(0, 0, 700, 130), (0, 130, 700, 300)]:
+        strip = vignette_noise.run_region(img.crop(box), box, full_size, **params)
+        assert strip.tobytes() == first.crop(box).tobytes()
+    print("Strips OK")
+
+    print("Testing repeated frames reuse the layer...")
+    size, offset = img.size, (0, 0)
+    assert grain.layer(size, offset, 60, 3, 50) is grain.layer(size, offset, 60, 3, 50)
+    print("Layer cache OK")
+    print("ALL TESTS PASSED")
+
+
+if __name__ == "__main__":
+    test_grain()
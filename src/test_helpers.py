@@ -0,0 +1,37 @@
+import random
+from PIL import Image, ImageFilter
+
+# Shared image fixtures and comparisons for the test_*.py scripts.
+# No tests live here; pytest collects nothing from this module.
+
+
+def noise_image(w=120, h=80, seed=1):
+    """Seeded RGB noise: every channel value shows up, so LUT differences can't hide."""
+    rng = random.Random(seed)
+    return Image.frombytes("RGB", (w, h), bytes(rng.randrange(256) for _ in range(w * h * 3)))
+
+
+def photo_like(w=1400, h=1000):
+    """Smooth gradients plus fine grain, which encodes roughly like a photo."""
+    noise = Image.effect_noise((w, h), 50).filter(ImageFilter.GaussianBlur(1.5))
+    return Image.merge("RGB", [noise, Image.radial_gradient("L").resize((w, h)),
+                               Image.linear_gradient("L").resize((w, h))])
+
+
+def max_diff(a, b):
+    """Largest per-channel difference between two images of the same size."""
+    assert a.size == b.size
+    return max(abs(x - y) for x, y in zip(a.tobytes(), b.tobytes()))
+
+
+def diffs(a, b):
+    """(mean, max) per-channel difference between two images."""
+    d = [abs(x - y) for x, y in zip(a.tobytes(), b.tobytes())]
+    return sum(d) / len(d), max(d)
+
+
+def run_sequential(filters, img, filter_list):
+    """filter_list applied one filter at a time through each run(): the unfused reference."""
+    for name, kwargs in filter_list:
+        img = filters[name].run(img, **kwargs)
+    return img
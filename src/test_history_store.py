@@ -0,0 +1,135 @@
+import os
+import sys
+import tempfile
+import shutil
+from PIL import Image
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from editor.editor_core import EditorCore
+from editor.history import MemoryHistoryStore, DeltaHistoryStore, PngHistoryStore
+
+
+def test_history_store():
+    temp_dir = tempfile.mkdtemp(prefix="painimage_test_")
+    try:
+        red = Image.new("RGB", (64, 48), "red")
+        blue = Image.new("RGB", (64, 48), "blue")
+
+        print("Testing in-memory round trip...")
+        store = MemoryHistoryStore(temp_dir)
+        key = store.put(red)
+        assert store.get(key).tobytes() == red.tobytes()
+        assert not os.listdir(temp_dir)
+        print("Round trip OK (nothing written to disk)")
+
+        print("Testing LRU spill when over budget...")
+        store = MemoryHistoryStore(temp_dir, budget_bytes=1)
+        k1 = store.put(red)
+        k2 = store.put(blue)
+        assert store.memory_bytes <= 1
+        assert len(os.listdir(temp_dir)) == 2
+        assert store.get(k1).tobytes() == red.tobytes()
+        assert store.get(k2).tobytes() == blue.tobytes()
+        store.discard(k1)
+        store.discard(k2)
+        assert not os.listdir(temp_dir)
+        print("Spill OK")
+
+        print("Testing palette images...")
+        pal = red.convert("P", palette=Image.Palette.ADAPTIVE)
+        store = MemoryHistoryStore(temp_dir)
+        assert store.get(store.put(pal)).convert("RGB").tobytes() == red.tobytes()
+        print("Palette OK")
+
+        print("Testing delta snapshots...")
+        store = DeltaHistoryStore(temp_dir, keyframe_interval=3, tile_size=16)
+        patched = red.copy()
+        patched.paste(blue.crop((0, 0, 8, 8)), (20, 20))
+        frames = [red, red, patched, blue, red.resize((32, 24))]
+        keys = [store.put(f) for f in frames]
+        snaps = [store._snapshots[k] for k in keys]
+        assert snaps[1].base == keys[0] and snaps[1].tiles == []
+        assert len(snaps[2].tiles) == 1
+        assert snaps[3].base is None  # keyframe interval reached
+        assert snaps[4].base is None  # size changed
+        for k, f in zip(keys, frames):
+            assert store.get(k).tobytes() == f.tobytes()
+        print("Delta round trip OK")
+
+        print("Testing discarded bases live until their deltas go...")
+        store.discard(keys[0])
+        store.discard(keys[1])
+        assert store._snapshots[keys[2]].base == keys[1]
+        assert store.get(keys[2]).tobytes() == patched.tobytes()
+        store.discard(keys[2])
+        assert not set(keys[:3]) & set(store._snapshots)
+        print("Discard OK")
+
+        print("Testing undo/redo stores deltas, not keyframes...")
+        rng_img = Image.effect_noise((256, 256), 80).convert("RGB")
+        core = EditorCore(history_store=DeltaHistoryStore(tempfile.mkdtemp(dir=temp_dir)))
+        rng_path = os.path.join(temp_dir, "noise.png")
+        rng_img.save(rng_path)
+        core.load_image(rng_path)
+        core.push_history()
+        keyframe = core._store.memory_bytes
+        edited = rng_img.copy()
+        edited.paste((255, 255, 255), (10, 10, 40, 40))
+        core.original_image = edited
+        core.push_history()
+        for _ in range(4):
+            core.undo()
+            core.redo()
+        assert core.original_image.tobytes() == edited.tobytes()
+        # One keyframe plus small deltas; a keyframe per undo/redo would be 8x
+        assert core._store.memory_bytes < keyframe * 1.5, (core._store.memory_bytes, keyframe)
+        core.undo()
+        core.undo()
+        assert core.original_image.tobytes() == rng_img.tobytes()
+        print("Undo/redo memory OK")
+
+        print("Testing EditorCore undo/redo with every store...")
+        img_path = os.path.join(temp_dir, "input.png")
+        red.save(img_path)
+        for factory in (DeltaHistoryStore, MemoryHistoryStore, PngHistoryStore):
+            store_dir = tempfile.mkdtemp(dir=temp_dir)
+            core = EditorCore(history_store=factory(store_dir))
+            core.load_image(img_path)
+
+            core.apply_filter("Grayscale", slider_state={"Brightness": {"delta": 5}})
+            gray = core.original_image.tobytes()
+            assert core.undo() == {"Brightness": {"delta": 5}}
+            assert core.original_image.tobytes() == red.tobytes()
+            core.redo()
+            assert core.original_image.tobytes() == gray
+            print(f"{factory.__name__} OK")
+
+        print("Testing parametric (slider-only) steps...")
+        core = EditorCore(history_store=PngHistoryStore(tempfile.mkdtemp(dir=temp_dir)))
+        core.load_image(img_path)
+        core.push_history({"Brightness": {"delta": 0}}, description="Adjust Brightness", parametric=True)
+        core.push_history({"Brightness": {"delta": 10}}, description="Adjust Brightness", parametric=True)
+        assert not os.listdir(core._store.temp_dir)
+        assert core.undo({"Brightness": {"delta": 20}}) == {"Brightness": {"delta": 10}}
+        assert core.undo({"Brightness": {"delta": 10}}) == {"Brightness": {"delta": 0}}
+        assert core.redo({"Brightness": {"delta": 0}}) == {"Brightness": {"delta": 10}}
+        assert core.redo({"Brightness": {"delta": 10}}) == {"Brightness": {"delta": 20}}
+        assert not os.listdir(core._store.temp_dir)
+        assert core.original_image.tobytes() == red.tobytes()
+
+        # Mixed with a pixel step, the image still follows the history
+        core.apply_filter("Grayscale")
+        core.push_history({"Brightness": {"delta": 30}}, parametric=True)
+        core.undo()
+        core.undo()
+        assert core.original_image.tobytes() == red.tobytes()
+        print("Parametric steps OK")
+
+        print("ALL TESTS PASSED")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_history_store()
@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+from PIL import Image, ImageChops, ImageStat
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from editor.editor_core import EditorCore
+from editor.large_image import map_image, open_image, shared_copy
+from editor.pyramid import build_pyramid
+
+
+def test_large_image():
+    temp_dir = tempfile.mkdtemp(prefix="painimage_test_")
+    try:
+        src = Image.radial_gradient("L").resize((3000, 2000)).convert("RGB")
+        jpeg = os.path.join(temp_dir, "scan.jpg")
+        src.save(jpeg, quality=90)
+        with Image.open(jpeg) as f:
+            decoded = f.convert("RGB")
+
+        print("Testing copy-on-write copies...")
+        base = decoded.copy()
+        alias = shared_copy(base)
+        assert alias.im is base.im
+        alias.paste((255, 0, 0), (0, 0, 10, 10))
+        assert alias.getpixel((5, 5)) == (255, 0, 0) and base.getpixel((5, 5)) != (255, 0, 0)
+        print("Copy-on-write OK")
+
+        print("Testing memory-mapped decoding...")
+        with Image.open(jpeg) as f:
+            mapped = map_image(f, temp_dir)
+        assert mapped.mode == "RGB" and mapped.readonly
+        assert ImageChops.difference(mapped, decoded).getbbox() is None
+        grey = map_image(src.convert("L"), temp_dir)  # Converted strip by strip
+        assert ImageChops.difference(grey, src.convert("L").convert("RGB")).getbbox() is None
+        assert not os.listdir(temp_dir)[1:]  # Only the JPEG: mapped files are unlinked
+        print("Mapping OK")
+
+        print("Testing large-image loading...")
+        core = EditorCore()
+        core.large_image_pixels = 1_000_000
+        start = time.perf_counter()
+        core.load_image(jpeg)
+        print(f"Loaded in {(time.perf_counter() - start) * 1000:.0f} ms")
+        assert core.current_format == "JPEG"
+        assert core.initial_image.im is core.original_image.im is core.current_image.im
+        assert ImageChops.difference(core.original_image, decoded).getbbox() is None
+        # Preview levels come from the draft decode: same sizes, close pixels
+        expected = [level.size for level in build_pyramid(decoded)]
+        assert [level.size for level in core.preview_pyramid] == expected
+        level = core.preview_pyramid[-2]
+        ref = decoded.resize(level.size, Image.Resampling.BOX)
+        assert max(ImageStat.Stat(ImageChops.difference(level, ref)).mean) < 2
+        print("Large-image load OK")
+
+        print("Testing edits leave the original untouched...")
+        core.apply_filter("Brightness", delta=40)
+        assert core.original_image.im is not core.initial_image.im
+        assert ImageChops.difference(core.initial_image, decoded).getbbox() is None
+        core.undo()
+        assert ImageChops.difference(core.original_image, decoded).getbbox() is None
+        print("Edits OK")
+
+        print("Testing small images keep the plain decode...")
+        png = os.path.join(temp_dir, "small.png")
+        src.resize((300, 200)).save(png)
+        image, fmt, reduced = open_image(png, temp_dir)
+        assert fmt == "PNG" and reduced is None and not image.readonly
+        print("ALL TESTS PASSED")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_large_image()
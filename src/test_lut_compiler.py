@@ -0,0 +1,73 @@
+import os
+import sys
+from PIL import Image
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from editor import lut_compiler
+from editor.editor_core import EditorCore
+from editor.fusion import compile_chain, run_chain, FusedPass
+from editor.filters import channel_levels, tone_curve, levels
+from test_helpers import noise_image
+
+
+def test_lut_compiler():
+    print("Testing levels curve matches single-channel Levels...")
+    curve = lut_compiler.levels(10, 120, 240)
+    assert len(curve) == 256
+    assert levels.lut(10, 120, 240) == curve * 3
+    print("Levels curve OK")
+
+    print("Testing per-channel levels keep channels independent...")
+    table = channel_levels.lut(red_shadows=40, blue_highlights=200)
+    assert table[:256] == lut_compiler.levels(40, 100, 255)
+    assert table[256:512] == tuple(range(256))
+    assert table[512:] == lut_compiler.levels(0, 100, 200)
+    img = Image.new("RGB", (4, 4), (40, 100, 200))
+    assert channel_levels.run(img, red_shadows=40, blue_highlights=200).getpixel((0, 0)) == (0, 100, 255)
+    print("Per-channel levels OK")
+
+    print("Testing tone curve...")
+    assert tone_curve.lut()[:256] == tuple(range(256))
+    for params in [(0, 60, 0, -60, 0), (30, 100, 100, 100, 0), (0, -100, 100, -100, 0)]:
+        curve = tone_curve.lut(*params)[:256]
+        assert all(0 <= v <= 255 for v in curve)
+        # Monotone control points give a monotone curve (no overshoot)
+        points = [min(255, max(0, x + p * 0.64)) for x, p in zip((0, 64, 128, 192, 255), params)]
+        if points == sorted(points):
+            assert all(b >= a for a, b in zip(curve, curve[1:])), params
+        for x, y in zip((0, 64, 128, 192, 255), points):
+            assert abs(curve[x] - y) <= 1
+    print("Tone curve OK")
+
+    print("Testing memoization...")
+    lut_compiler.clear()
+    first = tone_curve.lut(0, 20, 0, -20, 0)
+    hits, misses = lut_compiler.cache_info()
+    assert tone_curve.lut(0, 20, 0, -20, 0) is first
+    assert lut_compiler.cache_info() == (hits + 1, misses)
+    print("Memoization OK")
+
+    print("Testing the new filters fuse with the other point filters...")
+    core = EditorCore()
+    img = noise_image(96, 64, seed=3)
+    filter_list = [
+        ("Brightness", {"delta": 15}),
+        ("Channel Levels", {"red_shadows": 20, "green_midtones": 130, "blue_highlights": 230}),
+        ("Levels", {"shadows": 5, "midtones": 90, "highlights": 250}),
+        ("Tone Curve", {"shadows": 30, "highlights": -20}),
+    ]
+    steps = compile_chain(core.filters, filter_list)
+    assert [type(s) for s in steps] == [FusedPass]
+    exact = img
+    for name, kwargs in filter_list:
+        exact = core.filters[name].run(exact, **kwargs)
+    fused = run_chain(img, core.filters, filter_list)
+    assert max(abs(a - b) for a, b in zip(exact.tobytes(), fused.tobytes())) <= 1
+    print("Fusion OK")
+    print("ALL TESTS PASSED")
+
+
+if __name__ == "__main__":
+    test_lut_compiler()
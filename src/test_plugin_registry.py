@@ -0,0 +1,90 @@
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from editor import plugins
+
+
+def test_plugin_registry():
+    cache = tempfile.mkdtemp()
+    try:
+        print("Testing metadata is read without importing...")
+        code = (
+            "import sys\n"
+            "from editor.editor_core import EditorCore\n"
+            "core = EditorCore()\n"
+            "assert core.filters['Levels'].HAS_PARAMS and 'shadows' in core.filters['Levels'].PARAMS\n"
+            "assert getattr(core.filters['Grayscale'], 'HAS_PARAMS', False) is False\n"
+            "assert core.filters['Blur'].HAS_PARAMS and core.filters['Blur'].PARAMS['radius']['max'] == 200\n"
+            "assert 'Compress to Size' in core.tools and 'Upscaler' in core.ai_features\n"
+            "loaded = [m for m in sys.modules if m.startswith(('editor.filters.', 'editor.tools.', 'editor.ai_features.'))]\n"
+            "assert not loaded, loaded\n"
+            "assert not core.filters['Blur'].is_loaded\n"
+            "core.filters['Blur'].run\n"
+            "assert core.filters['Blur'].is_loaded and 'editor.filters.blur' in sys.modules\n"
+            "assert not core.ai_features['Upscaler'].is_loaded\n"
+            "assert not [m for m in sys.modules if m.startswith('PySide6')]\n"
+        )
+        env = dict(os.environ, PAINIMAGE_CACHE_DIR=cache)
+        src = os.path.dirname(os.path.abspath(__file__))
+        for run in ("cold", "warm"):
+            proc = subprocess.run([sys.executable, "-c", code], cwd=src, env=env,
+                                  capture_output=True, text=True)
+            assert proc.returncode == 0, proc.stdout + proc.stderr
+            assert len(os.listdir(cache)) == 3
+            print(f"Lazy registry ({run} manifest) OK")
+
+        print("Testing computed metadata falls back to an import...")
+        plugin_dir = os.path.join(cache, "plugin")
+        os.makedirs(plugin_dir)
+        with open(os.path.join(plugin_dir, "odd.py"), "w") as f:
+            f.write("FILTER_NAME = 'Odd'\nPARAMS = dict(a=1)\n")
+        assert plugins.read_metadata(os.path.join(plugin_dir, "odd.py"), plugins.META_FILTER) is None
+        assert plugins.read_metadata(os.path.join(src, "editor", "filters", "blur.py"), plugins.META_FILTER) == {
+            "FILTER_NAME": "Blur", "HAS_PARAMS": True,
+            "PARAMS": {"radius": {"min": 0, "max": 200, "default": 0, "label": "Blur Radius", "unit": "px"}}}
+        annotated = os.path.join(plugin_dir, "annotated.py")
+        with open(annotated, "w") as f:
+            f.write("FILTER_NAME: str = 'Annotated'\nHAS_PARAMS: bool = True\nPARAMS: dict = {'r': {'max': 3}}\n")
+        assert plugins.read_metadata(annotated, plugins.META_FILTER) == {
+            "FILTER_NAME": "Annotated", "HAS_PARAMS": True, "PARAMS": {"r": {"max": 3}}}
+        for source in ("FILTER_NAME, HAS_PARAMS = 'Pair', False\n",
+                       "from somewhere import FILTER_NAME\n",
+                       "FILTER_NAME = 'Grown'\nPARAMS = {}\nPARAMS |= {'r': {}}\n",
+                       "NAME = 'Unnamed'\n"):
+            with open(annotated, "w") as f:
+                f.write(source)
+            assert plugins.read_metadata(annotated, plugins.META_FILTER) is None, source
+        with open(annotated, "w") as f:
+            f.write("FILTER_NAME, HAS_PARAMS = 'Pair', False\n")
+        sys.path.insert(0, cache)
+        try:
+            assert dict(plugins.scan(plugin_dir, "plugin", "filters", plugins.META_FILTER))["plugin.annotated"] == {
+                "FILTER_NAME": "Pair", "HAS_PARAMS": False}
+        finally:
+            sys.path.remove(cache)
+            os.remove(annotated)
+        print("Import fallback OK")
+
+        print("Testing the manifest picks up edited metadata...")
+        manifest = os.path.join(cache, "manifest_test.json")
+        with open(os.path.join(plugin_dir, "odd.py"), "w") as f:
+            f.write("FILTER_NAME = 'Odd'\n")
+        assert plugins.scan(plugin_dir, "plugin", "filters", plugins.META_FILTER, manifest) == [
+            ("plugin.odd", {"FILTER_NAME": "Odd"})]
+        with open(os.path.join(plugin_dir, "odd.py"), "w") as f:
+            f.write("FILTER_NAME = 'Odd'\nHAS_PARAMS = True\nPARAMS = {'r': {'max': 9}}\n")
+        assert plugins.scan(plugin_dir, "plugin", "filters", plugins.META_FILTER, manifest) == [
+            ("plugin.odd", {"FILTER_NAME": "Odd", "HAS_PARAMS": True, "PARAMS": {"r": {"max": 9}}})]
+        print("Manifest refresh OK")
+        print("ALL TESTS PASSED")
+    finally:
+        shutil.rmtree(cache, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_plugin_registry()
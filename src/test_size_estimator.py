@@ -0,0 +1,64 @@
+import os
+import sys
+import time
+import threading
+from PIL import Image
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from editor import encoding
+from editor.size_estimator import SizeEstimator
+from test_helpers import photo_like
+
+
+class _Collector:
+    def __init__(self):
+        self.results = []
+        self.event = threading.Event()
+
+    def __call__(self, size, exact):
+        self.results.append((size, exact))
+        self.event.set()
+
+    def wait_for(self, count, timeout=20):
+        end = time.time() + timeout
+        while len(self.results) < count and time.time() < end:
+            time.sleep(0.01)
+        return self.results
+
+
+def test_size_estimator():
+    img = photo_like(1600, 1000)
+    exact = len(encoding.encode(img, "JPEG", 90))
+
+    print("Testing quick estimate, then exact refinement...")
+    collect = _Collector()
+    est = SizeEstimator(collect)
+    start = time.perf_counter()
+    est.request(img, "JPEG")
+    assert time.perf_counter() - start < 0.05  # Never blocks the caller
+    (quick, q_exact), (size, s_exact) = collect.wait_for(2)
+    assert not q_exact and abs(quick - exact) < exact * 0.15
+    assert s_exact and size == exact
+    print(f"Quick {quick // 1024} KB, exact {size // 1024} KB: OK")
+
+    print("Testing cache hit on identical content...")
+    collect.results.clear()
+    est.request(img.copy(), "JPEG")
+    assert collect.wait_for(1) == [(exact, True)]
+    time.sleep(0.1)
+    assert len(collect.results) == 1
+    print("Cache OK")
+
+    print("Testing preview scaling against the base...")
+    proxy = img.resize((800, 500), Image.Resampling.BOX)
+    collect.results.clear()
+    est.request(proxy, "JPEG", reference=(img, proxy))
+    results = collect.wait_for(2)  # Pixel-ratio guess, then calibrated
+    # Unedited preview: calibrated estimate equals the full-size encode
+    assert results[-1] == (exact, False)
+    print("ALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_size_estimator()
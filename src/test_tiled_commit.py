@@ -0,0 +1,60 @@
+import os
+import sys
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from editor.editor_core import EditorCore
+from editor.fusion import run_chain
+from editor.tiled import TiledExecutor, split_strips, run_chain_region
+from test_helpers import noise_image, max_diff
+
+
+def test_tiled_commit():
+    core = EditorCore()
+    img = noise_image(160, 520, seed=2)
+    executor = TiledExecutor(workers=4)
+
+    print("Testing strip split...")
+    strips = split_strips(520, 8)
+    assert strips[0][0] == 0 and strips[-1][1] == 520
+    assert all(a[1] == b[0] for a, b in zip(strips, strips[1:]))
+    print("Strip split OK")
+
+    print("Testing Blur halo...")
+    exact = core.filters["Blur"].run(img)
+    assert max_diff(exact, executor.run_chain(img, core.filters, [("Blur", {})])) == 0
+    print("Blur seamless OK")
+
+    print("Testing vignette regions...")
+    params = {"vignette_amount": 70, "vignette_radius": 40, "noise_amount": 0}
+    exact = core.filters["Vignette & Noise"].run(img, **params)
+    assert max_diff(exact, executor.run_chain(img, core.filters, [("Vignette & Noise", params)])) <= 1
+    print("Vignette seamless OK")
+
+    print("Testing full slider chain...")
+    filter_list = [
+        ("Brightness", {"delta": 15}),
+        ("Contrast", {"delta": 40}),
+        ("HSL Adjustment", {"hue": -20, "saturation": 30, "lightness": 0}),
+        ("Vignette & Noise", params),
+    ]
+    exact = run_chain(img, core.filters, filter_list)
+    assert max_diff(exact, executor.run_chain(img, core.filters, filter_list)) <= 1
+    print("Slider chain OK")
+
+    print("Testing viewport region render...")
+    box = (30, 200, 110, 330)
+    region, stats = run_chain_region(img, core.filters, filter_list + [("Blur", {})], box, img)
+    exact = run_chain(img, core.filters, filter_list + [("Blur", {})]).crop(box)
+    assert max_diff(exact, region) <= 1
+    assert stats.size == img.size
+    print("Viewport region OK")
+
+    print("Testing geometry filters fall back to whole image...")
+    res = executor.run_chain(img, core.filters, [("Rotate Left", {})])
+    assert res.size == (520, 160)
+    print("ALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_tiled_commit()
@@ -0,0 +1,87 @@
+import sys
+import os
+import time
+from PIL import Image, ImageChops, ImageStat
+from PySide6.QtWidgets import QApplication
+from PySide6.QtGui import QImage, QPainter
+from PySide6.QtCore import QRectF
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from gui.image_view import ImageView
+from gui.tiled_image_item import TILE_SIZE
+
+
+def _render(scene, source, scale):
+    out = QImage(int(source.width() * scale), int(source.height() * scale), QImage.Format.Format_RGB32)
+    painter = QPainter(out)
+    scene.render(painter, QRectF(out.rect()), source)
+    painter.end()
+    return Image.fromqimage(out).convert("RGB")
+
+
+def _settle(app, tiled):
+    """Let the tile workers finish and deliver their tiles."""
+    for _ in range(500):
+        app.processEvents()
+        if not tiled.pending_tiles():
+            return
+        time.sleep(0.01)
+    raise AssertionError("tiles never arrived")
+
+
+def test_tiled_view():
+    app = QApplication.instance() or QApplication(sys.argv)
+    img = Image.radial_gradient("L").resize((6000, 5000)).convert("RGB")
+
+    print("Testing large images use the tiled item...")
+    view = ImageView()
+    view.resize(800, 600)
+    view.display_image(img)
+    tiled = view._tiled_item
+    assert tiled.isVisible() and view._item.pixmap().isNull()
+    assert tiled.cached_tiles() == 0  # Nothing converted before it is drawn
+    print("Tiled item OK")
+
+    print("Testing zoomed-out drawing uses a reduced level...")
+    _render(view.scene, QRectF(0, 0, 6000, 5000), 1 / 16)
+    assert tiled.cached_tiles() == 0 and tiled.pending_tiles() == 1  # Built off the GUI thread
+    _settle(app, tiled)
+    res = _render(view.scene, QRectF(0, 0, 6000, 5000), 1 / 16)
+    keys = list(tiled._tiles)
+    assert keys and all(factor == 16 for factor, _, _ in keys) and len(keys) == 1
+    ref = img.resize(res.size, Image.Resampling.BOX)
+    assert max(ImageStat.Stat(ImageChops.difference(res, ref)).mean) < 2
+    print("Pyramid level OK")
+
+    print("Testing 1:1 drawing converts only the visible tiles...")
+    first = _render(view.scene, QRectF(1000, 1000, 800, 600), 1.0)
+    # Until the full-resolution tiles arrive the overview stands in for them
+    assert tiled.pending_tiles() == 9
+    ref = img.crop((1000, 1000, 1800, 1600))
+    assert max(ImageStat.Stat(ImageChops.difference(first, ref)).mean) < 8
+    _settle(app, tiled)
+    res = _render(view.scene, QRectF(1000, 1000, 800, 600), 1.0)
+    assert ImageChops.difference(res, img.crop((1000, 1000, 1800, 1600))).getbbox() is None
+    full_res = [k for k in tiled._tiles if k[0] == 1]
+    assert len(full_res) == 9, full_res  # Columns and rows 1..3 of 512 px
+    print("Visible tiles OK")
+
+    print("Testing the LRU bound...")
+    tiled.cache_bytes = 3 * TILE_SIZE * TILE_SIZE * 4
+    _render(view.scene, QRectF(0, 0, 3000, 1000), 1.0)
+    _settle(app, tiled)
+    assert tiled.cached_tiles() <= 3
+    print("LRU bound OK")
+
+    print("Testing small images keep the single pixmap...")
+    view.display_image(img.resize((600, 500)))
+    assert not tiled.isVisible() and tiled.cached_tiles() == 0
+    assert view._item.pixmap().width() == 600
+    print("ALL TESTS PASSED")
+
+
+if __name__ == "__main__":
+    test_tiled_view()
@@ -1,15 +1,21 @@
 import sys
 import os
-from PySide6.QtWidgets import QApplication
+import time
+import shutil
+import tempfile
+from types import SimpleNamespace
+from PIL import Image
+from PySide6.QtWidgets import QApplication, QPushButton, QFileDialog
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__)))
 
 from gui.main_window import MainWindow
 from editor.editor_core import EditorCore
+from editor.ai_features.upscaler.backends import LanczosBackend
 
 def test_instantiation():
-    app = QApplication(sys.argv)
+    app = QApplication.instance() or QApplication(sys.argv)
     
     print("Initializing EditorCore...")
     core = EditorCore()
@@ -29,6 +35,13 @@ def test_instantiation():
     assert hasattr(window.sidebar, "filters_tab")
     assert hasattr(window.sidebar, "colors_tab")
     
+    print("Checking Blur is an adjustable slider...")
+    colors_tab = window.sidebar.colors_tab
+    radius = colors_tab.slider_widgets["Blur"]["radius"]
+    assert (radius.minimum(), radius.maximum(), radius.value()) == (0, 200, 0)
+    buttons = [b.text() for b in window.sidebar.filters_tab.findChildren(QPushButton)]
+    assert "Blur" not in buttons and "Grayscale" in buttons
+
     print("Checking ColorsTab slider logic...")
     # Simulate slider release
     window.sidebar.colors_tab.slider_values = {"Test": {"p": 10}}
@@ -42,6 +55,69 @@ def test_instantiation():
     except Exception as e:
         print(f"Warning during slider release test (expected if no image loaded): {e}")
 
+    print("Checking the status bar size is estimated off the GUI thread...")
+    calls = []
+    get_info = window.core.get_image_info
+    window.core.get_image_info = lambda *a, **k: calls.append((a, k)) or get_info(*a, **k)
+    window.core.original_image = Image.radial_gradient("L").convert("RGB")
+    window.core.current_image = window.core.original_image.copy()
+    window._size_text = "…"
+    window.refresh_preview()
+    assert calls and not any(a or k.get("estimate_size") for a, k in calls)
+    for _ in range(200):
+        app.processEvents()
+        if window._size_text.endswith("KB") and not window._size_text.startswith("~"):
+            break
+        time.sleep(0.01)
+    assert window._size_text.endswith(" KB") and "Approx. Size" in window.statusBar().currentMessage()
+    window.core.get_image_info = get_info
+
+    print("Checking zoom/pan re-renders go through the preview scheduler...")
+    colors_tab = window.sidebar.colors_tab
+    core = window.core
+    core.preview_proxy = core.original_image
+    core.in_preview = True
+    colors_tab.slider_values = {"Brightness": {"delta": 30}}
+    sync_calls = []
+    colors_tab.apply_combined_filters = lambda: sync_calls.append(1)
+    set_view = core.set_preview_view
+    core.set_preview_view = lambda *a, **k: True
+    before = core.current_image
+    window.on_view_changed()
+    assert not sync_calls and colors_tab.scheduler.is_busy()
+    for _ in range(200):
+        app.processEvents()
+        if core.current_image is not before:
+            break
+        time.sleep(0.01)
+    assert core.current_image is not before
+    assert core.current_image.tobytes() != before.tobytes()
+    core.set_preview_view = set_view
+    del colors_tab.apply_combined_filters
+    colors_tab.slider_values = {}
+
+    print("Checking Upscale Folder runs the queue off the GUI thread...")
+    temp_dir = tempfile.mkdtemp()
+    pick = QFileDialog.getExistingDirectory
+    try:
+        in_dir, out_dir = os.path.join(temp_dir, "in"), os.path.join(temp_dir, "out")
+        os.makedirs(in_dir)
+        for i in range(3):
+            Image.new("RGB", (16, 8)).save(os.path.join(in_dir, f"{i}.png"))
+        folders = iter([in_dir, out_dir])
+        QFileDialog.getExistingDirectory = staticmethod(lambda *a, **k: next(folders))
+        window.upscaler = SimpleNamespace(backend=LanczosBackend(scale=2))
+        window.sidebar.ai_tab.btn_upscale_folder.click()
+        assert not window.sidebar.ai_tab.btn_upscale.isEnabled()
+        window.worker.wait()
+        app.processEvents()
+        assert sorted(os.listdir(out_dir)) == ["0.png", "1.png", "2.png"]
+        assert window.sidebar.ai_tab.progress.value() == 100
+        assert window.sidebar.ai_tab.btn_upscale_folder.isEnabled()
+    finally:
+        QFileDialog.getExistingDirectory = pick
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
     print("UI Instantiation OK")
     # window.show()
     # app.exec()
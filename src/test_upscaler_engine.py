@@ -0,0 +1,277 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+from PIL import Image
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from editor.ai_features.upscaler.upscaler_engine import UpscalerEngine, UpscaleCancelled
+from editor.ai_features.upscaler.backends import UpscaleBackend, LanczosBackend, NcnnBackend
+from editor.ai_features.upscaler.upscale_queue import UpscaleQueue
+from editor.ai_features.upscaler.tiling import TiledUpscaler
+from editor.ai_features.upscaler.feature import UpscalerFeature
+
+# Stands in for realesrgan-ncnn-vulkan: same arguments, NEAREST upscale,
+# progress lines on stderr
+STUB = '''#!{python}
+import os, sys, time
+from PIL import Image
+args = dict(zip(sys.argv[1::2], sys.argv[2::2]))
+if os.environ.get("STUB_LOG"):
+    with open(os.environ["STUB_LOG"], "a") as f:
+        f.write("launch\\n")
+if os.environ.get("STUB_FAIL"):
+    sys.stderr.write("vkCreateInstance failed\\n")
+    sys.exit(1)
+if os.path.isdir(args["-i"]):
+    # Directory mode: every file in -i, written to -o as <stem>.png
+    pairs = [(os.path.join(args["-i"], n), os.path.join(args["-o"], os.path.splitext(n)[0] + ".png"))
+             for n in sorted(os.listdir(args["-i"]))]
+else:
+    pairs = [(args["-i"], args["-o"])]
+scale = int(args["-s"])
+for src, dst in pairs:
+    img = Image.open(src)
+    # A single-tile image only ever reports 0%
+    for p in (0,) if os.environ.get("STUB_SINGLE_TILE") else (0, 25, 50, 75, 100):
+        sys.stderr.write("%.2f%%\\n" % p)
+        sys.stderr.flush()
+        time.sleep(float(os.environ.get("STUB_DELAY", "0")))
+    img.resize((img.width * scale, img.height * scale), Image.Resampling.NEAREST).save(dst)
+'''
+
+
+def make_stub(temp_dir):
+    """Create a model dir holding the stub binary and placeholder model files."""
+    model_dir = os.path.join(temp_dir, "model")
+    os.makedirs(os.path.join(model_dir, "models"))
+    for f in ("realesrgan-x4plus.bin", "realesrgan-x4plus.param"):
+        open(os.path.join(model_dir, "models", f), "wb").close()
+    binary = os.path.join(model_dir, "stub-realesrgan")
+    with open(binary, "w") as f:
+        f.write(STUB.format(python=sys.executable))
+    os.chmod(binary, 0o755)
+    return model_dir, binary
+
+
+def test_upscaler_engine():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        model_dir, binary = make_stub(temp_dir)
+        img = Image.radial_gradient("L").resize((40, 30)).convert("RGB")
+
+        print("Testing fast I/O upscale with progress...")
+        engine = UpscalerEngine(model_dir, binary=binary)
+        progress = []
+        res = engine.upscale(img, progress_callback=progress.append)
+        assert res.size == (160, 120)
+        assert res.resize((40, 30), Image.Resampling.NEAREST).tobytes() == img.tobytes()
+        assert progress == [0.0, 25.0, 50.0, 75.0, 100.0]
+        print("Upscale + progress OK")
+
+        print("Testing async upscale and cancellation...")
+        os.environ["STUB_DELAY"] = "2"
+        try:
+            started = threading.Event()
+            future = engine.upscale_async(img, progress_callback=lambda p: started.set())
+            assert started.wait(10)
+            t0 = time.perf_counter()
+            engine.cancel()
+            try:
+                future.result(10)
+                assert False, "cancelled upscale returned a result"
+            except UpscaleCancelled:
+                pass
+            assert time.perf_counter() - t0 < 2
+        finally:
+            del os.environ["STUB_DELAY"]
+        assert engine.upscale_async(img).result(10).size == (160, 120)
+
+        # A cancel that arrives before the worker picks the job up still counts
+        first, second = engine.upscale_async(img), engine.upscale_async(img)
+        engine.cancel()
+        for future in (first, second):
+            try:
+                future.result(10)
+                assert False, "job cancelled while queued returned a result"
+            except UpscaleCancelled:
+                pass
+        event = threading.Event()
+        event.set()
+        try:
+            engine.upscale(img, cancel_event=event)
+            assert False, "pre-cancelled upscale returned a result"
+        except UpscaleCancelled:
+            pass
+        assert engine.upscale(img).size == (160, 120)
+        print("Cancellation OK")
+
+        print("Testing errors surface stderr...")
+        os.environ["STUB_FAIL"] = "1"
+        try:
+            engine.upscale(img)
+            assert False, "failing binary didn't raise"
+        except RuntimeError as e:
+            assert "vkCreateInstance" in str(e)
+        finally:
+            del os.environ["STUB_FAIL"]
+        print("ALL TESTS PASSED")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+class _FlatBackend(UpscaleBackend):
+    """Paints every tile a different solid grey, so seams are easy to measure."""
+    scale = 2
+
+    def __init__(self):
+        self.calls = 0
+
+    def upscale_tile(self, tile):
+        self.calls += 1
+        return Image.new(tile.mode, (tile.width * 2, tile.height * 2), (40 * self.calls,) * 3)
+
+
+def test_tiled_upscaler():
+    img = Image.effect_noise((300, 200), 60).convert("RGB")
+
+    print("Testing a backend must implement upscale_tile...")
+    class _Incomplete(UpscaleBackend):
+        pass
+    try:
+        _Incomplete()
+        assert False, "backend without upscale_tile was instantiated"
+    except TypeError:
+        pass
+
+    print("Testing tiled Lanczos matches a whole-image resize...")
+    res = TiledUpscaler(LanczosBackend(), tile_size=64, overlap=16, workers=3).upscale(img)
+    assert res.tobytes() == img.resize((1200, 800), Image.Resampling.LANCZOS).tobytes()
+    print("Tiled parity OK")
+
+    print("Testing seams are feathered...")
+    res = TiledUpscaler(_FlatBackend(), tile_size=100, overlap=16, workers=1).upscale(img)
+    # Tiles 1 and 2 meet at x=100 (200 in the output); the 8px band before it ramps over 16px
+    row = [res.getpixel((x, 50))[0] for x in range(180, 210)]
+    assert row[0] == 40 and row[-1] == 80
+    assert all(a <= b for a, b in zip(row, row[1:])) and len(set(row)) > 8
+    print("Feathering OK")
+
+    print("Testing a pre-set cancel event stops the tiled upscaler...")
+    event = threading.Event()
+    event.set()
+    try:
+        TiledUpscaler(LanczosBackend(), tile_size=64).upscale(img, cancel_event=event)
+        assert False, "cancelled tiled upscale returned a result"
+    except UpscaleCancelled:
+        pass
+    print("Tiled cancel OK")
+
+    print("Testing CPU fallback when the NCNN binary is missing...")
+    feature = UpscalerFeature()
+    if not feature.manager.exists():
+        assert feature.backend_name == LanczosBackend.name
+        assert feature.upscale(img.crop((0, 0, 40, 30))).size == (160, 120)
+    print("ALL TESTS PASSED")
+
+def test_upscale_queue():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        model_dir, binary = make_stub(temp_dir)
+        in_dir = os.path.join(temp_dir, "shots")
+        out_dir = os.path.join(temp_dir, "out")
+        os.makedirs(in_dir)
+        for i in range(5):
+            Image.new("RGB", (20 + i, 10), (i * 40, 0, 0)).save(os.path.join(in_dir, f"shot{i}.jpg"))
+
+        print("Testing one NCNN process for the whole folder...")
+        log = os.path.join(temp_dir, "launches.txt")
+        os.environ["STUB_LOG"] = log
+        try:
+            events = []
+            queue = UpscaleQueue(NcnnBackend(UpscalerEngine(model_dir, binary=binary)),
+                                 on_job=lambda j: events.append((j.id, j.status)))
+            jobs = queue.add_folder(in_dir, out_dir)
+            stats = queue.run()
+        finally:
+            del os.environ["STUB_LOG"]
+        with open(log) as f:
+            assert f.read().count("launch") == 1
+        assert stats["done"] == 5 and stats["failed"] == 0 and stats["images_per_sec"] > 0
+        assert all(j.status == "done" and j.seconds > 0 for j in jobs)
+        assert [e for e in events if e[1] == "done"] == [(j.id, "done") for j in jobs]
+        with Image.open(os.path.join(out_dir, "shot3.png")) as res:
+            assert res.size == (92, 40)
+        print("Directory mode OK")
+
+        print("Testing jobs finish as their outputs appear, without per-file progress...")
+        os.environ.update(STUB_SINGLE_TILE="1", STUB_DELAY="0.3")
+        try:
+            finished = []
+            queue = UpscaleQueue(NcnnBackend(UpscalerEngine(model_dir, binary=binary)),
+                                 on_job=lambda j: j.status == "done" and finished.append(time.perf_counter()))
+            jobs = queue.add_folder(in_dir, os.path.join(temp_dir, "single"))
+            start = time.perf_counter()
+            stats = queue.run()
+            total = time.perf_counter() - start
+        finally:
+            del os.environ["STUB_SINGLE_TILE"], os.environ["STUB_DELAY"]
+        assert stats["done"] == 5
+        # Each job is timed on its own, and the first one is done well before the last
+        assert all(j.seconds >= 0.2 for j in jobs), [j.seconds for j in jobs]
+        assert finished[0] - start < total - 0.6
+        print("Output tracking OK")
+
+        print("Testing a move that fails while the binary runs is retried...")
+        from editor.ai_features.upscaler import upscale_queue
+        move, refused = upscale_queue.shutil.move, set()
+
+        def flaky_move(src, dst):
+            # The last output is only collected after the binary exits, where a failure is final
+            if src not in refused and not src.endswith("000005.png"):
+                refused.add(src)  # e.g. still open for writing on Windows
+                raise PermissionError(f"{src} is in use")
+            return move(src, dst)
+
+        os.environ.update(STUB_SINGLE_TILE="1", STUB_DELAY="0.3")
+        upscale_queue.shutil.move = flaky_move
+        try:
+            queue = UpscaleQueue(NcnnBackend(UpscalerEngine(model_dir, binary=binary)))
+            jobs = queue.add_folder(in_dir, os.path.join(temp_dir, "retried"))
+            stats = queue.run()
+        finally:
+            upscale_queue.shutil.move = move
+            del os.environ["STUB_SINGLE_TILE"], os.environ["STUB_DELAY"]
+        assert stats["done"] == 5 and len(refused) == 4, [(j.status, j.error) for j in jobs]
+        print("Move retry OK")
+
+        print("Testing a missing binary fails the jobs instead of raising...")
+        queue = UpscaleQueue(NcnnBackend(UpscalerEngine(model_dir, binary=binary + "-missing")))
+        missing = queue.add_folder(in_dir, out_dir)
+        assert queue.run()["failed"] == 5 and "Missing AI binary" in missing[0].error
+        print("Missing binary OK")
+
+        print("Testing the queue with the CPU backend...")
+        queue = UpscaleQueue(LanczosBackend(scale=2))
+        queue.add(os.path.join(in_dir, "shot0.jpg"), os.path.join(out_dir, "cpu.png"))
+        assert queue.run()["done"] == 1
+
+        print("Testing a cancel before run() isn't lost...")
+        early = queue.add(os.path.join(in_dir, "shot1.jpg"), os.path.join(out_dir, "early.png"))
+        queue.cancel()
+        assert early.status == "cancelled"
+        late = queue.add(os.path.join(in_dir, "shot2.jpg"), os.path.join(out_dir, "late.png"))
+        queue.run()
+        assert early.status == "cancelled" and late.status == "done"
+        assert not os.path.exists(os.path.join(out_dir, "early.png"))
+        print("ALL TESTS PASSED")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_upscaler_engine()
+    test_tiled_upscaler()
+    test_upscale_queue()
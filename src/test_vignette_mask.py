@@ -0,0 +1,62 @@
+import os
+import sys
+from PIL import Image
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from editor.filters import vignette_noise
+
+
+def test_vignette_mask():
+    vignette_noise._vignette_mask.cache_clear()
+    vignette_noise._scaled_masks.clear()
+    img = Image.new("RGB", (800, 600), (200, 180, 160))
+    params = {"vignette_amount": 60, "vignette_radius": 10}
+
+    print("Testing the mask is built once per parameters...")
+    first = vignette_noise.run(img, **params)
+    info = vignette_noise._vignette_mask.cache_info()
+    assert info.misses == 1
+    # Another slider moves: neither the mask nor its upsample is rebuilt
+    vignette_noise.run(img, noise_amount=20, **params)
+    assert vignette_noise._vignette_mask.cache_info().misses == 1
+    size, box = img.size, (0, 0) + img.size
+    assert vignette_noise._region_mask(size, box, 60, 10) is vignette_noise._region_mask(size, box, 60, 10)
+    print("Mask cache OK")
+
+    print("Testing the proxy and the full image share the low-resolution mask...")
+    proxy = img.resize((400, 300))
+    vignette_noise.run(proxy, **params)
+    assert vignette_noise._vignette_mask.cache_info().misses == 1
+    vignette_noise.run(img, vignette_amount=61, vignette_radius=10)
+    assert vignette_noise._vignette_mask.cache_info().misses == 2
+    print("Shared mask OK")
+
+    print("Testing cached results match a fresh render...")
+    vignette_noise._vignette_mask.cache_clear()
+    vignette_noise._scaled_masks.clear()
+    assert vignette_noise.run(img, **params).tobytes() == first.tobytes()
+    corner, centre = first.getpixel((0, 0)), first.getpixel((400, 300))
+    assert corner[0] < centre[0]
+    print("Render OK")
+
+    print("Testing the lift table matches the original point(lambda) render...")
+    mask_size = vignette_noise._mask_size(img.size)
+    plain = vignette_noise._vignette_mask(mask_size, 100, 10)
+    for amount in (0, 1, 33, 60, 99):
+        lift = int((100 - amount) * 2.55)
+        # Pillow rounds the values a function returns
+        baseline = plain.point(lambda x: lift + x * (255 - lift) / 255)
+        assert vignette_noise._vignette_mask(mask_size, amount, 10).tobytes() == baseline.tobytes(), amount
+    print("Lift OK")
+
+    print("Testing the upsample cache stays bounded...")
+    for amount in range(1, 20):
+        vignette_noise.run(img, vignette_amount=amount, vignette_radius=40)
+    assert len(vignette_noise._scaled_masks) <= vignette_noise.SCALED_MASK_CACHE_SIZE
+    print("ALL TESTS PASSED")
+
+
+if __name__ == "__main__":
+    test_vignette_mask()
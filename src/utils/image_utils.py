@@ -1,5 +1,5 @@
 from PIL import Image
-from PySide6.QtGui import QImage, QPixmap
+from PySide6.QtGui import QImage, QPixmap, QPainter
 import io
 
 def pil_image_to_qpixmap(pil_img: Image.Image) -> QPixmap:
@@ -13,3 +13,75 @@ def pil_image_to_qpixmap(pil_img: Image.Image) -> QPixmap:
         data = pil_img.tobytes("raw", "RGBA")
         qimg = QImage(data, pil_img.width, pil_img.height, QImage.Format.Format_RGBA8888).copy()
     return QPixmap.fromImage(qimg)
+
+
+# PIL mode -> (mode of the shared buffer, matching QImage format, bytes per pixel).
+# PIL keeps RGB pixels padded to 4 bytes, so RGB pastes straight into RGBX.
+_SHARED_FORMATS = {
+    "RGB": ("RGBX", QImage.Format.Format_RGBX8888, 4),
+    "RGBA": ("RGBA", QImage.Format.Format_RGBA8888, 4),
+    "L": ("L", QImage.Format.Format_Grayscale8, 1),
+}
+
+
+class DisplayBuffer:
+    """
+    A persistent PIL -> QPixmap conversion target for frames of one size.
+
+    One bytearray backs both a PIL image and a QImage, so a frame is copied
+    once into memory Qt can read directly (no tobytes(), no QImage.copy()).
+    The QPixmap is then repainted in place rather than re-created. Both are
+    rebuilt only when the size or mode changes.
+
+    Passing the same image object again costs nothing.
+
+    Whoever shows pixmap must let go of it (e.g. setPixmap(QPixmap())) before
+    the next update(), or painting detaches it into a full copy.
+    """
+
+    def __init__(self):
+        self.pixmap = QPixmap()
+        self._qimage = None
+        self._view = None     # PIL image over the same buffer as _qimage
+        self._buffer = None
+        self._key = None      # (size, mode) the buffers were built for
+        self._last = None     # Last image copied in
+
+    def update(self, pil_img):
+        """Bring pixmap up to date with pil_img and return it."""
+        if pil_img.mode not in _SHARED_FORMATS:
+            pil_img = pil_img.convert("RGBA")  # A converted copy is never the last image
+        key = (pil_img.size, pil_img.mode)
+        if key != self._key:
+            self._allocate(pil_img.size, pil_img.mode)
+        elif pil_img is self._last:
+            return self.pixmap
+        self._last = pil_img
+
+        self._view.im.paste(pil_img.im, (0, 0) + pil_img.size)
+        if self.pixmap.isNull():
+            self.pixmap = QPixmap.fromImage(self._qimage)
+        else:
+            painter = QPainter(self.pixmap)
+            painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+            painter.drawImage(0, 0, self._qimage)
+            painter.end()
+        return self.pixmap
+
+    def clear(self):
+        """Release the buffers (e.g. when the view is emptied)."""
+        self.pixmap = QPixmap()
+        self._qimage = self._view = self._buffer = None
+        self._key = self._last = None
+
+    def _allocate(self, size, mode):
+        w, h = size
+        buffer_mode, fmt, depth = _SHARED_FORMATS[mode]
+        self._buffer = bytearray(w * h * depth)
+        # Pasting through .im writes into the mapped memory; the Python-level
+        # paste() would copy a frombuffer() image first
+        self._view = Image.frombuffer(buffer_mode, size, self._buffer, "raw", buffer_mode, 0, 1)
+        self._qimage = QImage(self._buffer, w, h, w * depth, fmt)
+        self.pixmap = QPixmap()
+        self._key = (size, mode)
+